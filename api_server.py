@@ -0,0 +1,363 @@
+"""Local JSON API over a single long-lived DataProvider.
+
+Lets other household tools (ie a time clock tablet or accounting exports) use the payroll data without reading the
+json files in the app data directory. The data is loaded once, requests are served concurrently on an asyncio event
+loop from the in-memory data, and files edited outside the app are picked up with DataProvider.reload_changed_files().
+Pay stubs are calculated while holding the data lock, but their pdfs are rendered on a worker thread after the lock is
+released, so rendering doesn't block other requests or reloads. The server only binds to loopback addresses.
+
+    python api_server.py [--host 127.0.0.1] [--port 8765]
+
+Endpoints (money values are whole cents, dates are ISO format: 2024-06-07):
+    GET  /employees
+    GET  /employees/{name}/time-entries?start=DATE&end=DATE
+    POST /employees/{name}/time-entries        {"Date": DATE, "Hours": 8, "PayType": "REGULAR",
+                                                 "Reimbursement": 0, "Note": ""}
+    GET  /employees/{name}/timesheet?end=DATE[&start=DATE]
+    GET  /employees/{name}/timesheet.pdf?end=DATE[&start=DATE][&renderer=NAME]
+    GET  /reports/eams?year=YEAR[&quarter=QUARTER]
+    GET  /reports/w2?year=YEAR
+    GET  /reports/schedule-h?year=YEAR"""
+
+__author__ = 'Sean Kraft'
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict
+from datetime import date as Date
+from datetime import timedelta
+from http import HTTPStatus
+from urllib.parse import parse_qsl
+from urllib.parse import unquote
+from urllib.parse import urlsplit
+import argparse
+import asyncio
+import ipaddress
+import json
+import math
+
+import config
+import pdf_renderers
+import reports
+from data_provider import DataProvider
+from data_provider import Employee
+from data_provider import PayType
+
+MAX_BODY_SIZE = 1024 * 1024
+REQUEST_TIMEOUT = 10  # seconds to wait for a client to send its request
+
+
+class ApiError(Exception):
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    def __init__(self, method: str, target: str, body: bytes = b""):
+        self.method = method
+        url = urlsplit(target)
+        self.path = [unquote(part) for part in url.path.split("/") if part]
+        self.query = dict(parse_qsl(url.query))
+        self.body = body
+
+    def __repr__(self):
+        return f"Request(method={self.method}, path={self.path}, query={self.query})"
+
+    def json(self) -> dict:
+        try:
+            return json.loads(self.body or b"{}")
+        except ValueError as error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid json: {error}")
+
+    def get_date(self, name: str, default: Date = None) -> Date:
+        if name not in self.query:
+            if default is None:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"Missing '{name}' parameter.")
+            return default
+        try:
+            return Date.fromisoformat(self.query[name])
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' must be an ISO date (ie 2024-06-07).")
+
+    def get_int(self, name: str, required: bool = True) -> int or None:
+        if name not in self.query:
+            if required:
+                raise ApiError(HTTPStatus.BAD_REQUEST, f"Missing '{name}' parameter.")
+            return None
+        try:
+            return int(self.query[name])
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"'{name}' must be a whole number.")
+
+
+class PayrollApiServer:
+    def __init__(self, data: DataProvider, host: str = None, port: int = None, watch_interval_ms: int = None):
+        self.data_provider = data
+        self.host = host or config.API_HOST
+        self.port = config.API_PORT if port is None else port
+        self.watch_interval_ms = config.WATCH_INTERVAL_MS if watch_interval_ms is None else watch_interval_ms
+        if not is_loopback(self.host):
+            raise ValueError(f"The API only serves local clients. '{self.host}' is not a loopback address.")
+
+        self.server: asyncio.Server or None = None
+        self.lock = asyncio.Lock()  # held while the data is changed or read
+        self.pdf_executor = ThreadPoolExecutor(max_workers=1)  # one pdf at a time, the renderers share their fonts
+
+        # (method, path) -> handler. None in a path matches any single segment, which is passed to the handler
+        self.routes = {
+            ("GET", ("employees",)): self.get_employees,
+            ("GET", ("employees", None, "time-entries")): self.get_time_entries,
+            ("POST", ("employees", None, "time-entries")): self.add_time_entry,
+            ("GET", ("employees", None, "timesheet")): self.get_timesheet,
+            ("GET", ("employees", None, "timesheet.pdf")): self.get_timesheet_pdf,
+            ("GET", ("reports", "eams")): self.get_eams_report,
+            ("GET", ("reports", "w2")): self.get_w2_report,
+            ("GET", ("reports", "schedule-h")): self.get_schedule_h_report,
+        }
+
+    def __repr__(self):
+        return f"PayrollApiServer(host={self.host}, port={self.port})"
+
+    async def start(self) -> asyncio.Server:
+        """Starts listening. If port is 0, the port the os picked is stored in self.port."""
+        self.server = await asyncio.start_server(self.handle_connection, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+        print(f"Serving the payroll api on http://{self.host}:{self.port}")
+        return self.server
+
+    async def serve_forever(self):
+        await self.start()
+        watcher = asyncio.create_task(self.watch()) if self.watch_interval_ms else None
+        try:
+            async with self.server:
+                await self.server.serve_forever()
+        finally:
+            if watcher:
+                watcher.cancel()
+            self.pdf_executor.shutdown()
+
+    async def watch(self):
+        """Reloads files that were changed outside the api (without blocking requests between checks)."""
+        while True:
+            await asyncio.sleep(self.watch_interval_ms / 1000)
+            async with self.lock:
+                self.data_provider.reload_changed_files()
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serves a single request per connection."""
+        try:
+            try:
+                request = await asyncio.wait_for(self.read_request(reader), REQUEST_TIMEOUT)
+                status, content_type, body = await self.dispatch(request)
+            except ApiError as error:
+                status, content_type, body = error.status, "application/json", self.to_json({"Error": str(error)})
+            except asyncio.TimeoutError:
+                status, content_type, body = HTTPStatus.REQUEST_TIMEOUT, "application/json", b""
+            except Exception as error:
+                print(f"ERROR: {type(error).__name__}: {error}")
+                status, content_type, body = (HTTPStatus.INTERNAL_SERVER_ERROR, "application/json",
+                                              self.to_json({"Error": f"{type(error).__name__}: {error}"}))
+
+            writer.write(f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                         f"Content-Type: {content_type}\r\n"
+                         f"Content-Length: {len(body)}\r\n"
+                         f"Connection: close\r\n\r\n".encode("latin-1") + body)
+            await writer.drain()
+        except ConnectionError:
+            pass  # the client went away
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def read_request(reader: asyncio.StreamReader) -> Request:
+        request_line = (await reader.readline()).decode("latin-1").split()
+        if len(request_line) != 3:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Malformed request line.")
+        method, target, _ = request_line
+
+        headers = {}
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            content_length = int(headers.get("content-length", 0))
+        except ValueError:
+            raise ApiError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length.")
+        if content_length > MAX_BODY_SIZE:
+            raise ApiError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Request body is too large.")
+        body = await reader.readexactly(content_length) if content_length else b""
+        return Request(method.upper(), target, body)
+
+    async def dispatch(self, request: Request) -> tuple[HTTPStatus, str, bytes]:
+        allowed_methods = []
+        for (method, path), handler in self.routes.items():
+            if len(path) != len(request.path):
+                continue
+            if any(part is not None and part != value for part, value in zip(path, request.path)):
+                continue
+            if method != request.method:
+                allowed_methods.append(method)
+                continue
+            args = [value for part, value in zip(path, request.path) if part is None]
+            result = await handler(request, *args)
+            if isinstance(result, tuple):
+                return result
+            status = HTTPStatus.CREATED if request.method == "POST" else HTTPStatus.OK
+            return status, "application/json", self.to_json(result)
+
+        if allowed_methods:
+            raise ApiError(HTTPStatus.METHOD_NOT_ALLOWED, f"Use {' or '.join(allowed_methods)} for this endpoint.")
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No endpoint at '/{'/'.join(request.path)}'.")
+
+    @staticmethod
+    def to_json(value) -> bytes:
+        return json.dumps(value, indent=2).encode("utf-8")
+
+    def get_employee(self, name: str) -> Employee:
+        for employee in self.data_provider.employees:
+            if employee.name == name:
+                return employee
+        raise ApiError(HTTPStatus.NOT_FOUND, f"No employee named '{name}'.")
+
+    def build_timesheet(self, request: Request, employee: Employee) -> reports.Timesheet:
+        end_date = request.get_date("end")
+        start_date = request.get_date("start", end_date - timedelta(days=6))
+        try:
+            return reports.Timesheet(self.data_provider, employee, start_date, end_date)
+        except ValueError as error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(error))
+
+    # handlers
+
+    async def get_employees(self, request: Request) -> list[dict]:
+        return [{"Name": employee.name, "PayRate": employee.pay_rate} for employee in self.data_provider.employees]
+
+    async def get_time_entries(self, request: Request, name: str) -> list[dict]:
+        employee = self.get_employee(name)
+        time_entries = self.data_provider.get_worked_time_in_range(employee, request.get_date("start"),
+                                                                   request.get_date("end"))
+        return [time_entry.as_dictionary() for time_entry in time_entries]
+
+    async def add_time_entry(self, request: Request, name: str) -> dict:
+        employee = self.get_employee(name)
+        values = request.json()
+        try:
+            date = Date.fromisoformat(values["Date"])
+            hours = float(values["Hours"])
+            pay_type = PayType[values.get("PayType", PayType.REGULAR.name).upper()]
+            reimbursement = float(values.get("Reimbursement", 0)) or None
+        except KeyError as error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Missing or invalid value: {error}")
+        except (TypeError, ValueError) as error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid value: {error}")
+        # float() accepts "nan" and "inf" (and json allows NaN), which would be saved and break every report
+        if not math.isfinite(hours) or hours < 0:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid value: 'Hours' must be 0 or more, not {hours}.")
+        if reimbursement is not None and not math.isfinite(reimbursement):
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"Invalid value: 'Reimbursement' can't be {reimbursement}.")
+        if self.data_provider.get_tax_year(date) is None:
+            raise ApiError(HTTPStatus.BAD_REQUEST, f"No tax rates found for {date.year}.")
+
+        async with self.lock:
+            self.data_provider.add_worked_time(date, employee, hours, pay_type, reimbursement, values.get("Note"))
+            self.data_provider.save()
+        return employee.time_entries[-1].as_dictionary()
+
+    async def get_timesheet(self, request: Request, name: str) -> dict:
+        employee = self.get_employee(name)
+        async with self.lock:  # calculating a new pay period saves its federal withholding
+            timesheet = self.build_timesheet(request, employee)
+        return {"Employee": employee.name,
+                "StartDate": timesheet.start_date.isoformat(),
+                "EndDate": timesheet.end_date.isoformat(),
+                "PayPeriod": timesheet.timesheet.as_dictionary(),
+                "YearToDate": timesheet.timesheet_ytd.as_dictionary(),
+                "LeaveBalances": timesheet.leave_balances}
+
+    async def get_timesheet_pdf(self, request: Request, name: str) -> tuple[HTTPStatus, str, bytes]:
+        employee = self.get_employee(name)
+        try:
+            renderer = pdf_renderers.get_timesheet_renderer(request.query.get("renderer"))
+        except ValueError as error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(error))
+        # the timesheet holds every value the pdf prints, so only calculating it and its cache key (which reads the
+        # time entries) needs the lock
+        async with self.lock:
+            timesheet = self.build_timesheet(request, employee)
+            key = timesheet.get_cache_key(renderer) if self.data_provider.report_cache is not None else None
+        loop = asyncio.get_running_loop()
+        pdf = await loop.run_in_executor(self.pdf_executor, render_pdf, renderer, timesheet, key)
+        return HTTPStatus.OK, "application/pdf", pdf
+
+    async def get_eams_report(self, request: Request) -> dict:
+        year = request.get_int("year")
+        quarter = request.get_int("quarter", required=False)
+        if quarter is not None and quarter not in (1, 2, 3, 4):
+            raise ApiError(HTTPStatus.BAD_REQUEST, "'quarter' must be 1, 2, 3, or 4.")
+
+        def report_rows(quarterly_reports: list) -> list[dict]:
+            return [{"Name": report.employee.name, "SSN": report.employee.ssn, "Hours": report.hours,
+                     "GrossPay": report.gross_pay} for report in quarterly_reports]
+
+        if quarter is not None:
+            report = reports.EAMSQuarterlyReport(self.data_provider, year, quarter)
+            return {"Year": year, "Quarter": quarter, "StartDate": report.start_date.isoformat(),
+                    "EndDate": report.end_date.isoformat(), "Employees": report_rows(report.reports)}
+        report = reports.EAMSYearlyReport(self.data_provider, year)
+        return {"Year": year,
+                "Quarters": {quarter: report_rows(report.get_reports(quarter)) for quarter in report.quarterly_reports},
+                "Annual": report_rows(report.annual_reports)}
+
+    async def get_w2_report(self, request: Request) -> dict:
+        try:
+            report = reports.W2Report(self.data_provider, request.get_int("year"))
+        except ValueError as error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(error))
+        return {"Year": report.year,
+                "Employees": [{"Name": values.employee.name, "Wages": values.wages,
+                               "FederalWithholding": values.federal_withholding, "SSWages": values.ss_wages,
+                               "SSTaxWithheld": values.ss_tax_withheld, "MedicareWages": values.medicare_wages,
+                               "MedicareTaxWithheld": values.medicare_tax_withheld} for values in report.reports]}
+
+    async def get_schedule_h_report(self, request: Request) -> dict:
+        year = request.get_int("year")
+        try:
+            report = reports.ScheduleHReport(self.data_provider, year)
+        except ValueError as error:
+            raise ApiError(HTTPStatus.BAD_REQUEST, str(error))
+        return {"Year": year, "Lines": asdict(report.lines), "Discrepancies": report.reconcile()}
+
+
+def render_pdf(renderer: pdf_renderers.TimesheetRenderer, timesheet: reports.Timesheet, key: str or None) -> bytes:
+    """Returns the pay stub pdf bytes, from the report cache when possible. (runs on the pdf worker thread)"""
+    return timesheet.to_pdf_bytes(renderer, key)
+
+
+def is_loopback(host: str) -> bool:
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the payroll data as a local JSON api.")
+    parser.add_argument("--host", default=config.API_HOST, help="Loopback address to listen on.")
+    parser.add_argument("--port", type=int, default=config.API_PORT)
+    args = parser.parse_args()
+
+    server = PayrollApiServer(DataProvider(), args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,144 @@
+"""Benchmarks DataProvider.aggregate() against the hand written loops the reports use to total pay periods and time
+entries.
+
+    python benchmarks/bench_aggregate.py [--employees 20] [--years 2023 2024] [--repeat 5]
+
+Each query is run both ways on the same synthetic data, the results are checked against each other, and the best
+of --repeat runs is reported:
+    eams quarter     hours and gross pay per employee for a quarter's pay periods (the EAMS report)
+    employer taxes   filed employer taxes per employee per quarter (the Schedule H)
+    pay type/month   hours per pay type per month worked (ad-hoc analytics)
+    reimbursements   reimbursements and entry counts per employee per quarter paid
+The pay period queries skip the loops' sorting of each year's pay periods. The time entry queries total each employee
+by date before merging the groups, so the group keys are built once per date instead of once per entry. pay type/month
+stays slower than its loop (about 0.7x), which only compares the year and builds one fixed key: aggregate() also checks
+both ends of the date range and the pay type filter for every entry."""
+
+__author__ = 'Sean Kraft'
+
+from datetime import date as Date
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+from synthetic_data import make_app_data_dir
+
+from data_provider import DataProvider
+from reports import iter_pay_periods
+
+EMPLOYER_TAX_VALUES = ("medicare_company", "ss_company", "wa_paid_fml_company", "federal_unemployment",
+                       "state_unemployment")
+REIMBURSEMENT_VALUES = ("reimbursement_cents", "count")
+
+
+def eams_quarter_loop(data: DataProvider, year: int) -> dict:
+    start_date, end_date = data.get_payroll_calendar(year).get_quarter_date_range(2)
+    results = {}
+    for employee in data.employees:
+        hours = gross_pay = 0
+        for pay_date, values in iter_pay_periods(data, employee, start_date, end_date):
+            hours += values.hours
+            gross_pay += values.gross_pay
+        results[(employee.name,)] = {"hours": hours, "gross_pay": gross_pay}
+    return results
+
+
+def eams_quarter_query(data: DataProvider, year: int) -> dict:
+    start_date, end_date = data.get_payroll_calendar(year).get_quarter_date_range(2)
+    return data.aggregate(["hours", "gross_pay"], "employee", start_date, end_date)
+
+
+def employer_taxes_loop(data: DataProvider, year: int) -> dict:
+    results = {}
+    for employee in data.employees:
+        for pay_date, values in data.get_period_totals(employee, year):
+            key = (employee.name, (year, data.get_pay_period(pay_date).quarter))
+            totals = results.setdefault(key, dict.fromkeys(EMPLOYER_TAX_VALUES, 0))
+            for name in EMPLOYER_TAX_VALUES:
+                totals[name] += getattr(values, name)
+    return results
+
+
+def employer_taxes_query(data: DataProvider, year: int) -> dict:
+    return data.aggregate(EMPLOYER_TAX_VALUES, ["employee", "quarter"], Date(year, 1, 1), Date(year, 12, 31))
+
+
+def pay_type_month_loop(data: DataProvider, year: int) -> dict:
+    results = {}
+    for employee in data.employees:
+        for time_entry in employee.time_entries:
+            if time_entry.date.year != year:
+                continue
+            key = ((time_entry.date.year, time_entry.date.month), time_entry.pay_type)
+            totals = results.setdefault(key, {"hours": 0})
+            totals["hours"] += time_entry.hours
+    return results
+
+
+def pay_type_month_query(data: DataProvider, year: int) -> dict:
+    return data.aggregate("hours", ["month", "pay_type"], Date(year, 1, 1), Date(year, 12, 31))
+
+
+def reimbursements_loop(data: DataProvider, year: int) -> dict:
+    calendar = data.get_payroll_calendar(year)
+    results = {}
+    for employee in data.employees:
+        for time_entry in data.get_worked_time_in_range(employee, calendar.start_date, calendar.end_date):
+            period = calendar.get_period(time_entry.date)
+            totals = results.setdefault((employee.name, (year, period.quarter)), dict.fromkeys(REIMBURSEMENT_VALUES, 0))
+            totals["reimbursement_cents"] += time_entry.reimbursement_cents
+            totals["count"] += 1
+    return results
+
+
+def reimbursements_query(data: DataProvider, year: int) -> dict:
+    calendar = data.get_payroll_calendar(year)
+    return data.aggregate(REIMBURSEMENT_VALUES, ["employee", "quarter"], calendar.start_date, calendar.end_date)
+
+
+QUERIES = {"eams quarter": (eams_quarter_loop, eams_quarter_query),
+           "employer taxes": (employer_taxes_loop, employer_taxes_query),
+           "pay type/month": (pay_type_month_loop, pay_type_month_query),
+           "reimbursements": (reimbursements_loop, reimbursements_query)}
+
+
+def best_time(function, data: DataProvider, year: int, repeat: int) -> tuple[dict, float]:
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(data, year)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--employees", type=int, default=20)
+    parser.add_argument("--years", type=int, nargs="+", default=[2023, 2024])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = DataProvider(make_app_data_dir(Path(temp_dir) / "app_data", employees=args.employees,
+                                                  years=tuple(args.years)))
+    year = args.years[-1]
+    entries = sum(len(employee.time_entries) for employee in data.employees)
+
+    print(f"{entries} time entries, {len(data.employees)} employees, totals for {year}")
+    print(f"{'query':<16}{'loop (ms)':>11}{'aggregate (ms)':>16}{'ratio':>8}")
+    for name, (loop, query) in QUERIES.items():
+        loop_result, loop_seconds = best_time(loop, data, year, args.repeat)
+        query_result, query_seconds = best_time(query, data, year, args.repeat)
+        if loop_result != query_result:
+            print(f"ERROR: The '{name}' aggregate doesn't match the hand written loop.")
+        ratio = loop_seconds / query_seconds
+        print(f"{name:<16}{loop_seconds * 1000:>11.2f}{query_seconds * 1000:>16.2f}{ratio:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""Benchmarks pay period tax arithmetic with floats, Decimal and integer cents (money.py).
+
+    python benchmarks/bench_money.py [--periods 200000]
+
+Each implementation calculates the gross pay and the nine tax lines for the same random pay periods (5 time
+entries of quarter hours at a cents pay rate). The float version sums unrounded per entry amounts like the
+original TimeEntry properties did; the Decimal and integer versions round each tax line once per period.
+The penny drift column is how far the yearly float totals (rounded at the end) land from the rounded
+per period totals."""
+
+__author__ = 'Sean Kraft'
+
+from decimal import Decimal
+from decimal import ROUND_HALF_UP
+import argparse
+import random
+import time
+
+import money
+
+# percent values from a typical tax_rates.json year
+TAX_PERCENTS = [1.45, 1.45, 6.2, 6.2, 0.74, 0.0, 0.58, 0.6, 1.2]
+ENTRIES_PER_PERIOD = 5
+
+
+def make_periods(count: int, seed: int = 0) -> list[list[tuple[str, str]]]:
+    """Returns pay periods as lists of (pay rate, hours) strings so every implementation parses the same values."""
+    rng = random.Random(seed)
+    periods = []
+    for _ in range(count):
+        pay_rate = f"{rng.randint(1800, 3500) / 100:.2f}"
+        periods.append([(pay_rate, str(rng.randint(8, 40) / 4)) for _ in range(ENTRIES_PER_PERIOD)])
+    return periods
+
+
+def run_float(periods: list) -> tuple[list[float], float]:
+    rates = [percent / 100 for percent in TAX_PERCENTS]
+    totals = [0.0] * len(rates)
+    parsed = [[(float(rate), float(hours)) for rate, hours in period] for period in periods]
+    start = time.perf_counter()
+    for period in parsed:
+        for pay_rate, hours in period:
+            gross = pay_rate * hours
+            for i, rate in enumerate(rates):
+                totals[i] += gross * rate
+    return [round(total, 2) for total in totals], time.perf_counter() - start
+
+
+def run_decimal(periods: list) -> tuple[list[Decimal], float]:
+    rates = [Decimal(str(percent)) / 100 for percent in TAX_PERCENTS]
+    cent = Decimal("0.01")
+    totals = [Decimal(0)] * len(rates)
+    parsed = [[(Decimal(rate), Decimal(hours)) for rate, hours in period] for period in periods]
+    start = time.perf_counter()
+    for period in parsed:
+        gross = sum((pay_rate * hours).quantize(cent, rounding=ROUND_HALF_UP) for pay_rate, hours in period)
+        for i, rate in enumerate(rates):
+            totals[i] += (gross * rate).quantize(cent, rounding=ROUND_HALF_UP)
+    return totals, time.perf_counter() - start
+
+
+def run_int(periods: list) -> tuple[list[int], float]:
+    rates = [money.percent_to_rate(percent) for percent in TAX_PERCENTS]
+    totals = [0] * len(rates)
+    parsed = [[(money.to_cents(rate), money.to_hundredths(hours)) for rate, hours in period] for period in periods]
+    start = time.perf_counter()
+    for period in parsed:
+        gross = sum(money.multiply_hours(pay_rate, hours) for pay_rate, hours in period)
+        for i, rate in enumerate(rates):
+            totals[i] += money.apply_rate(gross, rate)
+    return totals, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--periods", type=int, default=200000)
+    args = parser.parse_args()
+
+    periods = make_periods(args.periods)
+    float_totals, float_seconds = run_float(periods)
+    decimal_totals, decimal_seconds = run_decimal(periods)
+    int_totals, int_seconds = run_int(periods)
+
+    if [money.to_cents(total) for total in decimal_totals] != int_totals:
+        print("ERROR: Decimal and integer cents totals don't match.")
+    drift = sum(abs(money.to_cents(total) - cents) for total, cents in zip(float_totals, int_totals))
+
+    print(f"{'engine':<10}{'periods':>9}{'seconds':>10}{'periods/s':>12}{'penny drift':>13}")
+    for name, seconds, engine_drift in (("float", float_seconds, drift),
+                                        ("Decimal", decimal_seconds, 0),
+                                        ("int", int_seconds, 0)):
+        print(f"{name:<10}{len(periods):>9}{seconds:>10.3f}{len(periods) / seconds:>12,.0f}{engine_drift:>13}")
+
+
+if __name__ == '__main__':
+    main()
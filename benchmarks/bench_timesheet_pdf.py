@@ -0,0 +1,70 @@
+"""Benchmarks Timesheet.to_pdf() for a year of weekly pay stubs (52 stubs for one employee).
+
+    python benchmarks/bench_timesheet_pdf.py [--stubs 52]
+
+'cold' clears the shared TimesheetPdfTemplate fonts before every stub, so each stub builds its fonts from scratch.
+'warm' reuses the shared fonts. Both build the address blocks, labels and value cells per stub."""
+
+__author__ = 'Sean Kraft'
+
+from datetime import timedelta
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import tempfile
+import time
+
+from synthetic_data import make_app_data_dir
+
+from data_provider import DataProvider
+import pdf_renderers
+import reports
+
+
+def build_timesheets(data: DataProvider, stubs: int) -> list:
+    employee = data.employees[0]
+    year = data.tax_rates[0].year
+    end_date = data.get_payroll_calendar(year).periods[0].pay_date
+    timesheets = []
+    for _ in range(stubs):
+        timesheets.append(reports.Timesheet(data, employee, end_date - timedelta(days=6), end_date))
+        end_date += timedelta(weeks=1)
+    return timesheets
+
+
+def render(timesheets: list, out_dir: Path, cold: bool) -> list[float]:
+    pdf_renderers.TimesheetPdfTemplate.clear_fonts()
+    timings = []
+    for i, timesheet in enumerate(timesheets):
+        if cold:
+            pdf_renderers.TimesheetPdfTemplate.clear_fonts()
+        start = time.perf_counter()
+        timesheet.to_pdf(out_dir / f"stub_{i:03d}.pdf")
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stubs", type=int, default=52)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            data = DataProvider(make_app_data_dir(temp_dir / "app_data", employees=1))
+            data.report_cache = None  # time the rendering, not cache hits
+            timesheets = build_timesheets(data, args.stubs)
+
+        print(f"{'mode':<6}{'stubs':>7}{'total (s)':>12}{'per stub (ms)':>16}{'first stub (ms)':>18}")
+        for mode in ("cold", "warm"):
+            with contextlib.redirect_stdout(io.StringIO()):
+                timings = render(timesheets, temp_dir, cold=mode == "cold")
+            total = sum(timings)
+            print(f"{mode:<6}{len(timings):>7}{total:>12.2f}{total / len(timings) * 1000:>16.1f}"
+                  f"{timings[0] * 1000:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
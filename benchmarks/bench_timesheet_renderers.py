@@ -0,0 +1,75 @@
+"""Benchmarks the pay stub pdf backends on a batch of stubs (500 by default: 10 employees x 50 weekly stubs).
+
+    python benchmarks/bench_timesheet_renderers.py [--stubs 500] [--renderers borb native]
+
+Every renderer draws the same stubs (the timesheet values are calculated up front and not timed), and the
+batch total and per stub time are reported for each."""
+
+__author__ = 'Sean Kraft'
+
+from datetime import timedelta
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import math
+import tempfile
+import time
+
+from synthetic_data import make_app_data_dir
+
+from data_provider import DataProvider
+import pdf_renderers
+import reports
+
+STUBS_PER_EMPLOYEE = 50
+
+
+def build_timesheets(data: DataProvider, stubs: int) -> list:
+    """Returns stubs weekly timesheets, STUBS_PER_EMPLOYEE per employee."""
+    year = data.tax_rates[0].year
+    timesheets = []
+    for employee in data.employees:
+        end_date = data.get_payroll_calendar(year).periods[0].pay_date
+        for _ in range(min(STUBS_PER_EMPLOYEE, stubs - len(timesheets))):
+            timesheets.append(reports.Timesheet(data, employee, end_date - timedelta(days=6), end_date))
+            end_date += timedelta(weeks=1)
+    return timesheets
+
+
+def render(timesheets: list, out_dir: Path, renderer: str) -> float:
+    pdf_renderers.TimesheetPdfTemplate.clear_fonts()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    start = time.perf_counter()
+    for i, timesheet in enumerate(timesheets):
+        timesheet.to_pdf(out_dir / f"stub_{i:03d}.pdf", renderer=renderer)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--stubs", type=int, default=500)
+    parser.add_argument("--renderers", nargs="+", default=list(pdf_renderers.TIMESHEET_RENDERERS),
+                        choices=list(pdf_renderers.TIMESHEET_RENDERERS))
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        with contextlib.redirect_stdout(io.StringIO()):
+            employees = math.ceil(args.stubs / STUBS_PER_EMPLOYEE)
+            data = DataProvider(make_app_data_dir(temp_dir / "app_data", employees=employees))
+            data.report_cache = None  # time the rendering, not cache hits
+            timesheets = build_timesheets(data, args.stubs)
+
+        print(f"{'renderer':<10}{'stubs':>7}{'total (s)':>12}{'per stub (ms)':>16}{'speedup':>10}")
+        baseline = None
+        for renderer in args.renderers:
+            with contextlib.redirect_stdout(io.StringIO()):
+                total = render(timesheets, temp_dir / renderer, renderer)
+            baseline = baseline or total
+            print(f"{renderer:<10}{len(timesheets):>7}{total:>12.2f}{total / len(timesheets) * 1000:>16.1f}"
+                  f"{baseline / total:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,343 @@
+"""Regression harness: runs a fixed synthetic household through every report, checks the numbers against golden
+files and the run time and memory of each operation against budgets.
+
+    python benchmarks/regression.py                      check (exits with 1 on any mismatch or budget overrun)
+    python benchmarks/regression.py --update-golden      accept the current outputs as the golden files
+    python benchmarks/regression.py --update-baseline    store the current timings as the comparison baseline
+
+The golden files (benchmarks/golden/<operation>.json) hold every computed value: pay stub TimesheetValues and leave
+balances, federal withholding amounts, EAMS rows, W-2 boxes, Schedule H lines, the pay periods recalculate() finds
+after tax rate corrections (and their changes in cents) and the text of the pay stub pdf layout. Money is compared
+to the cent (values are whole cents, see money.py). Only update them when a change in the numbers is intended, and
+say why in the commit.
+
+Each operation runs --repeat times on a fresh copy of the data (the best wall time counts), and once more under
+tracemalloc for its peak memory. The table compares both against BUDGETS (hard limits) and against the stored
+baseline (benchmarks/golden/baseline.json, informational: timings depend on the machine)."""
+
+__author__ = 'Sean Kraft'
+
+from dataclasses import asdict
+from dataclasses import fields
+from datetime import timedelta
+from pathlib import Path
+import argparse
+import contextlib
+import io
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from synthetic_data import make_app_data_dir
+
+from data_provider import DataProvider
+import money
+import pdf_renderers
+import reports
+
+GOLDEN_DIR = Path(__file__).parent / "golden"
+BASELINE_FILE = GOLDEN_DIR / "baseline.json"
+EMPLOYEES = 3  # one per W-4 filing status, one with box 2C checked
+YEARS = (2023, 2024)
+PDF_STUBS = 10  # pay stubs rendered per renderer
+WITHHOLDING_GROSS_PAYS = range(0, 5000_00, 137_50)  # cents, weekly gross pays to withhold from
+# operation -> (wall time budget in seconds, peak memory budget in MB)
+BUDGETS = {"load": (2.0, 40),
+           "timesheets": (10.0, 40),
+           "federal_withholding": (0.5, 5),
+           "eams": (1.0, 10),
+           "w2": (1.0, 10),
+           "schedule_h": (1.0, 10),
+           "recalculate": (2.0, 20),
+           "pdf_layout": (1.0, 10),
+           "pdf_borb": (20.0, 80),
+           "pdf_native": (5.0, 40)}
+
+
+def load(data: DataProvider) -> dict:
+    return {"employees": [employee.name for employee in data.employees],
+            "time_entries": sum(len(employee.time_entries) for employee in data.employees)}
+
+
+def run_timesheets(data: DataProvider) -> dict:
+    """Every weekly pay stub of the last year for every employee. Only the last stub's year to date values are kept
+    (they are the sum of the pay periods, so any change to a pay period shows up in both)."""
+    results = {}
+    for employee in data.employees:
+        stubs = {}
+        timesheet = None
+        for period in data.get_payroll_calendar(YEARS[-1]).periods:
+            timesheet = reports.Timesheet(data, employee, period.pay_date - timedelta(days=6), period.pay_date)
+            stubs[period.pay_date.isoformat()] = {"PayPeriod": timesheet.timesheet.as_dictionary(),
+                                                  "LeaveBalances": timesheet.leave_balances}
+        results[employee.name] = {"PayStubs": stubs, "YearToDate": timesheet.timesheet_ytd.as_dictionary()}
+    return results
+
+
+def run_federal_withholding(data: DataProvider) -> dict:
+    results = {}
+    for year in YEARS:
+        tax_rates = data.get_tax_rates(year=year)
+        for employee in data.employees:
+            results[f"{year} {employee.name}"] = [reports.calculate_federal_withholding(gross_pay, employee, tax_rates)
+                                                  for gross_pay in WITHHOLDING_GROSS_PAYS]
+    return results
+
+
+def eams_rows(quarterly_reports: list[reports.QuarterlyReportValues]) -> list:
+    return [[report.employee.name, report.hours, report.gross_pay] for report in quarterly_reports]
+
+
+def run_eams(data: DataProvider) -> dict:
+    results = {}
+    for year in YEARS:
+        yearly = reports.EAMSYearlyReport(data, year)
+        for quarter in yearly.quarterly_reports:
+            results[f"{year} Q{quarter}"] = eams_rows(reports.EAMSQuarterlyReport(data, year, quarter).reports)
+            results[f"{year} Q{quarter} yearly"] = eams_rows(yearly.get_reports(quarter))
+        results[f"{year} annual"] = eams_rows(yearly.annual_reports)
+    return results
+
+
+def run_w2(data: DataProvider) -> dict:
+    names = [field.name for field in fields(reports.W2ReportValues) if field.name != "employee"]
+    return {str(year): {values.employee.name: {name: getattr(values, name) for name in names}
+                        for values in reports.W2Report(data, year).reports} for year in YEARS}
+
+
+def run_schedule_h(data: DataProvider) -> dict:
+    results = {}
+    for year in YEARS:
+        report = reports.ScheduleHReport(data, year)
+        results[str(year)] = {"Lines": asdict(report.lines), "Discrepancies": report.reconcile()}
+    return results
+
+
+def recalculated_summary(periods: list) -> dict:
+    changes = {}
+    for period in periods:
+        for name, change in period.changes.items():
+            changes[name] = changes.get(name, 0) + change
+    return {"periods": len(periods),
+            "employees": sorted({period.employee.name for period in periods}),
+            "changes": dict(sorted(changes.items()))}
+
+
+def run_recalculate(data: DataProvider) -> dict:
+    """Corrects the medicare rate of the last year in tax_rates.json (picked up by reload_changed_files()), then raises
+    that year's FUTA taxable maximum the same way, then corrects the medicare rate of the first year in memory. Each
+    must report every pay period whose filed totals changed."""
+    def update_last_year(name: str, change: int or float) -> list:
+        all_rates = read_json(data.tax_rates_file)
+        for rates in all_rates:
+            if rates["TaxYear"] == YEARS[-1]:
+                rates[name] += change
+        with open(data.tax_rates_file, "w") as out_file:
+            json.dump(all_rates, out_file, indent=2)
+        change = data.reload_changed_files()
+        return change.recalculated if change is not None else []
+
+    reloaded = update_last_year("MedicareEmployee", 0.1)
+    stale_after_reload = len(data.recalculate())
+    futa_cap = update_last_year("FederalUnemploymentTaxableMaximum", 1000)
+
+    data.get_tax_rates(year=YEARS[0])._medicare_employee += 0.1
+    return {"reloaded": recalculated_summary(reloaded),
+            "stale_after_reload": stale_after_reload,
+            "futa_cap": recalculated_summary(futa_cap),
+            "in_memory": recalculated_summary(data.recalculate())}
+
+
+def get_pdf_timesheets(data: DataProvider) -> list[reports.Timesheet]:
+    employee = data.employees[0]
+    periods = data.get_payroll_calendar(YEARS[-1]).periods[:PDF_STUBS]
+    return [reports.Timesheet(data, employee, period.pay_date - timedelta(days=6), period.pay_date)
+            for period in periods]
+
+
+def run_pdf_layout(timesheets: list[reports.Timesheet]) -> list:
+    """The text of every cell of the pay stubs, as laid out for the pdf renderers."""
+    return [[[cell.text for cell in row] for row in pdf_renderers.build_timesheet_rows(timesheet)]
+            for timesheet in timesheets]
+
+
+def render_pdfs(timesheets: list[reports.Timesheet], renderer: str, out_dir: Path) -> dict:
+    """Renders the pay stubs (cold, without the shared fonts or the report cache). The pdf bytes aren't compared since
+    they depend on the pdf library version, what's drawn is checked by the pdf_layout operation."""
+    pdf_renderers.TimesheetPdfTemplate.clear_fonts()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    pdfs = 0
+    for i, timesheet in enumerate(timesheets):
+        file_path = out_dir / f"stub_{i:03d}.pdf"
+        timesheet.to_pdf(file_path, renderer=renderer)
+        with open(file_path, "rb") as in_file:
+            pdfs += in_file.read(5) == b"%PDF-"
+    return {"pdfs": pdfs}
+
+
+class Harness:
+    def __init__(self, work_dir: Path):
+        self.work_dir = work_dir
+        with contextlib.redirect_stdout(io.StringIO()):
+            self.source_dir = make_app_data_dir(work_dir / "source", employees=EMPLOYEES, years=YEARS)
+        self.runs = 0
+
+    def load_data(self) -> DataProvider:
+        """Loads a fresh copy of the synthetic data (reports save federal withholding into it)."""
+        self.runs += 1
+        app_data_dir = self.work_dir / f"run_{self.runs}"
+        shutil.copytree(self.source_dir, app_data_dir)
+        data = DataProvider(app_data_dir, use_snapshot=False)
+        data.report_cache = None  # time the work, not cache hits
+        return data
+
+    def get_operations(self) -> dict:
+        """Returns operation name -> (setup, run). Only run(setup()) is measured."""
+        out_dir = self.work_dir / "pdfs"
+        operations = {"load": (lambda: None, lambda _: load(self.load_data()))}
+        for name, run in (("timesheets", run_timesheets), ("federal_withholding", run_federal_withholding),
+                          ("eams", run_eams), ("w2", run_w2), ("schedule_h", run_schedule_h),
+                          ("recalculate", run_recalculate)):
+            operations[name] = (self.load_data, run)
+        operations["pdf_layout"] = (lambda: get_pdf_timesheets(self.load_data()), run_pdf_layout)
+        for renderer in pdf_renderers.TIMESHEET_RENDERERS:
+            operations[f"pdf_{renderer}"] = (lambda: get_pdf_timesheets(self.load_data()),
+                                             lambda timesheets, renderer=renderer: render_pdfs(timesheets, renderer,
+                                                                                               out_dir / renderer))
+        return operations
+
+
+def measure(setup, run, repeat: int) -> tuple[object, float, float]:
+    """Returns (result, best wall time in seconds, peak traced memory in MB)."""
+    result = None
+    best = None
+    for _ in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        result = run(args)
+        seconds = time.perf_counter() - start
+        best = seconds if best is None else min(best, seconds)
+
+    args = setup()
+    tracemalloc.start()
+    run(args)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, best, peak / 1024 / 1024
+
+
+def normalize(result) -> object:
+    """Round trips the result through json, so it compares equal to what's read back from a golden file."""
+    return json.loads(json.dumps(result, default=str))
+
+
+def compare(expected, actual, path: str = "", problems: list = None) -> list[str]:
+    """Returns the paths where actual differs from expected (money differences are shown in dollars)."""
+    problems = [] if problems is None else problems
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        for key in sorted(expected.keys() | actual.keys(), key=str):
+            if key not in actual or key not in expected:
+                problems.append(f"{path}/{key}: {'missing' if key not in actual else 'unexpected'}")
+            else:
+                compare(expected[key], actual[key], f"{path}/{key}", problems)
+    elif isinstance(expected, list) and isinstance(actual, list) and len(expected) == len(actual):
+        for i, (expected_item, actual_item) in enumerate(zip(expected, actual)):
+            compare(expected_item, actual_item, f"{path}[{i}]", problems)
+    elif expected != actual:
+        if isinstance(expected, int) and isinstance(actual, int) and not isinstance(expected, bool):
+            problems.append(f"{path}: expected {expected} got {actual} "
+                            f"(off by {money.format_dollars(actual - expected)} if cents)")
+        else:
+            problems.append(f"{path}: expected {expected!r} got {actual!r}")
+    return problems
+
+
+def read_json(file_path: Path):
+    if not file_path.exists():
+        return None
+    with open(file_path) as in_file:
+        return json.load(in_file)
+
+
+def format_json(value, indent: str = "") -> str:
+    """Formats the value as json with a line per nested container, keeping containers of plain values on a single
+    line (so the golden files stay small and a changed value shows up as a single changed line)."""
+    if isinstance(value, dict) and value:
+        items = [(json.dumps(str(key)), item) for key, item in sorted(value.items())]
+    elif isinstance(value, list) and value:
+        items = [(None, item) for item in value]
+    else:
+        return json.dumps(value)
+    if not any(isinstance(item, (dict, list)) for _, item in items):
+        return json.dumps(value, sort_keys=True)
+    inner = indent + " "
+    lines = [f"{inner}{key + ': ' if key else ''}{format_json(item, inner)}" for key, item in items]
+    brackets = "{}" if isinstance(value, dict) else "[]"
+    return brackets[0] + "\n" + ",\n".join(lines) + "\n" + indent + brackets[1]
+
+
+def write_json(file_path: Path, value):
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "w") as out_file:
+        out_file.write(format_json(value) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--operations", nargs="+", choices=list(BUDGETS), default=list(BUDGETS))
+    parser.add_argument("--update-golden", action="store_true", help="Write the outputs as the golden files.")
+    parser.add_argument("--update-baseline", action="store_true", help="Store the timings as the baseline.")
+    parser.add_argument("--max-problems", type=int, default=10, help="Golden mismatches shown per operation.")
+    args = parser.parse_args()
+
+    baseline = read_json(BASELINE_FILE) or {}
+    measured = {}
+    failures = 0
+    print(f"{'operation':<22}{'time (s)':>10}{'baseline':>10}{'ratio':>8}{'budget':>8}"
+          f"{'peak MB':>9}{'baseline':>10}{'budget':>8}  result")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        harness = Harness(Path(temp_dir))
+        operations = harness.get_operations()
+        for name in args.operations:
+            setup, run = operations[name]
+            with contextlib.redirect_stdout(io.StringIO()):
+                result, seconds, peak = measure(setup, run, args.repeat)
+            result = normalize(result)
+            measured[name] = {"seconds": round(seconds, 4), "peak_mb": round(peak, 2)}
+
+            golden_file = GOLDEN_DIR / f"{name}.json"
+            if args.update_golden:
+                write_json(golden_file, result)
+            golden = read_json(golden_file)
+            problems = ["no golden file (run with --update-golden)"] if golden is None else compare(golden, result)
+            time_budget, memory_budget = BUDGETS[name]
+            if seconds > time_budget:
+                problems.append(f"took {seconds:.2f}s, over the {time_budget}s budget")
+            if peak > memory_budget:
+                problems.append(f"peaked at {peak:.1f} MB, over the {memory_budget} MB budget")
+            failures += bool(problems)
+
+            base = baseline.get(name, {})
+            base_seconds = base.get("seconds")
+            ratio = f"{seconds / base_seconds:.2f}x" if base_seconds else "-"
+            print(f"{name:<22}{seconds:>10.3f}{base_seconds or '-':>10}{ratio:>8}{time_budget:>8}"
+                  f"{peak:>9.1f}{base.get('peak_mb', '-'):>10}{memory_budget:>8}  {'FAIL' if problems else 'ok'}")
+            for problem in problems[:args.max_problems]:
+                print(f"    ERROR: {problem}")
+            if len(problems) > args.max_problems:
+                print(f"    ... and {len(problems) - args.max_problems} more")
+
+    if args.update_baseline:
+        write_json(BASELINE_FILE, {**baseline, **measured})
+        print(f"{BASELINE_FILE} saved.")
+    if failures:
+        print(f"{failures} of {len(args.operations)} operations failed.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
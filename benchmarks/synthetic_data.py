@@ -0,0 +1,109 @@
+"""Builds a synthetic app data directory for benchmarks.
+
+The data is generated from a fixed seed, so every run (and every machine) produces identical inputs."""
+
+__author__ = 'Sean Kraft'
+
+from datetime import date as Date
+from datetime import timedelta
+from pathlib import Path
+import json
+import random
+import sys
+
+PROJECT_ROOT = Path(__file__).parents[1]
+if str(PROJECT_ROOT) not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT))
+
+import config
+
+# a simplified annual percentage method table (same brackets for every filing status)
+PERCENTAGE_TABLE = [{"A": 0, "B": 14800, "C": 0, "D": 0, "E": 0},
+                    {"A": 14800, "B": 36800, "C": 0, "D": 10, "E": 14800},
+                    {"A": 36800, "B": 104250, "C": 2200, "D": 12, "E": 36800},
+                    {"A": 104250, "B": 205550, "C": 10294, "D": 22, "E": 104250},
+                    {"A": 205550, "B": -1, "C": 32580, "D": 24, "E": 205550}]
+
+FIRST_NAMES = ["Mary", "Fran", "Joe", "Maria", "Alice", "Phoebe", "Nana", "Jo"]
+LAST_NAMES = ["Poppins", "Fine", "Nanny", "Rainer", "Hazel", "Figalilly", "Darling", "Frost"]
+
+
+def make_tax_rates(year: int) -> dict:
+    tables = {"Married": PERCENTAGE_TABLE, "Single": PERCENTAGE_TABLE, "Head": PERCENTAGE_TABLE}
+    return {"TaxYear": year,
+            "MedicareEmployee": 1.45,
+            "MedicareCompany": 1.45,
+            "SocialSecurityEmployee": 6.2,
+            "SocialSecurityCompany": 6.2,
+            "SocialSecurityTaxableMaximum": 168600,
+            "WAPaidFamilyMedicalLeaveEmployee": 0.5808,
+            "WAPaidFamilyMedicalLeaveCompany": 0.2192,
+            "WACares": 0.58,
+            "FederalUnemployment": 0.6,
+            "FederalUnemploymentTaxableMaximum": 7000,
+            "StateUnemployment": 1.2,
+            "MilageReimbursementRate": 67,
+            "FederalWithholding": {"Worksheet1A_1G_Married": 12900,
+                                   "Worksheet1A_1G_NotMarried": 8600,
+                                   "PercentageTables": {"MultipleJobsNotChecked": tables,
+                                                        "MultipleJobsChecked": tables}}}
+
+
+def make_app_data_dir(root: Path, employees: int = 3, years: tuple = (2024,), seed: int = 0) -> Path:
+    """Writes a complete app data directory under root with weekday time entries for every year and returns it."""
+    rng = random.Random(seed)
+    app_data_dir = Path(root)
+    app_data_dir.mkdir(parents=True, exist_ok=True)
+
+    with open(app_data_dir / config.TAX_RATES_FILE_NAME, "w") as outfile:
+        json.dump([make_tax_rates(year) for year in years], outfile, indent=2)
+
+    employer = {"Name": "Synthetic Household", "EIN": "12-3456789", "BusinessID": "600000000",
+                "AddressLine1": "100 Main St", "AddressLine2": "Seattle, WA 98101", "AddressLine3": "",
+                "PayrollDayOfWeek": 4}
+    with open(app_data_dir / config.EMPLOYER_FILE_NAME, "w") as outfile:
+        json.dump(employer, outfile, indent=2)
+
+    holidays = [{"Name": "New Year's Day", "Date": Date(year, 1, 1).isoformat()} for year in years]
+    holidays += [{"Name": "Independence Day", "Date": Date(year, 7, 4).isoformat()} for year in years]
+    with open(app_data_dir / config.PAID_HOLIDAYS_FILE_NAME, "w") as outfile:
+        json.dump(holidays, outfile, indent=2)
+
+    holiday_dates = {holiday["Date"] for holiday in holidays}
+    for i in range(employees):
+        first_name = FIRST_NAMES[i % len(FIRST_NAMES)]
+        last_name = f"{LAST_NAMES[i % len(LAST_NAMES)]}{i // len(LAST_NAMES) or ''}"
+        file_name = f"{first_name}{last_name}"
+        pay_rate = 22 + i * 1.5
+        employee_dir = app_data_dir / config.EMPLOYEES_DIR_NAME / file_name
+        employee_dir.mkdir(parents=True, exist_ok=True)
+
+        employee = {"FirstName": first_name, "LastName": last_name, "MiddleName": "", "SSN": f"555-01-{i:04d}",
+                    "PayRate": pay_rate, "PaidVacationHoursPerYear": 80, "PaidSickHoursPerYear": 40,
+                    "PaidHolidayHoursPerYear": 48, "AddressLine1": f"{i + 1} Elm St",
+                    "AddressLine2": "Tacoma, WA 98402", "AddressLine3": "",
+                    "W4": {"1C": ["Single", "Married", "Head"][i % 3], "2C": i % 4 == 1, "3": 0, "4A": 0, "4B": 0,
+                           "4C": 0, "PayPeriodsPerYear": 52}}
+        with open(employee_dir / f"{file_name}.json", "w") as outfile:
+            json.dump(employee, outfile, indent=2)
+
+        time_entries = []
+        for year in years:
+            day = Date(year, 1, 1)
+            while day.year == year:
+                if day.weekday() < 5:
+                    entry = {"Date": day.isoformat(), "TaxYear": year, "Hours": rng.choice([8, 8, 7.5, 8.25, 6]),
+                             "PayRate": pay_rate, "PayType": 0}
+                    if day.isoformat() in holiday_dates:
+                        entry["PayType"] = 2
+                        entry["Note"] = "Holiday"
+                    elif rng.random() < 0.03:
+                        entry["PayType"] = rng.choice([1, 3])
+                    if rng.random() < 0.1:
+                        entry["Reimbursement"] = round(rng.random() * 40, 2)
+                    time_entries.append(entry)
+                day += timedelta(days=1)
+        with open(employee_dir / f"{file_name}_TimeEntries.json", "w") as outfile:
+            json.dump(time_entries, outfile, indent=2)
+
+    return app_data_dir
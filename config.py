@@ -12,15 +12,49 @@ STUB_TAX_RATES_FILE = STUB_DATA_DIR / 'stub_tax_rates.json'
 STUB_EMPLOYER_FILE = STUB_DATA_DIR / 'stub_employer.json'
 STUB_EMPLOYEE_FILE = STUB_DATA_DIR / 'stub_employee.json'
 
+# app data file names (relative to an app data directory)
+TAX_RATES_FILE_NAME = 'tax_rates.json'
+EMPLOYER_FILE_NAME = 'employer.json'
+PAID_HOLIDAYS_FILE_NAME = 'paid_holidays.json'
+EMPLOYEES_DIR_NAME = 'Employees'
+SNAPSHOT_FILE_NAME = 'snapshot.bin'
+REPORT_CACHE_DIR_NAME = 'ReportCache'
+
 # app data locations
-APP_DATA_DIR = Path(os.getenv('APPDATA')) / 'NannyPayrollManager'
-TAX_RATES_FILE = APP_DATA_DIR / 'tax_rates.json'
-EMPLOYER_FILE = APP_DATA_DIR / 'employer.json'
-PAID_HOLIDAYS_FILE = APP_DATA_DIR / 'paid_holidays.json'
-EMPLOYEES_DIR = APP_DATA_DIR / 'Employees'
+APP_DATA_DIR = Path(os.getenv('APPDATA', Path.home() / '.config')) / 'NannyPayrollManager'
+TAX_RATES_FILE = APP_DATA_DIR / TAX_RATES_FILE_NAME
+EMPLOYER_FILE = APP_DATA_DIR / EMPLOYER_FILE_NAME
+PAID_HOLIDAYS_FILE = APP_DATA_DIR / PAID_HOLIDAYS_FILE_NAME
+EMPLOYEES_DIR = APP_DATA_DIR / EMPLOYEES_DIR_NAME
+
+# max number of employee and time entry files read at once when loading the app data directory
+LOADER_MAX_WORKERS = 8
+
+# warm start: save the loaded data to a snapshot and only reload the files that changed since (see snapshot.py)
+USE_SNAPSHOT = True
+
+# multi-household workspaces: max number of households loaded or processed at once (None uses the python default)
+WORKSPACE_MAX_WORKERS = None
+
+# generated reports are cached by a hash of their inputs, up to this many bytes on disk (see report_cache.py)
+USE_REPORT_CACHE = True
+REPORT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+# pay stub pdf backend: "borb" or "native" (see pdf_renderers.py)
+TIMESHEET_RENDERER = "borb"
+
+# how often (in milliseconds) the UI checks the app data directory for files changed outside the app (0 disables it)
+WATCH_INTERVAL_MS = 2000
+
+# local json api (see api_server.py). only loopback addresses are allowed
+API_HOST = "127.0.0.1"
+API_PORT = 8765
 
 # default timesheet location
 TIMESHEET_DIR = Path.home() / "Downloads"
 
 # washington state EAMS standard occupational code
-EAMS_OCCUPATIONAL_CODE = "399011"  # Childcare Workers
\ No newline at end of file
+EAMS_OCCUPATIONAL_CODE = "399011"  # Childcare Workers
+
+# state the employer pays unemployment contributions to (Schedule H line 13)
+UNEMPLOYMENT_STATE = "WA"
@@ -2,13 +2,31 @@
 __author__ = 'Sean Kraft'
 
 import calendar
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 from datetime import date as Date
 from pathlib import Path
 from enum import Enum
+from operator import attrgetter
 import config
+import money
+import payroll_calendar
+import snapshot
+import withholding_tables
+from payroll_calendar import get_pay_date
+from leave_ledger import AccrualRule
+from leave_ledger import LeaveLedger
+from leave_ledger import default_rules
+from report_cache import ReportCache
 import shutil
 import json
 import re
+import time
+
+_UNSET = object()  # sentinel for attributes that haven't been assigned yet
+
+WA_CARES_START_DATE = Date(2023, 7, 1)  # the WA cares contribution goes into effect on July 1, 2023
+PERIOD_TOTALS_VERSION = 2  # bump whenever the way pay period totals are calculated changes, so saved totals are redone
 
 
 class DuplicateEntryError(Exception):
@@ -46,6 +64,7 @@ class Employee:
         self.paid_vacation: int or float = kwargs.get("paid_vacation")  # in hours
         self.paid_sick: int or float = kwargs.get("paid_sick")  # in hours
         self.paid_holidays: int or float = kwargs.get("paid_holidays")  # in hours
+        self.leave_rules: list[AccrualRule] = kwargs.get("leave_rules")  # None for the default rules
         self.address_line_1: str = kwargs.get("address_line_1")
         self.address_line_2: str = kwargs.get("address_line_2")
         self.address_line_3: str = kwargs.get("address_line_3")
@@ -53,8 +72,25 @@ class Employee:
         self.time_entries: list[TimeEntry] = []
 
         self._time_entries_dirty = False  # for tracking if a write to disk is needed
+        self._time_entries_load_failed = False  # if the time entries file couldn't be read, it must not be saved over
         self.appdata_path: Path = None
 
+        self.period_totals: dict[Date, TimesheetValues] = {}  # pay date -> pay period totals (see get_period_totals)
+        self._period_totals_stale: set[int] = set()  # years whose pay period totals need to be recalculated
+        self._period_totals_rates: dict[int, int or None] = {}  # year -> version of the tax rates its totals used
+        self._period_totals_dirty = False  # for tracking if a write to disk is needed
+
+        self._leave_ledger: LeaveLedger = None  # see leave_ledger
+
+    @property
+    def leave_ledger(self) -> LeaveLedger:
+        if self._leave_ledger is None:
+            rules = self.leave_rules
+            if rules is None:
+                rules = default_rules(self.paid_vacation, self.paid_sick, self.paid_holidays)
+            self._leave_ledger = LeaveLedger(rules)
+        return self._leave_ledger
+
     @property
     def address(self):
         address = self.address_line_1
@@ -81,6 +117,25 @@ class Employee:
     def __repr__(self):
         return f"Employee(name={self.name}, pay_rate={self.pay_rate})"
 
+    def as_dictionary(self):
+        """Returns the employee data as a dictionary. (in the employee json format)"""
+        out_dict = {"FirstName": self.first_name,
+                    "LastName": self.last_name,
+                    "MiddleName": self.middle_name,
+                    "SSN": self.ssn,
+                    "PayRate": self.pay_rate,
+                    "PaidVacationHoursPerYear": self.paid_vacation,
+                    "PaidSickHoursPerYear": self.paid_sick,
+                    "PaidHolidayHoursPerYear": self.paid_holidays,
+                    "AddressLine1": self.address_line_1,
+                    "AddressLine2": self.address_line_2,
+                    "AddressLine3": self.address_line_3}
+        if self.leave_rules is not None:
+            out_dict["LeaveAccrual"] = [rule.as_dictionary() for rule in self.leave_rules]
+        if self.w4 is not None:
+            out_dict["W4"] = self.w4.as_dictionary()
+        return out_dict
+
 
 class Employer:
     def __init__(self, **kwargs):
@@ -91,6 +146,10 @@ class Employer:
         self.address_line_2: str = kwargs.get("address_line_2")
         self.address_line_3: str = kwargs.get("address_line_3")
         self.payroll_day: int = kwargs.get("payroll_day")
+        self.bso_user_id: str = kwargs.get("bso_user_id")  # SSA Business Services Online user id (for EFW2 files)
+        self.contact_name: str = kwargs.get("contact_name")
+        self.contact_phone: str = kwargs.get("contact_phone")
+        self.contact_email: str = kwargs.get("contact_email")
 
     @property
     def address(self):
@@ -117,6 +176,20 @@ class Employer:
     def __repr__(self):
         return f"Employer(name={self.name}, address={self.address})"
 
+    def as_dictionary(self):
+        """Returns the employer data as a dictionary. (in the employer json format)"""
+        return {"Name": self.name,
+                "EIN": self.ein,
+                "BusinessID": self.business_id,
+                "AddressLine1": self.address_line_1,
+                "AddressLine2": self.address_line_2,
+                "AddressLine3": self.address_line_3,
+                "PayrollDayOfWeek": self.payroll_day,
+                "BSOUserID": self.bso_user_id,
+                "ContactName": self.contact_name,
+                "ContactPhone": self.contact_phone,
+                "ContactEmail": self.contact_email}
+
 
 class EmployeeW4:
     def __init__(self, **kwargs):
@@ -131,9 +204,22 @@ class EmployeeW4:
     def __repr__(self):
         return f"EmployeeW4('1C'={self.line_1C}, '2C'={self.line_2C}, '3'={self.line_3}, 'pay_periods_per_year'={self.pay_periods_per_year})"
 
+    def as_dictionary(self):
+        """Returns the W4 data as a dictionary. (in the employee json format)"""
+        return {"1C": self.line_1C.name.capitalize() if self.line_1C is not None else None,
+                "2C": self.line_2C,
+                "3": self.line_3,
+                "4A": self.line_4A,
+                "4B": self.line_4B,
+                "4C": self.line_4C,
+                "PayPeriodsPerYear": self.pay_periods_per_year}
+
 
 class TaxRates:
+    _versions = itertools.count(1)  # shared by every TaxRates, so a version is unique across instances
+
     def __init__(self, **kwargs):
+        self.version: int = next(self._versions)  # changes whenever any rate value changes
         self.year: int = kwargs.get("year")
         self._medicare_employee: int or float = kwargs.get("medicare_employee")  # percent value: ie 1.45%
         self._medicare_company: int or float = kwargs.get("medicare_company")  # percent value: ie 1.45%
@@ -147,10 +233,46 @@ class TaxRates:
         self.federal_unemployment_taxable_max: int = kwargs.get("federal_unemployment_taxable_max")
         self._state_unemployment: int or float = kwargs.get("state_unemployment")  # percent value: ie 1.45%
         self.milage_reimbursement_rate: int or float = kwargs.get("milage_reimbursement_rate")  # in cents per mile
+        # cash wages an employee must be paid in the year before social security and medicare taxes are owed
+        self.household_cash_wage_threshold: int or float = kwargs.get("household_cash_wage_threshold")
         self.federal_withholding: dict = kwargs.get("federal_withholding")
 
     def __repr__(self):
-        return f"TaxRates(year={self.year})"
+        return f"TaxRates(year={self.year}, version={self.version})"
+
+    def __setattr__(self, name, value):
+        """Assigning a new value to any rate bumps the version, which invalidates the cached TimeEntry values."""
+        changed = name != "version" and not name.startswith("_cache") and self.__dict__.get(name, _UNSET) != value
+        object.__setattr__(self, name, value)
+        if changed:
+            self.touch()
+
+    def as_dictionary(self):
+        """Returns the tax rates as a dictionary. (in the tax rates json format)"""
+        return {"TaxYear": self.year,
+                "MedicareEmployee": self._medicare_employee,
+                "MedicareCompany": self._medicare_company,
+                "SocialSecurityEmployee": self._ss_employee,
+                "SocialSecurityCompany": self._ss_company,
+                "SocialSecurityTaxableMaximum": self.ss_taxable_max,
+                "WAPaidFamilyMedicalLeaveEmployee": self._wa_paid_fml_employee,
+                "WAPaidFamilyMedicalLeaveCompany": self._wa_paid_fml_company,
+                "WACares": self._wa_cares,
+                "FederalUnemployment": self._federal_unemployment,
+                "FederalUnemploymentTaxableMaximum": self.federal_unemployment_taxable_max,
+                "StateUnemployment": self._state_unemployment,
+                "MilageReimbursementRate": self.milage_reimbursement_rate,
+                "HouseholdCashWageThreshold": self.household_cash_wage_threshold,
+                "FederalWithholding": self.federal_withholding}
+
+    def touch(self):
+        """Bumps the version. (call after changing the federal_withholding tables in place)"""
+        object.__setattr__(self, "version", next(self._versions))
+
+    @classmethod
+    def skip_versions(cls, version: int):
+        """Makes sure new versions are greater than version (ie after restoring TaxRates from a snapshot)."""
+        cls._versions = itertools.count(max(next(cls._versions), version + 1))
 
     @property
     def medicare_employee(self):
@@ -197,22 +319,53 @@ class TaxRates:
         """The decimal version of the percentage for use in calculations."""
         return self._state_unemployment / 100
 
+    @property
+    def rates(self) -> dict[str, int]:
+        """The percentages as integer rate units (see money.py), keyed by the name of the matching property."""
+        if self.__dict__.get("_cache_rates_version") != self.version:
+            self._cache_rates = {name: money.percent_to_rate(getattr(self, f"_{name}")) for name in
+                                 ("medicare_employee", "medicare_company", "ss_employee", "ss_company",
+                                  "wa_paid_fml_employee", "wa_paid_fml_company", "wa_cares", "federal_unemployment",
+                                  "state_unemployment")}
+            self._cache_rates_version = self.version
+        return self._cache_rates
+
+    @property
+    def ss_taxable_max_cents(self) -> int:
+        return money.to_cents(self.ss_taxable_max)
+
+    @property
+    def federal_unemployment_taxable_max_cents(self) -> int:
+        return money.to_cents(self.federal_unemployment_taxable_max)
+
+    @property
+    def household_cash_wage_threshold_cents(self) -> int:
+        return money.to_cents(self.household_cash_wage_threshold)
+
+    @staticmethod
+    def get_federal_withholding_keys(employee: Employee) -> tuple[str, str]:
+        """Returns the (section, filing status) keys of the percentage method table based on the employee's W4."""
+        section = "MultipleJobsChecked" if employee.w4.line_2C else "MultipleJobsNotChecked"
+        if employee.w4.line_1C is W4FilingStatus.MARRIED:
+            return section, "Married"
+        elif employee.w4.line_1C is W4FilingStatus.SINGLE:
+            return section, "Single"
+        return section, "Head"
+
     def get_federal_withholding_table(self, employee: Employee) -> list[dict]:
         """Returns the appropriate section of the percentage method table based on the employee's W4 values."""
-        if employee.w4.line_2C:  # if multiple jobs is checked
-            if employee.w4.line_1C is W4FilingStatus.MARRIED:
-                return self.federal_withholding["PercentageTables"]["MultipleJobsChecked"]["Married"]
-            elif employee.w4.line_1C is W4FilingStatus.SINGLE:
-                return self.federal_withholding["PercentageTables"]["MultipleJobsChecked"]["Single"]
-            else:
-                return self.federal_withholding["PercentageTables"]["MultipleJobsChecked"]["Head"]
-        else:
-            if employee.w4.line_1C is W4FilingStatus.MARRIED:
-                return self.federal_withholding["PercentageTables"]["MultipleJobsNotChecked"]["Married"]
-            elif employee.w4.line_1C is W4FilingStatus.SINGLE:
-                return self.federal_withholding["PercentageTables"]["MultipleJobsNotChecked"]["Single"]
-            else:
-                return self.federal_withholding["PercentageTables"]["MultipleJobsNotChecked"]["Head"]
+        section, status = self.get_federal_withholding_keys(employee)
+        return self.federal_withholding["PercentageTables"][section][status]
+
+    def get_compiled_federal_withholding_table(self, employee: Employee) -> dict:
+        """Returns the employee's percentage method table in the compiled bisect form (see withholding_tables.py).
+        The tables are compiled from "PercentageTables" once per version, so hand edits to them are always used."""
+        if self.__dict__.get("_cache_compiled_version") != self.version:
+            self._cache_compiled = withholding_tables.compile_percentage_tables(
+                self.federal_withholding["PercentageTables"])
+            self._cache_compiled_version = self.version
+        section, status = self.get_federal_withholding_keys(employee)
+        return self._cache_compiled[section][status]
 
 
 class PaidHoliday:
@@ -234,7 +387,13 @@ class PaidHoliday:
 
 
 class TimeEntry:
+    # changing any of these bumps the revision (which invalidates the cached calculated values)
+    REVISION_FIELDS = {"date", "tax_year", "hours", "pay_rate", "pay_type", "federal_withholding", "reimbursement"}
+    # the values that can be changed after an entry is added (see DataProvider.update_time_entry)
+    EDITABLE_FIELDS = {"date", "hours", "pay_rate", "pay_type", "reimbursement", "note"}
+
     def __init__(self, **kwargs):
+        self.revision: int = 0
         self.date: Date = kwargs.get("date")
         self.tax_year: int = kwargs.get("tax_year")
         self.hours: int or float = kwargs.get("hours")
@@ -246,106 +405,105 @@ class TimeEntry:
 
         self.tax_rates: TaxRates = None
 
+        self._cache = {}  # calculated values, valid while _cache_stamp matches self.cache_stamp
+        self._cache_stamp = None
+
     def __repr__(self):
         return f"TimeEntry(date={self.date}, tax_year={self.tax_year}, hours={self.hours}, pay_rate={self.pay_rate}, " \
                f"pay_type={self.pay_type}, federal_withholding={self.federal_withholding}, note={self.note})"
 
+    def __setattr__(self, name, value):
+        if name in self.REVISION_FIELDS and self.__dict__.get(name, _UNSET) != value:
+            self.__dict__["revision"] = self.__dict__.get("revision", 0) + 1
+        object.__setattr__(self, name, value)
+
+    @property
+    def cache_stamp(self) -> tuple[int, int or None]:
+        """The (revision, tax rates version) the calculated values depend on."""
+        return self.revision, self.tax_rates.version if self.tax_rates is not None else None
+
+    def _cached(self, name: str, calculate):
+        """Returns the cached value for name, recalculating everything cached if the stamp has changed."""
+        stamp = self.cache_stamp
+        if self._cache_stamp != stamp:
+            self._cache = {}
+            self._cache_stamp = stamp
+        try:
+            return self._cache[name]
+        except KeyError:
+            value = self._cache[name] = calculate()
+            return value
+
     @property
     def gross_pay(self) -> float:
         """Returns the gross pay from this time entry."""
-        try:
-            return self._gross_pay
-        except AttributeError:
-            self._gross_pay = self.pay_rate * self.hours
-            return self._gross_pay
+        return self._cached("gross_pay", lambda: self.pay_rate * self.hours)
+
+    @property
+    def gross_pay_cents(self) -> int:
+        """Returns the gross pay from this time entry in cents (rounded to the nearest cent)."""
+        return self._cached("gross_pay_cents", lambda: money.multiply_hours(money.to_cents(self.pay_rate),
+                                                                            money.to_hundredths(self.hours)))
+
+    @property
+    def federal_withholding_cents(self) -> int:
+        return money.to_cents(self.federal_withholding)
+
+    @property
+    def reimbursement_cents(self) -> int:
+        return money.to_cents(self.reimbursement)
 
     @property
     def medicare_employee(self) -> float:
         """Returns the medicare employee withholding amount. (self.tax_rates must be populated)"""
-        try:
-            return self._medicare_employee
-        except AttributeError:
-            self._medicare_employee = self.gross_pay * self.tax_rates.medicare_employee
-            return self._medicare_employee
+        return self._cached("medicare_employee", lambda: self.gross_pay * self.tax_rates.medicare_employee)
 
     @property
     def medicare_company(self) -> float:
         """Returns the medicare company contribution amount. (self.tax_rates must be populated)"""
-        try:
-            return self._medicare_company
-        except AttributeError:
-            self._medicare_company = self.gross_pay * self.tax_rates.medicare_company
-            return self._medicare_company
+        return self._cached("medicare_company", lambda: self.gross_pay * self.tax_rates.medicare_company)
 
     @property
     def ss_employee(self) -> float:
         """Returns the social security employee withholding amount. (self.tax_rates must be populated)"""
-        try:
-            return self._ss_employee
-        except AttributeError:
-            self._ss_employee = self.gross_pay * self.tax_rates.ss_employee
-            return self._ss_employee
+        return self._cached("ss_employee", lambda: self.gross_pay * self.tax_rates.ss_employee)
 
     @property
     def ss_company(self) -> float:
         """Returns the social security company contribution amount. (self.tax_rates must be populated)"""
-        try:
-            return self._ss_company
-        except AttributeError:
-            self._ss_company = self.gross_pay * self.tax_rates.ss_company
-            return self._ss_company
+        return self._cached("ss_company", lambda: self.gross_pay * self.tax_rates.ss_company)
 
     @property
     def wa_paid_fml_employee(self) -> float:
         """Returns the employee portion of the WA paid family and medical leave withholding amount.
         NOTE that this is a percentage (72.76% for 2023) of the total premium and for companies
         with less than 50 employees, is the only amount that needs to be withheld."""
-        try:
-            return self._wa_paid_fml_employee
-        except AttributeError:
-            self._wa_paid_fml_employee = self.gross_pay * self.tax_rates.wa_paid_fml_employee
-            return self._wa_paid_fml_employee
+        return self._cached("wa_paid_fml_employee", lambda: self.gross_pay * self.tax_rates.wa_paid_fml_employee)
 
     @property
     def wa_paid_fml_company(self) -> float:
         """Returns the company portion of the WA paid family and medical leave withholding amount.
         NOTE: This is optional for companies with less than 50 employees."""
-        try:
-            return self._wa_paid_fml_company
-        except AttributeError:
-            self._wa_paid_fml_company = self.gross_pay * self.tax_rates.wa_paid_fml_company
-            return self._wa_paid_fml_company
+        return self._cached("wa_paid_fml_company", lambda: self.gross_pay * self.tax_rates.wa_paid_fml_company)
 
     @property
     def wa_cares(self) -> float:
         """Returns the WA cares withholding amount (if date is after July 1, 2023)"""
-        try:
-            return self._wa_cares
-        except AttributeError:
-            start_day = Date(2023, 7, 1)  # this contribution goes into effect on July 1, 2023
-            self._wa_cares = self.gross_pay * self.tax_rates.wa_cares if self.date >= start_day else 0
-            return self._wa_cares
+        return self._cached("wa_cares", lambda: (self.gross_pay * self.tax_rates.wa_cares
+                                                 if self.date >= WA_CARES_START_DATE else 0))
 
     @property
     def employee_taxes_withheld(self) -> float:
         """Returns the total employee taxes withheld. (self.tax_rates must be populated)"""
-        try:
-            return self._employee_taxes_withheld
-        except AttributeError:
-            self._employee_taxes_withheld = (self.medicare_employee +
-                                             self.ss_employee +
-                                             self.wa_paid_fml_employee +
-                                             self.wa_cares)
-            return self._employee_taxes_withheld
+        return self._cached("employee_taxes_withheld", lambda: (self.medicare_employee +
+                                                                self.ss_employee +
+                                                                self.wa_paid_fml_employee +
+                                                                self.wa_cares))
 
     @property
     def net_pay(self) -> float:
         """Returns the employees pay after tax withholdings (not including reimbursements)."""
-        try:
-            return self._net_pay
-        except AttributeError:
-            self._net_pay = self.gross_pay - self.employee_taxes_withheld
-            return self._net_pay
+        return self._cached("net_pay", lambda: self.gross_pay - self.employee_taxes_withheld)
 
     @property
     def check_amount(self) -> float:
@@ -355,32 +513,20 @@ class TimeEntry:
     @property
     def federal_unemployment(self) -> float:
         """Returns the federal unemployment company contribution amount."""
-        try:
-            return self._federal_unemployment
-        except AttributeError:
-            self._federal_unemployment = self.gross_pay * self.tax_rates.federal_unemployment
-            return self._federal_unemployment
+        return self._cached("federal_unemployment", lambda: self.gross_pay * self.tax_rates.federal_unemployment)
 
     @property
     def state_unemployment(self) -> float:
         """Returns the state unemployment company contribution amount."""
-        try:
-            return self._state_unemployment
-        except AttributeError:
-            self._state_unemployment = self.gross_pay * self.tax_rates.state_unemployment
-            return self._state_unemployment
+        return self._cached("state_unemployment", lambda: self.gross_pay * self.tax_rates.state_unemployment)
 
     @property
     def company_tax_contributions(self) -> float:
-        try:
-            return self._company_tax_contributions
-        except AttributeError:
-            self._company_tax_contributions = (self.medicare_company +
-                                               self.ss_company +
-                                               self.wa_paid_fml_company +
-                                               self.federal_unemployment +
-                                               self.state_unemployment)
-            return self._company_tax_contributions
+        return self._cached("company_tax_contributions", lambda: (self.medicare_company +
+                                                                  self.ss_company +
+                                                                  self.wa_paid_fml_company +
+                                                                  self.federal_unemployment +
+                                                                  self.state_unemployment))
 
     @property
     def company_total_costs(self) -> float:
@@ -415,10 +561,191 @@ class TimeEntry:
         self.note = in_dict.get("Note")  # this is an optional field
 
 
-class DataProvider:
+class TimesheetValues:
+    """Pay stub values for a pay period or year to date. Money values are in whole cents (see money.py)."""
+    MONEY_FIELDS = ("reimbursements", "gross_pay", "medicare_employee", "ss_employee", "wa_paid_fml_employee",
+                    "wa_cares", "employee_taxes_withheld", "net_pay", "check_amount", "medicare_company", "ss_company",
+                    "wa_paid_fml_company", "federal_unemployment", "state_unemployment", "company_tax_contributions",
+                    "company_total_costs", "federal_withholding")
+    HOURS_FIELDS = ("hours", "paid_time_off_hours", "paid_holiday_hours", "paid_sick_hours")
+
     def __init__(self):
+        self.hours: int or float = 0
+        self.reimbursements: int = 0
+        self.gross_pay: int = 0
+        self.medicare_employee: int = 0
+        self.ss_employee: int = 0
+        self.wa_paid_fml_employee: int = 0
+        self.wa_cares: int = 0
+        self.employee_taxes_withheld: int = 0
+        self.net_pay: int = 0
+        self.check_amount: int = 0
+        self.medicare_company: int = 0
+        self.ss_company: int = 0
+        self.wa_paid_fml_company: int = 0
+        self.federal_unemployment: int = 0
+        self.state_unemployment: int = 0
+        self.company_tax_contributions: int = 0
+        self.company_total_costs: int = 0
+
+        self.federal_withholding: int = 0
+
+        self.paid_time_off_hours: int or float = 0
+        self.paid_holiday_hours: int or float = 0
+        self.paid_sick_hours: int or float = 0
+
+    JSON_KEYS = {name: "".join(word.title() for word in name.split("_")) for name in MONEY_FIELDS + HOURS_FIELDS}
+
+    def add(self, other: 'TimesheetValues'):
+        """Adds another set of values (ie a pay period) to these values."""
+        for name in self.MONEY_FIELDS + self.HOURS_FIELDS:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def as_dictionary(self):
+        """Returns the values as a dictionary. (so they can be written to json)"""
+        return {key: getattr(self, name) for name, key in self.JSON_KEYS.items()}
+
+    def populate_from_dictionary(self, in_dict):
+        """Populates the values from a provided dictionary. (so they can be loaded from json)"""
+        for name, key in self.JSON_KEYS.items():
+            setattr(self, name, in_dict[key])
+
+
+# values DataProvider.aggregate() can total per time entry ("count" is the number of time entries). Money is in whole
+# cents.
+AGGREGATE_COUNT = "count"
+AGGREGATE_VALUES = ("hours", "gross_pay_cents", "reimbursement_cents", "federal_withholding_cents", AGGREGATE_COUNT)
+# values DataProvider.aggregate() can total per pay period, from the filed pay period totals (see get_period_totals())
+# so the taxes are rounded and capped (social security and FUTA wage bases) as they are filed. "count" is the number of
+# pay periods. Money is in whole cents.
+AGGREGATE_PERIOD_VALUES = TimesheetValues.MONEY_FIELDS + TimesheetValues.HOURS_FIELDS + (AGGREGATE_COUNT,)
+# groups DataProvider.aggregate() can total by: name -> function(employee, time entry, pay period) returning the key.
+# quarter is the (year, quarter) the entry is paid in, month is the (year, month) it was worked in.
+AGGREGATE_GROUPS = {
+    "employee": lambda employee, entry, period: employee.name,
+    "tax_year": lambda employee, entry, period: entry.tax_year,
+    "pay_year": lambda employee, entry, period: period.year,
+    "quarter": lambda employee, entry, period: (period.year, period.quarter),
+    "month": lambda employee, entry, period: (entry.date.year, entry.date.month),
+    "pay_period": lambda employee, entry, period: period.pay_date,
+    "pay_type": lambda employee, entry, period: entry.pay_type,
+}
+AGGREGATE_PERIOD_GROUPS = {"pay_year", "quarter", "pay_period"}  # groups that need the entry's pay period
+
+
+def calculate_pay_period(time_entries: list[TimeEntry], tax_rates: TaxRates, ytd_gross_pay: int) -> TimesheetValues:
+    """Calculates the values for a single pay period. Each tax line is rounded to the cent once for the whole
+    period, and the wage caps are applied against ytd_gross_pay (the gross pay, in cents, of the earlier pay periods
+    in the tax year)."""
+    values = TimesheetValues()
+    wa_cares_wages = 0
+    for entry in time_entries:
+        entry.tax_rates = tax_rates
+        values.hours += entry.hours
+        values.gross_pay += entry.gross_pay_cents
+        values.reimbursements += entry.reimbursement_cents
+        values.federal_withholding += entry.federal_withholding_cents
+        if entry.date >= WA_CARES_START_DATE:
+            wa_cares_wages += entry.gross_pay_cents
+
+        if entry.pay_type is PayType.PAID_TIME_OFF:
+            values.paid_time_off_hours += entry.hours
+        if entry.pay_type is PayType.PAID_HOLIDAY:
+            values.paid_holiday_hours += entry.hours
+        if entry.pay_type is PayType.PAID_SICK_TIME:
+            values.paid_sick_hours += entry.hours
+
+    # social security (and wa family medical leave) and federal unemployment stop once their taxable maximums are hit
+    ss_wages = max(0, min(values.gross_pay, tax_rates.ss_taxable_max_cents - ytd_gross_pay))
+    futa_wages = max(0, min(values.gross_pay, tax_rates.federal_unemployment_taxable_max_cents - ytd_gross_pay))
+
+    rates = tax_rates.rates
+    values.medicare_employee = money.apply_rate(values.gross_pay, rates["medicare_employee"])
+    values.ss_employee = money.apply_rate(ss_wages, rates["ss_employee"])
+    values.wa_paid_fml_employee = money.apply_rate(ss_wages, rates["wa_paid_fml_employee"])
+    values.wa_cares = money.apply_rate(wa_cares_wages, rates["wa_cares"])
+    values.medicare_company = money.apply_rate(values.gross_pay, rates["medicare_company"])
+    values.ss_company = money.apply_rate(ss_wages, rates["ss_company"])
+    values.wa_paid_fml_company = money.apply_rate(ss_wages, rates["wa_paid_fml_company"])
+    values.federal_unemployment = money.apply_rate(futa_wages, rates["federal_unemployment"])
+    values.state_unemployment = money.apply_rate(values.gross_pay, rates["state_unemployment"])
+
+    values.employee_taxes_withheld = (values.medicare_employee + values.ss_employee + values.wa_paid_fml_employee +
+                                      values.wa_cares + values.federal_withholding)
+    values.net_pay = values.gross_pay - values.employee_taxes_withheld
+    values.check_amount = values.net_pay + values.reimbursements
+    values.company_tax_contributions = (values.medicare_company + values.ss_company + values.wa_paid_fml_company +
+                                        values.federal_unemployment + values.state_unemployment)
+    values.company_total_costs = values.gross_pay + values.company_tax_contributions + values.reimbursements
+    return values
+
+
+class LoadError:
+    def __init__(self, path: Path, error: Exception):
+        self.path = path
+        self.error = error
+
+    def __repr__(self):
+        return f"LoadError(path='{self.path}', error={self.error!r})"
+
+
+class RecalculatedPeriod:
+    """A pay period whose totals changed in DataProvider.recalculate()."""
+    def __init__(self, employee: Employee, pay_date: Date, filed: bool = False, changes: dict[str, int] = None):
+        self.employee = employee
+        self.pay_date = pay_date
+        self.filed = filed  # the pay date has passed, so the pay stub (and any reports covering it) went out
+        self.changes: dict[str, int] = changes or {}  # TimesheetValues money field -> change in cents
+
+    def __repr__(self):
+        return f"RecalculatedPeriod(employee={self.employee.name}, pay_date={self.pay_date}, filed={self.filed}, " \
+               f"changes={self.changes})"
+
+    @property
+    def quarter(self) -> int:
+        return payroll_calendar.get_quarter(self.pay_date)
+
+
+class DataChange:
+    """What DataProvider.reload_changed_files() reloaded, passed to the change listeners."""
+    def __init__(self, paths: set[Path]):
+        self.paths = paths  # the changed source files
+        self.tax_years: set[int] = set()  # years whose tax rates changed, were added or were removed
+        self.paid_holidays = False
+        self.employer = False
+        self.employees: set[str] = set()  # names of the employees that were added, removed or changed
+        self.employees_added_or_removed = False
+        self.recalculated: list[RecalculatedPeriod] = []  # pay periods whose values changed (see recalculate())
+
+    def __repr__(self):
+        return f"DataChange(paths={sorted(path.name for path in self.paths)}, tax_years={self.tax_years}, " \
+               f"paid_holidays={self.paid_holidays}, employer={self.employer}, employees={self.employees}, " \
+               f"recalculated={len(self.recalculated)})"
+
+
+class DataProvider:
+    def __init__(self, app_data_dir: Path = None, max_workers: int = None, use_snapshot: bool = None):
+        """Loads all payroll data from the provided app data directory (config.APP_DATA_DIR by default).
+        Employee and time entry files are read on a thread pool of up to max_workers threads
+        (config.LOADER_MAX_WORKERS by default). If use_snapshot is on (config.USE_SNAPSHOT by default), the loaded
+        data is restored from the last snapshot and only the source files that changed since are reloaded."""
+        self.max_workers = max_workers or config.LOADER_MAX_WORKERS
+        self.use_snapshot = config.USE_SNAPSHOT if use_snapshot is None else use_snapshot
+        self.load_errors: list[LoadError] = []  # files that failed to load
+        self.app_data_dir = Path(app_data_dir) if app_data_dir else config.APP_DATA_DIR
+        self.tax_rates_file = self.app_data_dir / config.TAX_RATES_FILE_NAME
+        self.employer_file = self.app_data_dir / config.EMPLOYER_FILE_NAME
+        self.paid_holidays_file = self.app_data_dir / config.PAID_HOLIDAYS_FILE_NAME
+        self.employees_dir = self.app_data_dir / config.EMPLOYEES_DIR_NAME
+        self.snapshot_file = self.app_data_dir / config.SNAPSHOT_FILE_NAME
+        self.report_cache = None  # generated reports by a hash of their inputs (see report_cache.py)
+        if config.USE_REPORT_CACHE:
+            self.report_cache = ReportCache(self.app_data_dir / config.REPORT_CACHE_DIR_NAME)
 
         self.first_run = False
+        self._source_signatures = {}  # source file path -> signature as of when it was read
+        self._change_listeners = []  # called with a DataChange whenever reload_changed_files() reloads anything
+        self.load_timings: dict[str, float] = {}  # loader name -> seconds it took (see main.py --profile-startup)
 
         self.tax_rates = []
         self.paid_holidays = []
@@ -427,41 +754,57 @@ class DataProvider:
         self.employees = []
 
         # if required appdata folders don't exist, create them and populate stub data
-        self.init_appdata_dir()
+        self._timed(self.init_appdata_dir)
 
-        self.load_tax_rate_data()
-        self.load_paid_holidays()
-        self.load_employer_data()
-        self.load_employee_data()
-        self.load_timesheet_data()
+        if self.use_snapshot and self._timed(self.load_snapshot):
+            return
+
+        self._source_signatures = self._timed(snapshot.file_signatures, self.get_source_files())
+        self._timed(self.load_tax_rate_data)
+        self._timed(self.load_paid_holidays)
+        self._timed(self.load_employer_data)
+        self._timed(self.load_employee_data)
+        self._timed(self.load_timesheet_data)
+        if self.use_snapshot:
+            self._timed(self.save_snapshot)
+
+    def _timed(self, loader, *args):
+        """Calls loader(*args), adds its run time to load_timings and returns its result."""
+        start = time.perf_counter()
+        result = loader(*args)
+        self.load_timings[loader.__name__] = time.perf_counter() - start
+        return result
 
     def init_appdata_dir(self):
         """If the appdata directory doesn't already exist, this function populates it with stub data."""
         # if the application data directory does not exist, create it and populate stub data
-        if not config.TAX_RATES_FILE.exists():
-            config.APP_DATA_DIR.mkdir(parents=True)
-            shutil.copy(config.STUB_TAX_RATES_FILE, config.TAX_RATES_FILE)
+        if not self.tax_rates_file.exists():
+            self.app_data_dir.mkdir(parents=True, exist_ok=True)
+            shutil.copy(config.STUB_TAX_RATES_FILE, self.tax_rates_file)
             self.first_run = True
 
-        if not config.EMPLOYER_FILE.exists():
-            shutil.copy(config.STUB_EMPLOYER_FILE, config.EMPLOYER_FILE)
+        if not self.employer_file.exists():
+            shutil.copy(config.STUB_EMPLOYER_FILE, self.employer_file)
             self.first_run = True
 
-        if not config.EMPLOYEES_DIR.exists():
-            config.EMPLOYEES_DIR.mkdir()
+        if not self.employees_dir.exists():
+            self.employees_dir.mkdir()
             self.first_run = True
 
         if self.first_run:
             raise UserWarning('Populate tax rate, employer, and employee data before starting the tool.')
 
     def load_tax_rate_data(self):
-        """Reads all tax rate entries from the appdata directory and serializes them."""
+        """Reads all tax rate entries from the appdata directory and serializes them. Years that are already loaded
+        are updated in place, so any corrected values bump their version and stale time entries can be found with
+        recalculate()."""
+        loaded = {tax_rate.year: tax_rate for tax_rate in self.tax_rates}
         self.tax_rates = []
-        with open(config.TAX_RATES_FILE) as in_file:
+        with open(self.tax_rates_file) as in_file:
             tax_rates = json.load(in_file)
 
             for rates in tax_rates:
-                tax_rate = TaxRates()
+                tax_rate = loaded.get(rates["TaxYear"]) or TaxRates()
                 tax_rate.year = rates["TaxYear"]
                 tax_rate._medicare_employee = rates["MedicareEmployee"]
                 tax_rate._medicare_company = rates["MedicareCompany"]
@@ -475,17 +818,18 @@ class DataProvider:
                 tax_rate.federal_unemployment_taxable_max = rates["FederalUnemploymentTaxableMaximum"]
                 tax_rate._state_unemployment = rates["StateUnemployment"]
                 tax_rate.milage_reimbursement_rate = rates["MilageReimbursementRate"]
+                tax_rate.household_cash_wage_threshold = rates.get("HouseholdCashWageThreshold", 0)
                 tax_rate.federal_withholding = rates["FederalWithholding"]
 
                 self.tax_rates.append(tax_rate)
 
     def load_paid_holidays(self):
         self.paid_holidays = []
-        if not config.PAID_HOLIDAYS_FILE.exists():
-            print(f"WARNING: Unable to load '{config.PAID_HOLIDAYS_FILE}'. Paid holidays will not auto-populate.")
+        if not self.paid_holidays_file.exists():
+            print(f"WARNING: Unable to load '{self.paid_holidays_file}'. Paid holidays will not auto-populate.")
             return
 
-        with open(config.PAID_HOLIDAYS_FILE) as in_file:
+        with open(self.paid_holidays_file) as in_file:
             json_entries = json.load(in_file)
             for holiday_dict in json_entries:
                 holiday = PaidHoliday()
@@ -494,7 +838,7 @@ class DataProvider:
 
     def load_employer_data(self):
         """Reads the employer data from the appdata directory and serializes it."""
-        with open(config.EMPLOYER_FILE) as inFile:
+        with open(self.employer_file) as inFile:
             employer = json.load(inFile)
             self.employer.name = employer["Name"]
             self.employer.ein = employer["EIN"]
@@ -503,67 +847,451 @@ class DataProvider:
             self.employer.address_line_2 = employer["AddressLine2"]
             self.employer.address_line_3 = employer["AddressLine3"]
             self.employer.payroll_day = employer.get("PayrollDayOfWeek", 4)  # Friday is default
+            self.employer.bso_user_id = employer.get("BSOUserID")  # optional: only required for W-2 EFW2 files
+            self.employer.contact_name = employer.get("ContactName")
+            self.employer.contact_phone = employer.get("ContactPhone")
+            self.employer.contact_email = employer.get("ContactEmail")
+
+    def _load_concurrently(self, paths: list[Path], loader) -> list:
+        """Runs loader(path) for every path on a thread pool (at most self.max_workers files at once). The results
+        keep the order of the provided paths. Files that fail to load are recorded in self.load_errors and their
+        result is None."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(loader, path) for path in paths]
+
+        results = []
+        for path, future in zip(paths, futures):
+            try:
+                results.append(future.result())
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                self.load_errors.append(LoadError(path, error))
+                print(f"ERROR: Unable to load '{path}': {type(error).__name__}: {error}")
+                results.append(None)
+        return results
 
     def load_employee_data(self):
         """Reads all employee entries from the appdata directory and serializes them."""
         self.employees = []
-        employee_files = config.EMPLOYEES_DIR.glob('**/*.json')
-        for employee_file in employee_files:
-            # skip all but the base employee files  TODO this should be better?
-            if "_" in employee_file.name:
-                continue
+        self.load_errors = []
+        for employee in self._load_concurrently(self.get_employee_files(), self.read_employee_file):
+            if employee is not None:
+                self.employees.append(employee)
 
-            with open(employee_file) as infile:
-                emp = json.load(infile)
-
-                employee = Employee()
-                employee.first_name = emp["FirstName"]
-                employee.last_name = emp["LastName"]
-                employee.middle_name = emp["MiddleName"]
-                employee.ssn = emp["SSN"]
-                employee.pay_rate = emp["PayRate"]
-                employee.paid_vacation = emp["PaidVacationHoursPerYear"]
-                employee.paid_sick = emp["PaidSickHoursPerYear"]
-                employee.paid_holidays = emp["PaidHolidayHoursPerYear"]
-                employee.address_line_1 = emp["AddressLine1"]
-                employee.address_line_2 = emp["AddressLine2"]
-                employee.address_line_3 = emp["AddressLine3"]
-                employee.appdata_path = employee_file
-
-                # add W4 (if available)
-                if "W4" in emp:
-                    w4 = EmployeeW4()
-                    for filing_status in W4FilingStatus:
-                        if filing_status.name.lower() == emp["W4"]["1C"].lower():
-                            w4.line_1C = filing_status
-                            break
-                    w4.line_2C = emp["W4"]["2C"]
-                    w4.line_3 = emp["W4"]["3"]
-                    w4.line_4A = emp["W4"]["4A"]
-                    w4.line_4B = emp["W4"]["4B"]
-                    w4.line_4C = emp["W4"]["4C"]
-                    w4.pay_periods_per_year = emp["W4"]["PayPeriodsPerYear"]
-                    if w4.line_1C is None:
-                        print(f'WARNING: Unable to load W4 data for {employee.name} because the data is invalid.')
-                    else:
-                        employee.w4 = w4
+    def get_employee_files(self) -> list[Path]:
+        # skip all but the base employee files  TODO this should be better?
+        return sorted(path for path in self.employees_dir.glob('**/*.json') if "_" not in path.name)
+
+    def get_source_files(self) -> list[Path]:
+        """Returns every file the loaded data comes from."""
+        source_files = [self.tax_rates_file, self.employer_file, self.paid_holidays_file]
+        for employee_file in self.get_employee_files():
+            source_files += [employee_file, employee_file.parent / (employee_file.stem + "_TimeEntries.json")]
+        return source_files
+
+    def save_snapshot(self) -> bool:
+        """Saves the loaded data (including the pay period totals) to the snapshot file. Nothing is saved
+        while files have failed to load or there are unsaved changes, since the snapshot must match the files."""
+        if self.load_errors or self._paid_holidays_dirty or \
+                any(employee._time_entries_dirty or employee._time_entries_load_failed for employee in self.employees):
+            return False
+        state = {"app_data_dir": str(self.app_data_dir),
+                 "tax_rates": self.tax_rates,
+                 "paid_holidays": self.paid_holidays,
+                 "employer": self.employer,
+                 "employees": self.employees}
+        try:
+            snapshot.write_snapshot(self.snapshot_file, self._source_signatures, state)
+        except OSError as error:
+            print(f"WARNING: Unable to save '{self.snapshot_file}': {error}")
+            return False
+        return True
 
-                self.employees.append(employee)
+    def load_snapshot(self) -> bool:
+        """Restores the data saved by save_snapshot() and reloads only the source files that changed since. Returns
+        False if there is no usable snapshot (so everything needs to be loaded)."""
+        if not self.snapshot_file.exists():
+            return False
+        try:
+            manifest, state = snapshot.read_snapshot(self.snapshot_file)
+            if state["app_data_dir"] != str(self.app_data_dir):
+                raise snapshot.SnapshotError(f"'{self.snapshot_file}' was saved for {state['app_data_dir']}.")
+        except snapshot.SnapshotError as error:
+            print(f"WARNING: Ignoring snapshot: {error}")
+            return False
 
-    def load_timesheet_data(self):
-        """Reads all timesheet entries from the appdata directory and serializes them."""
+        self.tax_rates = state["tax_rates"]
+        self.paid_holidays = state["paid_holidays"]
+        self.employer = state["employer"]
+        self.load_errors = []
+        TaxRates.skip_versions(max((tax_rate.version for tax_rate in self.tax_rates), default=0))
+
+        # reload the files that changed, and any employee files that were added since
+        self._source_signatures = manifest
+        self.employees = state["employees"]
+        self.reload_changed_files()
+        return True
+
+    def add_change_listener(self, listener):
+        """Registers listener(change: DataChange) to be called whenever reload_changed_files() reloads anything."""
+        self._change_listeners.append(listener)
+
+    def remove_change_listener(self, listener):
+        self._change_listeners.remove(listener)
+
+    def get_changed_files(self) -> set[Path]:
+        """Returns the source files that changed, were added or were removed since they were read. This only stats
+        the files, so it is cheap enough to poll."""
+        source_files = self.get_source_files()
+        return snapshot.changed_files(self._source_signatures) | \
+            {path for path in source_files if str(path) not in self._source_signatures}
+
+    def reload_changed_files(self) -> DataChange or None:
+        """Reloads only the source files that changed since they were read, and recalculates only the pay period
+        totals that depend on them. Returns what changed (None if nothing did) after notifying the change
+        listeners."""
+        changed = self.get_changed_files()
+        if not changed:
+            return None
+        source_files = self.get_source_files()
+        self._source_signatures.update(snapshot.file_signatures(sorted(changed)))
+        for path in changed:
+            if path not in source_files:
+                del self._source_signatures[str(path)]  # a removed employee
+
+        self.load_errors = [load_error for load_error in self.load_errors if load_error.path not in changed]
+        change = DataChange(changed)
+        # reloading a time entries file recalculates its totals right away, so compare against the totals from before
+        previous = {employee.appdata_path: dict(employee.period_totals) for employee in self.employees}
+        if self.tax_rates_file in changed:
+            versions = {tax_rate.year: tax_rate.version for tax_rate in self.tax_rates}
+            self.load_tax_rate_data()
+            change.tax_years = {tax_rate.year for tax_rate in self.tax_rates
+                                if versions.get(tax_rate.year) != tax_rate.version}
+            change.tax_years |= versions.keys() - {tax_rate.year for tax_rate in self.tax_rates}
+        if self.paid_holidays_file in changed:
+            if self._paid_holidays_dirty:
+                print(f"WARNING: '{self.paid_holidays_file}' changed outside the app. Unsaved paid holidays were "
+                      f"discarded.")
+                self._paid_holidays_dirty = False
+            self.load_paid_holidays()
+            change.paid_holidays = True
+        payroll_day = self.employer.payroll_day
+        if self.employer_file in changed:
+            self.load_employer_data()
+            change.employer = True
+        names = set(self.employee_names)
+        change.employees = self.reload_employee_files(self.employees, changed)
+        change.employees_added_or_removed = names != set(self.employee_names)
+
+        print(f"Reloaded {len(changed)} changed file(s): {', '.join(path.name for path in sorted(changed))}")
+        self.assign_tax_rates()
+        for employee in self.employees:
+            if payroll_day != self.employer.payroll_day:
+                self.invalidate_period_totals(employee)
+            else:
+                self.invalidate_tax_years(employee, change.tax_years)
+        self.recalculate()
+        change.recalculated = self.compare_period_totals(previous)
         for employee in self.employees:
-            employee_time_file = employee.appdata_path.parent / (employee.appdata_path.stem + "_TimeEntries.json")
+            if employee._period_totals_dirty:
+                self.save_period_totals(employee)
+        if self.use_snapshot:
+            self.save_snapshot()
+
+        for listener in self._change_listeners:
+            listener(change)
+        return change
+
+    def reload_employee_files(self, employees: list[Employee], changed: set[Path]) -> set[str]:
+        """Rebuilds self.employees from the provided (already loaded) employees, reading only the employee and time
+        entry files that are new or changed. Returns the names of the employees that were added, removed or
+        changed."""
+        loaded_employees = {employee.appdata_path: employee for employee in employees}
+        employee_files = self.get_employee_files()
+        reload_files = [path for path in employee_files if path in changed or path not in loaded_employees]
+        reloaded = dict(zip(reload_files, self._load_concurrently(reload_files, self.read_employee_file)))
 
-            if employee_time_file.exists():
-                with open(employee_time_file) as infile:
-                    json_entries = json.load(infile)
+        self.employees = []
+        reload_time_entries = []
+        for employee_file in employee_files:
+            employee = loaded_employees.get(employee_file)
+            if employee_file in reloaded:
+                if reloaded[employee_file] is None:
+                    continue
+                if employee is not None:
+                    # the employee's details changed, but their time entries (and any unsaved changes) are kept
+                    for name in ("time_entries", "period_totals", "_time_entries_dirty", "_time_entries_load_failed",
+                                 "_period_totals_stale", "_period_totals_rates", "_period_totals_dirty"):
+                        setattr(reloaded[employee_file], name, getattr(employee, name))
+                employee, is_new = reloaded[employee_file], employee is None
+            else:
+                is_new = False
+
+            if is_new:
+                reload_time_entries.append(employee)
+            elif self.get_time_entries_file(employee) in changed:
+                if employee._time_entries_dirty:
+                    print(f"WARNING: Time entries for {employee.name} changed outside the app while there are unsaved "
+                          f"changes. Keeping the unsaved time entries (saving will overwrite the file).")
+                else:
+                    reload_time_entries.append(employee)
+            self.employees.append(employee)
+
+        if reload_time_entries:
+            self.load_timesheet_data(reload_time_entries)
+
+        names = {employee.name for employee in self.employees
+                 if employee.appdata_path in reloaded or employee in reload_time_entries}
+        return names | {employee.name for employee in employees if employee.appdata_path not in employee_files}
+
+    @staticmethod
+    def read_employee_file(employee_file: Path) -> Employee:
+        """Reads a single employee json file."""
+        with open(employee_file) as infile:
+            emp = json.load(infile)
+
+        employee = Employee()
+        employee.first_name = emp["FirstName"]
+        employee.last_name = emp["LastName"]
+        employee.middle_name = emp["MiddleName"]
+        employee.ssn = emp["SSN"]
+        employee.pay_rate = emp["PayRate"]
+        employee.paid_vacation = emp["PaidVacationHoursPerYear"]
+        employee.paid_sick = emp["PaidSickHoursPerYear"]
+        employee.paid_holidays = emp["PaidHolidayHoursPerYear"]
+        if "LeaveAccrual" in emp:
+            employee.leave_rules = [AccrualRule.from_dictionary(rule) for rule in emp["LeaveAccrual"]]
+        employee.address_line_1 = emp["AddressLine1"]
+        employee.address_line_2 = emp["AddressLine2"]
+        employee.address_line_3 = emp["AddressLine3"]
+        employee.appdata_path = employee_file
+
+        # add W4 (if available)
+        if "W4" in emp:
+            w4 = EmployeeW4()
+            for filing_status in W4FilingStatus:
+                if filing_status.name.lower() == emp["W4"]["1C"].lower():
+                    w4.line_1C = filing_status
+                    break
+            w4.line_2C = emp["W4"]["2C"]
+            w4.line_3 = emp["W4"]["3"]
+            w4.line_4A = emp["W4"]["4A"]
+            w4.line_4B = emp["W4"]["4B"]
+            w4.line_4C = emp["W4"]["4C"]
+            w4.pay_periods_per_year = emp["W4"]["PayPeriodsPerYear"]
+            if w4.line_1C is None:
+                print(f'WARNING: Unable to load W4 data for {employee.name} because the data is invalid.')
+            else:
+                employee.w4 = w4
 
-                employee.time_entries = []
-                for time_dict in json_entries:
-                    time_entry = TimeEntry()
-                    time_entry.populate_from_dictionary(time_dict)
-                    employee.time_entries.append(time_entry)
+        return employee
+
+    @staticmethod
+    def get_time_entries_file(employee: Employee) -> Path:
+        """Returns the time entries file that sits next to the employee's json file."""
+        return employee.appdata_path.parent / (employee.appdata_path.stem + "_TimeEntries.json")
+
+    @staticmethod
+    def read_time_entries_file(employee_time_file: Path) -> list[TimeEntry] or None:
+        """Reads a single employee time entries json file. Returns None if the file doesn't exist yet."""
+        if not employee_time_file.exists():
+            return None
+
+        with open(employee_time_file) as infile:
+            json_entries = json.load(infile)
+
+        time_entries = []
+        for time_dict in json_entries:
+            time_entry = TimeEntry()
+            time_entry.populate_from_dictionary(time_dict)
+            time_entries.append(time_entry)
+        return time_entries
+
+    @staticmethod
+    def get_period_totals_file(employee: Employee) -> Path:
+        """Returns the pay period totals file that sits next to the employee's json file."""
+        return employee.appdata_path.parent / (employee.appdata_path.stem + "_PeriodTotals.json")
+
+    def get_period_totals_basis(self, employee: Employee) -> list:
+        """Returns what an employee's pay period totals are calculated from: the signatures of their time entries
+        file and the tax rates file, the payroll day and PERIOD_TOTALS_VERSION. Saved totals with a different basis
+        are out of date."""
+        signatures = [self._source_signatures.get(str(path)) for path in (self.get_time_entries_file(employee),
+                                                                          self.tax_rates_file)]
+        return [list(signature) if signature else None for signature in signatures] + [self.employer.payroll_day,
+                                                                                         PERIOD_TOTALS_VERSION]
+
+    def load_period_totals(self, employee: Employee):
+        """Reads the employee's saved pay period totals. If they are missing or out of date, they are recalculated
+        and saved."""
+        employee.period_totals = {}
+        employee._period_totals_stale = set()
+        employee._period_totals_rates = {}
+        totals_file = self.get_period_totals_file(employee)
+        try:
+            with open(totals_file) as in_file:
+                saved = json.load(in_file)
+            if saved["Basis"] == self.get_period_totals_basis(employee):
+                for period_dict in saved["PayPeriods"]:
+                    values = TimesheetValues()
+                    values.populate_from_dictionary(period_dict)
+                    employee.period_totals[Date.fromisoformat(period_dict["PayDate"])] = values
+                employee._period_totals_rates = {year: self.get_pay_year_rates_version(year)
+                                                 for year in {pay_date.year for pay_date in employee.period_totals}}
+            else:
+                self.invalidate_period_totals(employee)  # the time entries or tax rates changed since
+        except FileNotFoundError:
+            self.invalidate_period_totals(employee)
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            print(f"WARNING: Recalculating '{totals_file}': {error}")
+            self.invalidate_period_totals(employee)
+        if employee._period_totals_stale:
+            self.update_period_totals(employee)
+            self.save_period_totals(employee)
+
+    def invalidate_period_totals(self, employee: Employee, date: Date = None):
+        """Marks the totals of the year the date is paid in as needing to be recalculated (all years by default).
+        Call this whenever a time entry is added, changed or removed. A whole year is recalculated since the wage
+        caps carry over from one pay period to the next."""
+        employee.leave_ledger.invalidate(date)
+        if date is not None:
+            employee._period_totals_stale.add(get_pay_date(date, self.employer.payroll_day).year)
+            return
+        employee._period_totals_stale.update(pay_date.year for pay_date in employee.period_totals)
+        employee._period_totals_stale.update(get_pay_date(time_entry.date, self.employer.payroll_day).year
+                                             for time_entry in employee.time_entries)
+
+    def invalidate_tax_years(self, employee: Employee, tax_years: set[int]):
+        """Marks the totals of the years the employee's time entries in the provided tax years are paid in as needing
+        to be recalculated (ie after those years' tax rates changed)."""
+        if not tax_years:
+            return
+        employee._period_totals_stale.update(get_pay_date(time_entry.date, self.employer.payroll_day).year
+                                             for time_entry in employee.time_entries
+                                             if time_entry.tax_year in tax_years)
+
+    def update_period_totals(self, employee: Employee):
+        """Recalculates the pay period totals of the employee's stale years."""
+        if not employee._period_totals_stale:
+            return
+        stale_years = employee._period_totals_stale
+        periods = {}
+        for time_entry in employee.time_entries:
+            pay_date = get_pay_date(time_entry.date, self.employer.payroll_day)
+            if pay_date.year in stale_years:
+                periods.setdefault(pay_date, []).append(time_entry)
+
+        employee.period_totals = {pay_date: values for pay_date, values in employee.period_totals.items()
+                                  if pay_date.year not in stale_years}
+        ytd_gross_pay = {}
+        for pay_date in sorted(periods):
+            time_entries = periods[pay_date]
+            tax_rates = self.get_pay_period_tax_rates(pay_date)
+            if tax_rates is None:
+                print(f"WARNING: No tax rates found for {pay_date.year}. Skipping the {employee.name} pay period paid "
+                      f"on {pay_date}.")
+                continue
+            values = calculate_pay_period(time_entries, tax_rates, ytd_gross_pay.get(pay_date.year, 0))
+            ytd_gross_pay[pay_date.year] = ytd_gross_pay.get(pay_date.year, 0) + values.gross_pay
+            employee.period_totals[pay_date] = values
+
+        employee._period_totals_rates.update({year: self.get_pay_year_rates_version(year) for year in stale_years})
+        employee._period_totals_stale = set()
+        employee._period_totals_dirty = True
+
+    def save_period_totals(self, employee: Employee) -> bool:
+        """Writes the employee's pay period totals to disk. Only totals that match the saved time entries are written,
+        so the file never disagrees with the time entries file it is based on."""
+        if employee._time_entries_dirty or employee._time_entries_load_failed or employee._period_totals_stale:
+            return False
+        totals_file = self.get_period_totals_file(employee)
+        saved = {"Basis": self.get_period_totals_basis(employee),
+                 "PayPeriods": [{"PayDate": pay_date.isoformat(), **employee.period_totals[pay_date].as_dictionary()}
+                                for pay_date in sorted(employee.period_totals)]}
+        try:
+            with open(totals_file, "w") as out_file:
+                json.dump(saved, out_file, indent=2)
+        except OSError as error:
+            print(f"WARNING: Unable to save '{totals_file}': {error}")
+            return False
+        employee._period_totals_dirty = False
+        return True
+
+    def get_period_totals(self, employee: str or Employee, year: int) -> list[tuple[Date, TimesheetValues]]:
+        """Returns (pay date, totals) for each of the employee's pay periods paid in the year, in pay date order."""
+        if not isinstance(employee, Employee):
+            employee = self.get_employee_from_name(employee)
+        self.update_period_totals(employee)
+        return sorted((pay_date, values) for pay_date, values in employee.period_totals.items()
+                      if pay_date.year == year)
+
+    def load_timesheet_data(self, employees: list[Employee] = None):
+        """Reads the timesheet entries of the provided employees (all employees by default) from the appdata
+        directory and serializes them."""
+        employees = self.employees if employees is None else employees
+        time_files = [self.get_time_entries_file(employee) for employee in employees]
+        time_entries_lists = self._load_concurrently(time_files, self.read_time_entries_file)
+        failed = {load_error.path for load_error in self.load_errors}
+        for employee, time_file, time_entries in zip(employees, time_files, time_entries_lists):
+            if time_file in failed:
+                # don't let a save overwrite time entries that couldn't be read
+                employee._time_entries_load_failed = True
+            else:
+                employee.time_entries = time_entries or []
+                employee.leave_ledger.invalidate()
+        self.assign_tax_rates()
+        for employee in employees:
+            if not employee._time_entries_load_failed:
+                self.load_period_totals(employee)
+
+    def assign_tax_rates(self):
+        """Assigns every time entry the tax rates of its tax year. Their values are calculated when first used."""
+        for employee in self.employees:
+            for time_entry in employee.time_entries:
+                time_entry.tax_rates = self.get_tax_rates(year=time_entry.tax_year)
+
+    def get_pay_year_rates_version(self, year: int) -> int or None:
+        """Returns the version of the tax rates the pay periods paid in the year are taxed with (None if there are
+        no tax rates)."""
+        tax_rates = self.get_pay_period_tax_rates(Date(year, 1, 1))
+        return tax_rates.version if tax_rates is not None else None
+
+    def recalculate(self, as_of: Date = None) -> list[RecalculatedPeriod]:
+        """Recalculates the pay period totals that are out of date: the years whose time entries changed, or whose
+        tax rates changed since their totals were calculated (ie a corrected tax_rates.json). Returns the pay periods
+        whose totals changed, with the change of each money value in cents (the wage caps and the per period
+        rounding included, so the changes are exactly what was filed). Periods paid on or before as_of (today by
+        default) are flagged as filed."""
+        previous = {}
+        for employee in self.employees:
+            employee._period_totals_stale.update(year for year, version in employee._period_totals_rates.items()
+                                                 if version != self.get_pay_year_rates_version(year))
+            if employee._period_totals_stale:
+                previous[employee.appdata_path] = dict(employee.period_totals)
+                self.update_period_totals(employee)
+        return self.compare_period_totals(previous, as_of)
+
+    def compare_period_totals(self, previous: dict[Path, dict[Date, TimesheetValues]],
+                              as_of: Date = None) -> list[RecalculatedPeriod]:
+        """Returns the pay periods whose totals differ from the previous totals (employee file -> pay date ->
+        totals). Employees that aren't in previous are skipped."""
+        as_of = as_of or Date.today()
+        periods = []
+        for employee in self.employees:
+            if employee.appdata_path not in previous:
+                continue
+            old_totals = previous[employee.appdata_path]
+            for pay_date in sorted(old_totals.keys() | employee.period_totals.keys()):
+                old_values = old_totals.get(pay_date, TimesheetValues())
+                new_values = employee.period_totals.get(pay_date, TimesheetValues())
+                if old_values is new_values:
+                    continue
+                changes = {name: getattr(new_values, name) - getattr(old_values, name)
+                           for name in TimesheetValues.MONEY_FIELDS
+                           if getattr(new_values, name) != getattr(old_values, name)}
+                if changes:
+                    periods.append(RecalculatedPeriod(employee, pay_date, pay_date <= as_of, changes))
+        return sorted(periods, key=lambda period: (period.pay_date, period.employee.name))
 
     @property
     def employee_names(self):
@@ -572,7 +1300,7 @@ class DataProvider:
 
     def make_new_employee(self, name: str):
         employee_name = name.replace(" ", "")
-        employee_dir = config.EMPLOYEES_DIR / employee_name
+        employee_dir = self.employees_dir / employee_name
         if employee_dir.exists():
             print(f'ERROR: A directory named {employee_name} already exists.')
             return
@@ -584,6 +1312,14 @@ class DataProvider:
 
         self.load_employee_data()
 
+    def get_payroll_calendar(self, year: int) -> payroll_calendar.PayrollCalendar:
+        """Returns the shared pay period calendar for the year and the employer's payroll day."""
+        return payroll_calendar.get_payroll_calendar(year, self.employer.payroll_day)
+
+    def get_pay_period(self, date: Date) -> payroll_calendar.PayPeriod:
+        """Returns the pay period the date is in (it may be paid in the following year)."""
+        return payroll_calendar.get_pay_period(date, self.employer.payroll_day)
+
     def get_tax_rates(self, year: int = None) -> TaxRates or None:
         """Returns the most recent tax rate year or a specific year if requested."""
         # return a specific year if requested
@@ -597,10 +1333,23 @@ class DataProvider:
         else:
             current_rates = None
             for tax_rate in self.tax_rates:
-                if current_rates is None or current_rates["TaxYear"] < tax_rate["TaxYear"]:
+                if current_rates is None or current_rates.year < tax_rate.year:
                     current_rates = tax_rate
             return current_rates
 
+    def get_tax_year(self, date: Date) -> int or None:
+        """Returns the tax year a time entry worked on the date belongs to: the year it was worked in, or the most
+        recent tax year if there are no rates for that year yet (None if there are no tax rates at all)."""
+        if self.get_tax_rates(date.year) is not None:
+            return date.year
+        latest = self.get_tax_rates()
+        return latest.year if latest is not None else None
+
+    def get_pay_period_tax_rates(self, pay_date: Date) -> TaxRates or None:
+        """Returns the tax rates of the pay period paid on the date: those of the year it's paid in (like the wages are
+        reported), so a pay period spanning new year's doesn't depend on the order of its entries."""
+        return self.get_tax_rates(year=self.get_tax_year(pay_date))
+
     def get_employee_from_name(self, employee_name: str) -> Employee:
         """Returns an employee object that matches the provided name."""
         for employee in self.employees:
@@ -631,7 +1380,7 @@ class DataProvider:
         """Adds a time entry to the provided employee's worked_time list."""
         if not isinstance(employee, Employee):
             employee = self.get_employee_from_name(employee)
-        rates = self.get_tax_rates()
+        rates = self.get_tax_rates(self.get_tax_year(date))
 
         # check if this date has already been entered and warn (this is allowed to support split time type days)
         for time_entry in employee.time_entries:
@@ -642,6 +1391,7 @@ class DataProvider:
         time_entry = TimeEntry()
         time_entry.date = date
         time_entry.tax_year = rates.year
+        time_entry.tax_rates = rates
         time_entry.hours = hours
         time_entry.pay_rate = employee.pay_rate
         time_entry.pay_type = pay_type
@@ -652,6 +1402,55 @@ class DataProvider:
 
         employee.time_entries.append(time_entry)
         employee._time_entries_dirty = True
+        self.invalidate_period_totals(employee, date)
+
+    def add_time_entries(self, employee: Employee, time_entries: list[TimeEntry]):
+        """Adds already validated time entries to the employee in one go (see importers.py). Unlike
+        add_worked_time(), nothing is checked per entry, and each year's pay period totals are invalidated once."""
+        for time_entry in time_entries:
+            time_entry.tax_rates = self.get_tax_rates(year=time_entry.tax_year)
+        employee.time_entries.extend(time_entries)
+        employee._time_entries_dirty = True
+        for year in {get_pay_date(time_entry.date, self.employer.payroll_day).year for time_entry in time_entries}:
+            employee._period_totals_stale.add(year)
+        if time_entries:
+            employee.leave_ledger.invalidate(min(time_entry.date for time_entry in time_entries))
+
+    def update_time_entry(self, employee: Employee, time_entry: TimeEntry, **values) -> bool:
+        """Changes values (TimeEntry.EDITABLE_FIELDS name -> value) of one of the employee's time entries. Returns
+        True if anything changed. Moving an entry into another year moves it to that year's tax year."""
+        for name in values:
+            if name not in TimeEntry.EDITABLE_FIELDS:
+                raise ValueError(f"'{name}' isn't an editable time entry value.")
+        if values.get("hours", 0) < 0:
+            raise ValueError("Hours can't be negative.")
+        changed = {name: value for name, value in values.items() if getattr(time_entry, name) != value}
+        if not changed:
+            return False
+
+        old_date = time_entry.date
+        for name, value in changed.items():
+            setattr(time_entry, name, value)
+        if time_entry.date.year != old_date.year:
+            time_entry.tax_year = self.get_tax_year(time_entry.date) or time_entry.tax_year
+        time_entry.tax_rates = self.get_tax_rates(year=time_entry.tax_year)
+
+        employee._time_entries_dirty = True
+        self.invalidate_period_totals(employee, old_date)
+        self.invalidate_period_totals(employee, time_entry.date)
+        return True
+
+    def remove_time_entry(self, employee: Employee, time_entry: TimeEntry):
+        """Removes one of the employee's time entries."""
+        employee.time_entries.remove(time_entry)
+        employee._time_entries_dirty = True
+        self.invalidate_period_totals(employee, time_entry.date)
+
+    def get_leave_balance(self, employee: str or Employee, pay_type: PayType, date: Date) -> int or float:
+        """Returns the employee's paid time off, sick time or holiday hours available at the end of the date."""
+        if not isinstance(employee, Employee):
+            employee = self.get_employee_from_name(employee)
+        return employee.leave_ledger.get_balance(pay_type.name, date, employee.time_entries, self.employer.payroll_day)
 
     def get_worked_time_in_range(self, employee: str or Employee, start_date: Date, end_date: Date) -> list[TimeEntry]:
         """Finds all time entries for the provided employee that match """
@@ -665,6 +1464,122 @@ class DataProvider:
 
         return matches
 
+    def aggregate(
+        self,
+        values: str or list[str],
+        group_by: str or list[str] = (),
+        start_date: Date = None,
+        end_date: Date = None,
+        employees: list[str or Employee] = None,
+        pay_types: list[PayType] = None
+    ) -> dict[tuple, dict[str, int or float]]:
+        """Totals values grouped by any of AGGREGATE_GROUPS. Returns {group key: {value name: total}} where the group
+        key is a tuple with one item per group_by name (an empty tuple if there are no groups).
+        If every value is a time entry value (AGGREGATE_VALUES) they are totalled in a single pass over the time
+        entries worked between start_date and end_date (inclusive, open ended if None), ie hours by pay type per month:
+            data.aggregate("hours", ["month", "pay_type"], Date(2024, 1, 1), Date(2024, 12, 31))
+            {((2024, 1), PayType.REGULAR): {"hours": 152.5}, ((2024, 1), PayType.PAID_HOLIDAY): {"hours": 8}, ...}
+        Otherwise they are pay period values (AGGREGATE_PERIOD_VALUES), totalled over the pay period totals paid
+        between start_date and end_date, grouped by employee, pay_year, quarter or pay_period, ie the W-2 wages:
+            data.aggregate(["gross_pay", "ss_employee"], "employee", Date(2024, 1, 1), Date(2024, 12, 31))
+        Ranges of whole pay periods (see PayrollCalendar) cover the same time entries either way."""
+        values = [values] if isinstance(values, str) else list(values)
+        group_by = [group_by] if isinstance(group_by, str) else list(group_by)
+        for name in group_by:
+            if name not in AGGREGATE_GROUPS:
+                raise ValueError(f"Can't group by '{name}'. Valid groups: {', '.join(AGGREGATE_GROUPS)}")
+        per_period = any(name not in AGGREGATE_VALUES for name in values)
+        if per_period:
+            for name in values:
+                if name in AGGREGATE_VALUES and name not in AGGREGATE_PERIOD_VALUES:
+                    raise ValueError(f"Can't aggregate the time entry value '{name}' with pay period values.")
+                if name not in AGGREGATE_PERIOD_VALUES:
+                    raise ValueError(f"Can't aggregate '{name}'. Valid values: {', '.join(AGGREGATE_VALUES)} or "
+                                     f"{', '.join(AGGREGATE_PERIOD_VALUES)}")
+            for name in group_by:
+                if name != "employee" and name not in AGGREGATE_PERIOD_GROUPS:
+                    raise ValueError(f"Can't group pay period values by '{name}'. Valid groups: employee, "
+                                     f"{', '.join(sorted(AGGREGATE_PERIOD_GROUPS))}")
+            if pay_types is not None:
+                raise ValueError("Pay period values can't be filtered by pay type.")
+
+        if employees is None:
+            employees = self.employees
+        else:
+            employees = [employee if isinstance(employee, Employee) else self.get_employee_from_name(employee)
+                         for employee in employees]
+        summed = [(name, attrgetter(name)) for name in values if name != AGGREGATE_COUNT]
+        count = AGGREGATE_COUNT in values
+        start_date = start_date or Date.min
+        end_date = end_date or Date.max
+
+        # each employee is totalled by a key made of the date groups (cached per date, every employee works mostly
+        # the same dates) and the pay_type/tax_year groups, then merged into the group_by keys
+        date_groups = [name for name in group_by if name not in ("employee", "pay_type", "tax_year")]
+        entry_groups = [name for name in group_by if name in ("pay_type", "tax_year")]
+        date_functions = [AGGREGATE_GROUPS[name] for name in date_groups]
+        entry_getter = attrgetter(*entry_groups) if entry_groups else None
+        needs_period = bool(AGGREGATE_PERIOD_GROUPS.intersection(group_by))
+        pay_types = set(pay_types) if pay_types is not None else None
+        date_keys = {}
+        date_key = ()
+        results = {}
+        for employee in employees:
+            employee_results = {}
+            if per_period:
+                self.update_period_totals(employee)
+                for pay_date, period_values in employee.period_totals.items():
+                    if pay_date < start_date or pay_date > end_date:
+                        continue
+                    if date_functions:
+                        date_key = date_keys.get(pay_date)
+                        if date_key is None:
+                            period = self.get_pay_period(pay_date)
+                            date_key = date_keys[pay_date] = tuple([function(employee, None, period)
+                                                                    for function in date_functions])
+                    totals = employee_results.get(date_key)
+                    if totals is None:
+                        totals = employee_results[date_key] = dict.fromkeys(values, 0)
+                    for name, getter in summed:
+                        totals[name] += getter(period_values)
+                    if count:
+                        totals[AGGREGATE_COUNT] += 1
+            else:
+                for time_entry in employee.time_entries:
+                    date = time_entry.date
+                    if date < start_date or date > end_date:
+                        continue
+                    if pay_types is not None and time_entry.pay_type not in pay_types:
+                        continue
+                    if date_functions:
+                        date_key = date_keys.get(date)
+                        if date_key is None:
+                            period = self.get_pay_period(date) if needs_period else None
+                            date_key = date_keys[date] = tuple([function(employee, time_entry, period)
+                                                                for function in date_functions])
+                    key = (date_key, entry_getter(time_entry)) if entry_getter else date_key
+                    totals = employee_results.get(key)
+                    if totals is None:
+                        totals = employee_results[key] = dict.fromkeys(values, 0)
+                    for name, getter in summed:
+                        totals[name] += getter(time_entry)
+                    if count:
+                        totals[AGGREGATE_COUNT] += 1
+
+            for key, employee_totals in employee_results.items():
+                date_part, entry_part = key if entry_getter else (key, ())
+                groups = dict(zip(date_groups, date_part))
+                groups.update(zip(entry_groups, entry_part if len(entry_groups) > 1 else (entry_part,)))
+                groups["employee"] = employee.name
+                key = tuple([groups[name] for name in group_by])
+                totals = results.get(key)
+                if totals is None:
+                    results[key] = employee_totals
+                else:
+                    for name in values:
+                        totals[name] += employee_totals[name]
+        return results
+
     def save(self) -> bool:
         """Writes any modified time entries or holidays to disk."""
         saved = False
@@ -672,9 +1587,12 @@ class DataProvider:
         for employee in self.employees:
             if not employee._time_entries_dirty:
                 continue
+            if employee._time_entries_load_failed:
+                print(f"ERROR: Unable to save time entries for {employee.name} because they failed to load.")
+                continue
 
             employee_file_name = employee.name.replace(" ", "")
-            file_path = config.EMPLOYEES_DIR / employee_file_name / f"{employee_file_name}_TimeEntries.json"
+            file_path = self.employees_dir / employee_file_name / f"{employee_file_name}_TimeEntries.json"
             file_path.parent.mkdir(parents=True, exist_ok=True)
 
             all_time_entries = [time_entry.as_dictionary() for time_entry in employee.time_entries]
@@ -682,21 +1600,31 @@ class DataProvider:
                 json.dump(all_time_entries, outfile, indent=2)
 
             employee._time_entries_dirty = False
+            self._source_signatures[str(file_path)] = snapshot.file_signature(file_path)
             saved = True
             print(f"{file_path} saved.")
 
+        # write pay period totals (after the time entries, since they are saved with their signature)
+        for employee in self.employees:
+            if employee._period_totals_dirty or employee._period_totals_stale:
+                self.update_period_totals(employee)
+                self.save_period_totals(employee)
+
         # write paid holidays
         if self._paid_holidays_dirty:
-            config.PAID_HOLIDAYS_FILE.parent.mkdir(parents=True, exist_ok=True)
+            self.paid_holidays_file.parent.mkdir(parents=True, exist_ok=True)
             all_holiday_entries = [holiday.as_dictionary() for holiday in self.paid_holidays]
-            with open(config.PAID_HOLIDAYS_FILE, 'w') as outfile:
+            with open(self.paid_holidays_file, 'w') as outfile:
                 json.dump(all_holiday_entries, outfile, indent=2)
 
             self._paid_holidays_dirty = False
+            self._source_signatures[str(self.paid_holidays_file)] = snapshot.file_signature(self.paid_holidays_file)
             saved = True
-            print(f"{config.PAID_HOLIDAYS_FILE} saved.")
+            print(f"{self.paid_holidays_file} saved.")
 
         if saved:
+            if self.use_snapshot:
+                self.save_snapshot()
             return True
         else:
             print("WARNING: Nothing to save.")
@@ -0,0 +1,354 @@
+"""Writer for the Social Security Administration EFW2 W-2 submission format.
+
+An EFW2 file is made of fixed-width 512 character records. A submission for a single household employer is:
+    RA (submitter), RE (employer), one RW (employee wage record) per employee, RT (employer totals), RF (final).
+
+See SSA Publication 42-007 "Specifications for Filing Forms W-2 Electronically (EFW2)" for the record layouts."""
+
+__author__ = 'Sean Kraft'
+
+from pathlib import Path
+import re
+
+from data_provider import Employer
+
+FORMAT_VERSION = 1  # bump whenever the written files change (cached EFW2 files are keyed on it, see report_cache.py)
+RECORD_LENGTH = 512
+RECORD_TERMINATOR = "\r\n"
+
+# RW money fields (position, box name) that are summed into the matching RT total field
+RW_MONEY_FIELDS = [(188, "wages"),
+                   (199, "federal_withholding"),
+                   (210, "ss_wages"),
+                   (221, "ss_tax_withheld"),
+                   (232, "medicare_wages"),
+                   (243, "medicare_tax_withheld")]
+RT_MONEY_FIELDS = [10, 25, 40, 55, 70, 85]
+RW_MONEY_LENGTH = 11
+RT_MONEY_LENGTH = 15
+
+# RW and RT money fields that don't apply to household employees but must be zero filled
+RW_UNUSED_MONEY_FIELDS = [254, 276, 287, 298, 309, 320, 331, 353, 364, 375, 386, 408, 419, 430, 441, 452, 463, 474]
+RT_UNUSED_MONEY_FIELDS = [100, 130, 145, 160, 175, 190, 205, 235, 250, 265, 280, 295, 310, 325, 340, 355, 370, 385, 400]
+
+
+class EFW2Error(Exception):
+    pass
+
+
+class _RecordBuilder:
+    """Builds a fixed-width record from fields that must be added in position order (positions are 1 based, as
+    they are in the SSA specification) so layout mistakes are caught as soon as a record is built."""
+    def __init__(self, record_id: str):
+        self.fields = [record_id]
+        self.length = len(record_id)
+
+    def alpha(self, position: int, length: int, value: str or None = "", upper: bool = True):
+        """Adds a left justified, blank filled text field."""
+        value = value or ""
+        if upper:
+            value = value.upper()
+        self._add(position, value[:length].ljust(length))
+
+    def numeric(self, position: int, length: int, value: int):
+        """Adds a right justified, zero filled numeric field."""
+        if value < 0:
+            raise EFW2Error(f"Negative value {value} can not be written to position {position}.")
+        text = str(value)
+        if len(text) > length:
+            raise EFW2Error(f"Value {value} overflows the {length} character field at position {position}.")
+        self._add(position, text.rjust(length, "0"))
+
+    def blank(self, position: int, length: int):
+        self._add(position, " " * length)
+
+    def _add(self, position: int, text: str):
+        if self.length != position - 1:
+            raise EFW2Error(f"Field at position {position} does not follow the previous field (ends at {self.length}).")
+        self.fields.append(text)
+        self.length += len(text)
+
+    def build(self) -> str:
+        if self.length != RECORD_LENGTH:
+            raise EFW2Error(f"{self.fields[0]} record is {self.length} characters, expected {RECORD_LENGTH}.")
+        return "".join(self.fields)
+
+
+def digits_only(value: str or None) -> str:
+    return re.sub(r"\D", "", value or "")
+
+
+def split_city_state_zip(line: str or None) -> tuple[str, str, str, str]:
+    """Splits an address line such as 'Seattle, WA 98101-1234' into city, state, zip and zip extension."""
+    match = re.match(r"^\s*(.*?),?\s+([A-Za-z]{2})\s+(\d{5})(?:-?(\d{4}))?\s*$", line or "")
+    if not match:
+        return "", "", "", ""
+    city, state, zip_code, zip_ext = match.groups()
+    return city, state.upper(), zip_code, zip_ext or ""
+
+
+def split_address(address_lines: list[str or None]) -> tuple[str, str, str, str, str]:
+    """Splits free form address lines into the EFW2 delivery address, city, state, zip and zip extension fields.
+    The last populated line is expected to hold the city, state and zip code."""
+    lines = [line for line in address_lines if line]
+    if not lines:
+        return "", "", "", "", ""
+    city, state, zip_code, zip_ext = split_city_state_zip(lines[-1])
+    if city or state:
+        delivery_lines = lines[:-1]
+    else:
+        delivery_lines = lines
+    return " ".join(delivery_lines), city, state, zip_code, zip_ext
+
+
+class EFW2Writer:
+    """Streams an EFW2 submission file to disk. The RA and RE records are written when the writer is opened, each
+    employee's RW record is written as soon as it's provided, and the RT and RF totals are written on close.
+
+    Usage:
+        with EFW2Writer(file_path, employer, 2024) as writer:
+            for report in reports:
+                writer.write_employee(report)
+    """
+    def __init__(self, file_path: Path, employer: Employer, tax_year: int):
+        self.file_path = file_path
+        self.employer = employer
+        self.tax_year = tax_year
+
+        self.employee_count = 0
+        self.totals = [0] * len(RW_MONEY_FIELDS)
+
+        self._file = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        if exc_type is None:
+            self.close()
+        elif self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def open(self):
+        if not self.employer.bso_user_id:
+            print("WARNING: No BSO User ID in employer.json. The SSA will reject the submission without one.")
+        self._file = open(self.file_path, "w", newline="")
+        self._write(self.build_ra_record())
+        self._write(self.build_re_record())
+
+    def close(self):
+        self._write(self.build_rt_record())
+        self._write(self.build_rf_record())
+        self._file.close()
+        self._file = None
+        print(f"{self.file_path} saved.")
+
+    def write_employee(self, report: 'W2ReportValues'):
+        """Writes the RW record for a single employee's W-2 values and adds them to the running totals."""
+        amounts = [getattr(report, name) for _, name in RW_MONEY_FIELDS]  # report values are already in cents
+        self._write(self.build_rw_record(report.employee, amounts))
+        self.employee_count += 1
+        self.totals = [total + amount for total, amount in zip(self.totals, amounts)]
+
+    def _write(self, record: str):
+        self._file.write(record + RECORD_TERMINATOR)
+
+    def build_ra_record(self) -> str:
+        employer = self.employer
+        delivery, city, state, zip_code, zip_ext = split_address([employer.address_line_1,
+                                                                 employer.address_line_2,
+                                                                 employer.address_line_3])
+        record = _RecordBuilder("RA")
+        record.alpha(3, 9, digits_only(employer.ein))
+        record.alpha(12, 8, employer.bso_user_id)
+        record.blank(20, 4)  # software vendor code
+        record.blank(24, 5)
+        record.alpha(29, 1, "0")  # resub indicator
+        record.blank(30, 6)  # resub wage file identifier
+        record.alpha(36, 2, "98")  # software code: in-house program
+        record.alpha(38, 57, employer.name)  # company name
+        record.blank(95, 22)  # location address
+        record.alpha(117, 22, delivery)
+        record.alpha(139, 22, city)
+        record.alpha(161, 2, state)
+        record.alpha(163, 5, zip_code)
+        record.alpha(168, 4, zip_ext)
+        record.blank(172, 5)
+        record.blank(177, 23)  # foreign state / province
+        record.blank(200, 15)  # foreign postal code
+        record.blank(215, 2)  # country code
+        record.alpha(217, 57, employer.name)  # submitter name
+        record.blank(274, 22)  # location address
+        record.alpha(296, 22, delivery)
+        record.alpha(318, 22, city)
+        record.alpha(340, 2, state)
+        record.alpha(342, 5, zip_code)
+        record.alpha(347, 4, zip_ext)
+        record.blank(351, 5)
+        record.blank(356, 23)  # foreign state / province
+        record.blank(379, 15)  # foreign postal code
+        record.blank(394, 2)  # country code
+        record.alpha(396, 27, employer.contact_name)
+        record.alpha(423, 15, digits_only(employer.contact_phone))
+        record.blank(438, 5)  # contact phone extension
+        record.blank(443, 3)
+        record.alpha(446, 40, employer.contact_email, upper=False)
+        record.blank(486, 3)
+        record.blank(489, 10)  # contact fax
+        record.blank(499, 1)
+        record.alpha(500, 1, "L")  # preparer code: self-prepared
+        record.blank(501, 12)
+        return record.build()
+
+    def build_re_record(self) -> str:
+        employer = self.employer
+        delivery, city, state, zip_code, zip_ext = split_address([employer.address_line_1,
+                                                                 employer.address_line_2,
+                                                                 employer.address_line_3])
+        record = _RecordBuilder("RE")
+        record.numeric(3, 4, self.tax_year)
+        record.blank(7, 1)  # agent indicator code
+        record.alpha(8, 9, digits_only(employer.ein))
+        record.blank(17, 9)  # agent for EIN
+        record.alpha(26, 1, "0")  # terminating business indicator
+        record.blank(27, 4)  # establishment number
+        record.blank(31, 9)  # other EIN
+        record.alpha(40, 57, employer.name)
+        record.blank(97, 22)  # location address
+        record.alpha(119, 22, delivery)
+        record.alpha(141, 22, city)
+        record.alpha(163, 2, state)
+        record.alpha(165, 5, zip_code)
+        record.alpha(170, 4, zip_ext)
+        record.alpha(174, 1, "N")  # kind of employer: none apply
+        record.blank(175, 4)
+        record.blank(179, 23)  # foreign state / province
+        record.blank(202, 15)  # foreign postal code
+        record.blank(217, 2)  # country code
+        record.alpha(219, 1, "H")  # employment code: household
+        record.blank(220, 1)  # tax jurisdiction code
+        record.alpha(221, 1, "0")  # third-party sick pay indicator
+        record.alpha(222, 27, employer.contact_name)
+        record.alpha(249, 15, digits_only(employer.contact_phone))
+        record.blank(264, 5)  # contact phone extension
+        record.blank(269, 10)  # contact fax
+        record.alpha(279, 40, employer.contact_email, upper=False)
+        record.blank(319, 194)
+        return record.build()
+
+    def build_rw_record(self, employee: 'Employee', amounts: list[int]) -> str:
+        delivery, city, state, zip_code, zip_ext = split_address([employee.address_line_1,
+                                                                 employee.address_line_2,
+                                                                 employee.address_line_3])
+        record = _RecordBuilder("RW")
+        record.alpha(3, 9, digits_only(employee.ssn))
+        record.alpha(12, 15, employee.first_name)
+        record.alpha(27, 15, employee.middle_name)
+        record.alpha(42, 20, employee.last_name)
+        record.blank(62, 4)  # suffix
+        record.blank(66, 22)  # location address
+        record.alpha(88, 22, delivery)
+        record.alpha(110, 22, city)
+        record.alpha(132, 2, state)
+        record.alpha(134, 5, zip_code)
+        record.alpha(139, 4, zip_ext)
+        record.blank(143, 5)
+        record.blank(148, 23)  # foreign state / province
+        record.blank(171, 15)  # foreign postal code
+        record.blank(186, 2)  # country code
+        for (position, _), amount in zip(RW_MONEY_FIELDS, amounts):
+            record.numeric(position, RW_MONEY_LENGTH, amount)
+        position = 254
+        while position < 485:
+            if position in RW_UNUSED_MONEY_FIELDS:
+                record.numeric(position, RW_MONEY_LENGTH, 0)
+            else:
+                record.blank(position, RW_MONEY_LENGTH)
+            position += RW_MONEY_LENGTH
+        record.blank(485, 1)
+        record.alpha(486, 1, "0")  # statutory employee indicator
+        record.blank(487, 1)
+        record.alpha(488, 1, "0")  # retirement plan indicator
+        record.alpha(489, 1, "0")  # third-party sick pay indicator
+        record.blank(490, 23)
+        return record.build()
+
+    def build_rt_record(self) -> str:
+        record = _RecordBuilder("RT")
+        record.numeric(3, 7, self.employee_count)
+        for position, total in zip(RT_MONEY_FIELDS, self.totals):
+            record.numeric(position, RT_MONEY_LENGTH, total)
+        position = 100
+        while position < 415:
+            if position in RT_UNUSED_MONEY_FIELDS:
+                record.numeric(position, RT_MONEY_LENGTH, 0)
+            else:
+                record.blank(position, RT_MONEY_LENGTH)
+            position += RT_MONEY_LENGTH
+        record.blank(415, 98)
+        return record.build()
+
+    def build_rf_record(self) -> str:
+        record = _RecordBuilder("RF")
+        record.blank(3, 5)
+        record.numeric(8, 9, self.employee_count)
+        record.blank(17, 496)
+        return record.build()
+
+
+def _field(record: str, position: int, length: int) -> str:
+    return record[position - 1:position - 1 + length]
+
+
+def validate_efw2(file_path: Path) -> list[str]:
+    """Reads back an EFW2 file and checks record lengths, record order, and that the RT and RF totals match the
+    sum of the RW records. Returns a list of problems (an empty list means the file is valid)."""
+    problems = []
+    with open(file_path, newline="") as in_file:
+        records = in_file.read().split(RECORD_TERMINATOR)
+    if records and records[-1] == "":
+        records.pop()
+
+    for i, record in enumerate(records, start=1):
+        if len(record) != RECORD_LENGTH:
+            problems.append(f"Record {i} ({record[:2]}) is {len(record)} characters, expected {RECORD_LENGTH}.")
+
+    record_ids = [record[:2] for record in records]
+    if record_ids[:2] != ["RA", "RE"]:
+        problems.append("The file must start with an RA record followed by an RE record.")
+    if record_ids[-2:] != ["RT", "RF"]:
+        problems.append("The file must end with an RT record followed by an RF record.")
+    unexpected = set(record_ids) - {"RA", "RE", "RW", "RT", "RF"}
+    if unexpected:
+        problems.append(f"Unexpected record types: {', '.join(sorted(unexpected))}")
+    if problems:
+        return problems
+
+    rw_records = [record for record in records if record.startswith("RW")]
+    rt_record = records[-2]
+    rf_record = records[-1]
+
+    totals = [0] * len(RW_MONEY_FIELDS)
+    for record in rw_records:
+        ssn = _field(record, 3, 9)
+        if not ssn.isdigit():
+            problems.append(f"RW record has an invalid SSN: '{ssn.strip()}'")
+        for i, (position, name) in enumerate(RW_MONEY_FIELDS):
+            value = _field(record, position, RW_MONEY_LENGTH)
+            if not value.isdigit():
+                problems.append(f"RW record for SSN {ssn} has a non numeric {name} field: '{value}'")
+                continue
+            totals[i] += int(value)
+
+    if int(_field(rt_record, 3, 7)) != len(rw_records):
+        problems.append(f"RT record count {int(_field(rt_record, 3, 7))} does not match {len(rw_records)} RW records.")
+    for (_, name), position, total in zip(RW_MONEY_FIELDS, RT_MONEY_FIELDS, totals):
+        rt_total = int(_field(rt_record, position, RT_MONEY_LENGTH))
+        if rt_total != total:
+            problems.append(f"RT {name} total {rt_total} does not match the RW records sum of {total}.")
+    if int(_field(rf_record, 8, 9)) != len(rw_records):
+        problems.append(f"RF record count {int(_field(rf_record, 8, 9))} does not match {len(rw_records)} RW records.")
+
+    return problems
@@ -0,0 +1,172 @@
+"""Columnar export of the payroll history for spreadsheets and analytics.
+
+Every time entry is written as one row with its employee, pay period and tax lines, so the history can be loaded
+somewhere else without reading the employee json files:
+
+    python export.py payroll_history.csv [--year 2024] [--employee "Mary Poppins"]
+    python export.py payroll_history.parquet      (needs pyarrow)
+
+Rows are built lazily and written in batches of --batch-size rows (a csv chunk or a parquet row group at a time), so
+the memory used by the export stays the same however long the history is.
+
+Money columns are whole cents. The tax lines are calculated per time entry the same way a pay period is (see
+data_provider.calculate_pay_period), with the rates of the pay period (see get_pay_period_tax_rates()) and the wage
+caps applied against the employee's earlier entries in the pay year. Pay stubs round each tax line once per pay
+period, so summing the rows of a pay period can be a cent or two off its pay stub (get_period_totals() has the filed
+amounts). Years filter on the year an entry is paid in."""
+
+__author__ = 'Sean Kraft'
+
+from pathlib import Path
+from typing import Iterator
+import argparse
+import csv
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+from data_provider import DataProvider
+from data_provider import Employee
+from data_provider import TimesheetValues
+from data_provider import calculate_pay_period
+import money
+
+BATCH_SIZE = 10000
+# column name -> column type ("string", "date", "int" or "float")
+COLUMNS = {"employee_id": "string",
+           "employee": "string",
+           "date": "date",
+           "tax_year": "int",
+           "pay_date": "date",
+           "pay_period": "int",  # 1 based number of the pay period in its pay year
+           "quarter": "int",
+           "pay_type": "string",
+           "hours": "float",
+           "pay_rate_cents": "int"}
+COLUMNS.update({f"{name}_cents": "int" for name in TimesheetValues.MONEY_FIELDS})
+COLUMNS["note"] = "string"
+FORMATS = ("csv", "parquet")
+
+
+class ExportError(Exception):
+    pass
+
+
+def get_employee_id(employee: Employee) -> str:
+    """Returns the employee's id: the name of their app data json file (ie MaryPoppins)."""
+    if employee.appdata_path is not None:
+        return employee.appdata_path.stem
+    return employee.name.replace(" ", "")
+
+
+def iter_rows(data: DataProvider, years: list[int] = None, employees: list[str] = None) -> Iterator[tuple]:
+    """Yields a row (values in COLUMNS order) per time entry, by employee and then date."""
+    years = set(years) if years else None
+    for employee in data.employees:
+        if employees and employee.name not in employees:
+            continue
+        employee_id = get_employee_id(employee)
+        ytd_gross_pay = {}  # pay year -> gross pay of the earlier entries (for the wage caps)
+        for time_entry in sorted(employee.time_entries, key=lambda entry: entry.date):
+            period = data.get_pay_period(time_entry.date)
+            if years is not None and period.year not in years:
+                continue
+
+            tax_rates = data.get_pay_period_tax_rates(period.pay_date)
+            values = None
+            if tax_rates is not None:
+                values = calculate_pay_period([time_entry], tax_rates, ytd_gross_pay.get(period.year, 0))
+                ytd_gross_pay[period.year] = ytd_gross_pay.get(period.year, 0) + values.gross_pay
+            pay_rate_cents = money.to_cents(time_entry.pay_rate)
+
+            yield (employee_id, employee.name, time_entry.date, time_entry.tax_year, period.pay_date,
+                   period.index + 1, period.quarter, time_entry.pay_type.name, time_entry.hours, pay_rate_cents,
+                   *(getattr(values, name) if values is not None else None for name in TimesheetValues.MONEY_FIELDS),
+                   time_entry.note)
+
+
+def iter_batches(rows: Iterator[tuple], batch_size: int = BATCH_SIZE) -> Iterator[dict[str, list]]:
+    """Groups rows into batches of columns ({column name: values}) of at most batch_size rows."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            yield dict(zip(COLUMNS, map(list, zip(*batch))))
+            batch = []
+    if batch:
+        yield dict(zip(COLUMNS, map(list, zip(*batch))))
+
+
+def write_csv(batches: Iterator[dict[str, list]], file_path: Path) -> int:
+    """Writes the batches to a csv file with a header row and returns the number of rows written."""
+    count = 0
+    with open(file_path, "w", newline="") as out_file:
+        writer = csv.writer(out_file)
+        writer.writerow(COLUMNS)
+        for batch in batches:
+            columns = [[value.isoformat() for value in values] if COLUMNS[name] == "date" else values
+                       for name, values in batch.items()]
+            rows = list(zip(*columns))
+            writer.writerows(rows)
+            count += len(rows)
+    return count
+
+
+def get_parquet_schema():
+    types = {"string": pyarrow.string(), "date": pyarrow.date32(), "int": pyarrow.int64(), "float": pyarrow.float64()}
+    return pyarrow.schema([(name, types[column_type]) for name, column_type in COLUMNS.items()])
+
+
+def write_parquet(batches: Iterator[dict[str, list]], file_path: Path) -> int:
+    """Writes the batches to a parquet file (one row group per batch) and returns the number of rows written."""
+    if pyarrow is None:
+        raise ExportError("Parquet exports need pyarrow (pip install pyarrow). Export to csv instead.")
+    schema = get_parquet_schema()
+    count = 0
+    with pyarrow.parquet.ParquetWriter(file_path, schema) as writer:
+        for batch in batches:
+            writer.write_table(pyarrow.Table.from_pydict(batch, schema=schema))
+            count += len(batch["date"])
+    return count
+
+
+def export_time_entries(data: DataProvider, file_path: Path, years: list[int] = None, employees: list[str] = None,
+                        file_format: str = None, batch_size: int = BATCH_SIZE) -> int:
+    """Exports the time entries (optionally only those paid in the years, for the employees) and returns the number
+    of rows written. The format is taken from the file extension if not provided."""
+    file_path = Path(file_path)
+    file_format = file_format or file_path.suffix.lstrip(".").lower()
+    if file_format not in FORMATS:
+        raise ExportError(f"Unknown export format '{file_format}'. Valid formats: {', '.join(FORMATS)}")
+    for name in employees or []:
+        if name not in data.employee_names:
+            raise ExportError(f"No employee named '{name}'.")
+
+    batches = iter_batches(iter_rows(data, years, employees), batch_size)
+    if file_format == "parquet":
+        return write_parquet(batches, file_path)
+    return write_csv(batches, file_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export every time entry with its tax lines to csv or parquet.")
+    parser.add_argument("file_path", type=Path, help="Output file (.csv or .parquet).")
+    parser.add_argument("--format", choices=FORMATS, help="Output format (the file extension by default).")
+    parser.add_argument("--year", type=int, action="append", help="Only export entries paid in the year.")
+    parser.add_argument("--employee", action="append", help="Only export the employee's entries.")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="Rows written at a time.")
+    args = parser.parse_args()
+
+    data = DataProvider()
+    try:
+        count = export_time_entries(data, args.file_path, args.year, args.employee, args.format, args.batch_size)
+    except (OSError, ExportError) as error:
+        parser.exit(1, f"ERROR: {error}\n")
+    print(f"Exported {count} time entries to {args.file_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""Annual employer cost forecasting and what-if scenarios.
+
+A Forecaster takes an employee's actual pay periods for the year up to a date and projects the remaining pay periods
+of the year from the employee's recent schedule (their average paid hours per pay period). Scenarios change the pay
+rate and/or hours of the projected periods:
+    forecaster = Forecaster(data, employee, 2024)
+    results = forecaster.run([Scenario("Current"), Scenario("Raise", pay_rate=30), Scenario("More", extra_hours=5)])
+
+Projected periods go through the same data_provider.calculate_pay_period() as the pay stubs, so every tax line, the
+wage caps and the federal withholding are calculated exactly like real time entries would be. Everything that doesn't
+depend on the scenario (the actual pay periods, the remaining pay dates and the tax rates) is calculated once when
+the Forecaster is built, and results are cached by pay rate and hours, so re-running scenarios (ie from a slider)
+only calculates the pay periods that are new."""
+
+__author__ = 'Sean Kraft'
+
+from dataclasses import dataclass, field
+from datetime import date as Date
+from datetime import timedelta
+
+import money
+import reports
+from data_provider import DataProvider
+from data_provider import Employee
+from data_provider import TimeEntry
+from data_provider import TimesheetValues
+from data_provider import calculate_pay_period
+from payroll_calendar import get_pay_date
+
+SCHEDULE_PAY_PERIODS = 4  # number of recent pay periods averaged into the employee's schedule
+
+
+@dataclass
+class Scenario:
+    name: str
+    pay_rate: int or float or None = None  # hourly pay rate for the projected periods (None keeps the current rate)
+    hours: int or float or None = None  # hours per pay period (None uses the employee's recent schedule)
+    extra_hours: int or float = 0  # hours added to every projected pay period
+
+
+@dataclass
+class ForecastResult:
+    """The forecast for a scenario. Money values are in whole cents (see money.py)."""
+    scenario: Scenario
+    pay_rate: int or float
+    hours: int or float  # hours per projected pay period
+    actual: TimesheetValues
+    projected: TimesheetValues
+    periods: list[tuple[Date, TimesheetValues]] = field(default_factory=list)  # projected pay periods
+
+    @property
+    def total(self) -> TimesheetValues:
+        """The actual year to date plus the projected rest of the year."""
+        total = TimesheetValues()
+        total.add(self.actual)
+        total.add(self.projected)
+        return total
+
+
+class Forecaster:
+    def __init__(self, data: DataProvider, employee: Employee, year: int, as_of: Date = None):
+        self.data_provider = data
+        self.employee = employee
+        self.year = year
+        self.tax_rates = self.data_provider.get_tax_rates(year=year)
+        if self.tax_rates is None:
+            raise ValueError(f"No tax rates found for {year}.")
+
+        # actual pay periods up to and including the last pay date on or before as_of
+        calendar = self.data_provider.get_payroll_calendar(year)
+        as_of = as_of or Date.today()
+        self.last_pay_date = get_pay_date(as_of, calendar.payroll_day)
+        if self.last_pay_date > as_of:
+            self.last_pay_date -= timedelta(weeks=1)
+        self.last_pay_date = min(self.last_pay_date, calendar.end_date)
+        actual_periods = list(reports.iter_pay_periods(self.data_provider, self.employee, calendar.start_date,
+                                                       self.last_pay_date))
+        self.actual = TimesheetValues()
+        for _, values in actual_periods:
+            self.actual.add(values)
+
+        # remaining pay dates in the year
+        self.pay_dates = [pay_date for pay_date in calendar.pay_dates if pay_date > self.last_pay_date]
+
+        # the schedule is the average paid hours of the most recent pay periods
+        recent = [values.hours for _, values in actual_periods[-SCHEDULE_PAY_PERIODS:]]
+        self.schedule_hours = round(sum(recent) / len(recent), 2) if recent else 0
+
+        self._withholding = {}  # federal withholding (cents) by pay period gross pay (cents)
+        self._results = {}  # (pay rate, hours) -> (projected values, projected periods)
+
+    def __repr__(self):
+        return f"Forecaster(employee={self.employee.name}, year={self.year}, last_pay_date={self.last_pay_date})"
+
+    def federal_withholding(self, gross_pay: int) -> int:
+        """Returns the federal withholding in cents for a pay period of gross_pay cents (cached)."""
+        if gross_pay not in self._withholding:
+            self._withholding[gross_pay] = reports.calculate_federal_withholding(gross_pay, self.employee,
+                                                                                 self.tax_rates)
+        return self._withholding[gross_pay]
+
+    def project(self, pay_rate: int or float, hours: int or float) -> tuple[TimesheetValues, list]:
+        """Projects the remaining pay periods at a pay rate and hours per pay period."""
+        key = (money.to_cents(pay_rate), money.to_hundredths(hours))
+        if key in self._results:
+            return self._results[key]
+
+        projected = TimesheetValues()
+        periods = []
+        ytd_gross_pay = self.actual.gross_pay
+        for pay_date in self.pay_dates:
+            entry = TimeEntry(date=pay_date, tax_year=self.year, hours=hours, pay_rate=pay_rate)
+            entry.federal_withholding = money.to_dollars(self.federal_withholding(entry.gross_pay_cents))
+            values = calculate_pay_period([entry], self.tax_rates, ytd_gross_pay)
+            ytd_gross_pay += values.gross_pay
+            projected.add(values)
+            periods.append((pay_date, values))
+
+        self._results[key] = projected, periods
+        return self._results[key]
+
+    def run_scenario(self, scenario: Scenario) -> ForecastResult:
+        pay_rate = self.employee.pay_rate if scenario.pay_rate is None else scenario.pay_rate
+        hours = (self.schedule_hours if scenario.hours is None else scenario.hours) + scenario.extra_hours
+        projected, periods = self.project(pay_rate, hours)
+        return ForecastResult(scenario, pay_rate, hours, self.actual, projected, periods)
+
+    def run(self, scenarios: list[Scenario]) -> list[ForecastResult]:
+        """Runs a batch of scenarios. Scenarios with the same pay rate and hours share a single projection."""
+        return [self.run_scenario(scenario) for scenario in scenarios]
+
+    def print_results(self, results: list[ForecastResult]):
+        """Prints the projected annual totals for each scenario."""
+        print(f"--{self.year} FORECAST FOR {self.employee.name.upper()} ({len(self.pay_dates)} pay periods left)--")
+        for result in results:
+            total = result.total
+            print(f"{result.scenario.name}: ${result.pay_rate:.2f}/hr, {result.hours:g} hours per pay period")
+            print(f" - Gross Pay: {money.format_dollars(total.gross_pay)}")
+            print(f" - Employee Taxes Withheld: {money.format_dollars(total.employee_taxes_withheld)}")
+            print(f" - Employer Taxes: {money.format_dollars(total.company_tax_contributions)}")
+            print(f" - Employer Total Costs: {money.format_dollars(total.company_total_costs)} "
+                  f"({money.format_dollars(result.projected.company_total_costs)} for the rest of the year)")
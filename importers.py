@@ -0,0 +1,305 @@
+"""Bulk time entry import from timeclock exports.
+
+Two formats are read:
+    csv   a header row and one time entry per line. Columns (case and spacing don't matter):
+          Employee, Date, Hours, and optionally PayType, Reimbursement and Note. Dates are ISO (2024-06-07) or
+          MM/DD/YYYY, pay types are names (Paid Time Off, PAID_TIME_OFF) or PayType values. The Employee column can
+          be left out if a default employee is given.
+    ics   calendar events (ie a shared "nanny hours" calendar). Each timed event is a regular time entry on its start
+          date, its hours are the event's length and its summary is the note. All day events are skipped. Times are
+          used as written (they are not converted between time zones).
+
+The whole file is validated before anything is added: employees and tax years are resolved once, existing dates are
+looked up in a per employee set, and dates that are paid holidays default to the paid holiday pay type (with the
+holiday's name as the note), like the Enter Time fields do. Rows with problems are skipped and reported, and the
+rest are added together and written with a single save.
+
+    result = import_time_entries(data, Path("timeclock.csv"))
+    print(result)  # ImportResult(added=260, skipped=2)"""
+
+__author__ = 'Sean Kraft'
+
+from datetime import date as Date
+from datetime import datetime
+from datetime import timedelta
+from pathlib import Path
+import csv
+import math
+import re
+
+from data_provider import DataProvider
+from data_provider import Employee
+from data_provider import PayType
+from data_provider import TimeEntry
+
+CSV_COLUMNS = {"employee": "employee", "name": "employee", "date": "date", "hours": "hours", "paytype": "pay_type",
+               "type": "pay_type", "reimbursement": "reimbursement", "note": "note", "notes": "note"}
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y")
+ICS_DURATION = re.compile(r"^P(?:(\d+)W)?(?:(\d+)D)?(?:T(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?)?$")
+
+
+class ImportFileError(Exception):
+    pass
+
+
+class ImportRow:
+    """A single time entry read from an import file (before it is validated)."""
+    def __init__(self, source: str, **kwargs):
+        self.source: str = source  # file name and line, for problem messages
+        self.employee: str = kwargs.get("employee")
+        self.date: Date = kwargs.get("date")
+        self.hours: int or float = kwargs.get("hours")
+        self.pay_type: PayType or None = kwargs.get("pay_type")  # None uses the paid holiday or regular pay type
+        self.reimbursement: int or float = kwargs.get("reimbursement", 0)
+        self.note: str = kwargs.get("note")
+
+    def __repr__(self):
+        return f"ImportRow(source={self.source}, employee={self.employee}, date={self.date}, hours={self.hours}, " \
+               f"pay_type={self.pay_type})"
+
+
+class ImportResult:
+    def __init__(self):
+        self.added: dict[str, list[TimeEntry]] = {}  # employee name -> added time entries
+        self.problems: list[str] = []  # rows that were skipped (and why)
+        self.warnings: list[str] = []  # rows that were added, but may need a second look
+        self.saved = False
+
+    def __repr__(self):
+        return f"ImportResult(added={self.added_count}, skipped={len(self.problems)})"
+
+    @property
+    def added_count(self) -> int:
+        return sum(len(time_entries) for time_entries in self.added.values())
+
+    def summary(self, max_lines: int = 10) -> str:
+        lines = [f"Imported {self.added_count} time entries" +
+                 "".join(f"\n    {name}: {len(entries)}" for name, entries in self.added.items())]
+        for title, messages in (("Skipped", self.problems), ("Warnings", self.warnings)):
+            if messages:
+                lines.append(f"{title} ({len(messages)}):")
+                lines += [f"    {message}" for message in messages[:max_lines]]
+                if len(messages) > max_lines:
+                    lines.append(f"    ...and {len(messages) - max_lines} more")
+        return "\n".join(lines)
+
+
+def parse_date(value: str) -> Date:
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value.strip(), date_format).date()
+        except ValueError:
+            continue
+    raise ValueError(f"'{value}' isn't a date (use YYYY-MM-DD or MM/DD/YYYY).")
+
+
+def parse_pay_type(value: str) -> PayType or None:
+    value = value.strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return PayType(int(value))
+    try:
+        return PayType[value.replace(" ", "_").upper()]
+    except KeyError:
+        raise ValueError(f"'{value}' isn't a pay type. Valid pay types: {', '.join(PayType.__members__)}")
+
+
+def read_csv(file_path: Path, default_employee: str = None) -> tuple[list[ImportRow], list[str]]:
+    """Returns the rows of a csv file and the problems with any rows that couldn't be read."""
+    rows, problems = [], []
+    with open(file_path, newline="", encoding="utf-8-sig") as in_file:
+        reader = csv.reader(in_file)
+        header = next(reader, None)
+        if header is None:
+            raise ImportFileError(f"'{file_path.name}' is empty.")
+        columns = [CSV_COLUMNS.get(re.sub(r"[\s_]", "", name).lower()) for name in header]
+        missing = {"date", "hours"} - set(columns)
+        if "employee" not in columns and default_employee is None:
+            missing.add("employee")
+        if missing:
+            raise ImportFileError(f"'{file_path.name}' is missing the {', '.join(sorted(missing))} column(s).")
+
+        for line, values in enumerate(reader, start=2):
+            if not any(value.strip() for value in values):
+                continue
+            source = f"{file_path.name} line {line}"
+            row = dict(zip(columns, values))
+            try:
+                rows.append(ImportRow(source,
+                                      employee=row.get("employee", "").strip() or default_employee,
+                                      date=parse_date(row["date"]),
+                                      hours=float(row["hours"] or 0),
+                                      pay_type=parse_pay_type(row.get("pay_type", "")),
+                                      reimbursement=float(row.get("reimbursement") or 0),
+                                      note=row.get("note", "").strip() or None))
+            except (KeyError, ValueError) as error:
+                problems.append(f"{source}: {error}")
+    return rows, problems
+
+
+def _parse_ics_datetime(value: str) -> datetime or Date:
+    value = value.rstrip("Z")
+    if "T" in value:
+        return datetime.strptime(value, "%Y%m%dT%H%M%S")
+    return datetime.strptime(value, "%Y%m%d").date()
+
+
+def _parse_ics_duration(value: str) -> timedelta:
+    match = ICS_DURATION.match(value)
+    if not match:
+        raise ValueError(f"'{value}' isn't a duration.")
+    weeks, days, hours, minutes, seconds = (int(group or 0) for group in match.groups())
+    return timedelta(weeks=weeks, days=days, hours=hours, minutes=minutes, seconds=seconds)
+
+
+def read_ics(file_path: Path, default_employee: str = None,
+             employee_names: list[str] = ()) -> tuple[list[ImportRow], list[str]]:
+    """Returns the timed events of an ics file as rows, and the problems with any events that couldn't be read.
+    If an event's summary is one of the employee_names, the entry is for that employee (without a note), otherwise
+    it is for the default employee."""
+    rows, problems = [], []
+    lines = []
+    for line in file_path.read_text(encoding="utf-8-sig").splitlines():
+        if line[:1] in (" ", "\t") and lines:
+            lines[-1] += line[1:]  # unfold continued lines
+        else:
+            lines.append(line)
+
+    event = None
+    for line in lines:
+        if line == "BEGIN:VEVENT":
+            event = {}
+            continue
+        if event is None:
+            continue
+        if line == "END:VEVENT":
+            source = f"{file_path.name} event {event.get('UID', len(rows) + len(problems) + 1)}"
+            try:
+                row = _ics_event_to_row(source, event, default_employee, employee_names)
+                if row is not None:
+                    rows.append(row)
+            except (KeyError, ValueError) as error:
+                problems.append(f"{source}: {error}")
+            event = None
+            continue
+        name, _, value = line.partition(":")
+        event[name.split(";")[0].upper()] = value.strip()
+    return rows, problems
+
+
+def _ics_event_to_row(source: str, event: dict, default_employee: str, employee_names: list[str]) -> ImportRow:
+    start = _parse_ics_datetime(event["DTSTART"])
+    if not isinstance(start, datetime):
+        return None  # all day events aren't worked time
+    if "DTEND" in event:
+        end = _parse_ics_datetime(event["DTEND"])
+    else:
+        end = start + _parse_ics_duration(event["DURATION"])
+    if not isinstance(end, datetime) or end <= start:
+        raise ValueError("the event doesn't end after it starts.")
+
+    summary = event.get("SUMMARY", "").replace("\\,", ",").strip()
+    employee = summary if summary in employee_names else default_employee
+    if employee is None:
+        raise ValueError(f"no employee for the event '{summary}'.")
+    return ImportRow(source, employee=employee, date=start.date(),
+                     hours=round((end - start).total_seconds() / 3600, 2),
+                     note=None if summary == employee else summary or None)
+
+
+def read_file(file_path: Path, default_employee: str = None,
+              employee_names: list[str] = ()) -> tuple[list[ImportRow], list[str]]:
+    suffix = file_path.suffix.lower()
+    if suffix == ".csv":
+        return read_csv(file_path, default_employee)
+    if suffix in (".ics", ".ical"):
+        return read_ics(file_path, default_employee, employee_names)
+    raise ImportFileError(f"Can't import '{file_path.name}'. Valid file types: .csv, .ics")
+
+
+def validate_rows(data: DataProvider, rows: list[ImportRow], allow_existing_dates: bool = False,
+                  result: ImportResult = None) -> tuple[dict[Employee, list[TimeEntry]], ImportResult]:
+    """Turns the rows into time entries per employee in one pass. Rows on a date that already has time entries are
+    skipped (so importing the same export twice doesn't double the hours) unless allow_existing_dates is True. The
+    same date can be in the file more than once (ie a day split between regular and paid time off), but not the
+    same date, hours and pay type."""
+    result = result or ImportResult()
+    employees = {employee.name: employee for employee in data.employees}
+    tax_years = {}  # year -> tax year
+    holidays = {holiday.date: holiday.name for holiday in data.paid_holidays}
+    existing_dates = {}  # employee name -> dates with time entries before the import
+    imported = {}  # employee name -> {(date, hours, pay type)} imported so far
+
+    entries = {}
+    for row in rows:
+        employee = employees.get(row.employee)
+        if employee is None:
+            result.problems.append(f"{row.source}: no employee named '{row.employee}'.")
+            continue
+        if not math.isfinite(row.hours):
+            result.problems.append(f"{row.source}: hours must be a number, not {row.hours}.")
+            continue
+        if not math.isfinite(row.reimbursement or 0):
+            result.problems.append(f"{row.source}: reimbursement must be a number, not {row.reimbursement}.")
+            continue
+        if row.hours < 0:
+            result.problems.append(f"{row.source}: hours can't be negative.")
+            continue
+        if row.hours == 0 and not row.reimbursement:
+            result.problems.append(f"{row.source}: there are no hours or reimbursement.")
+            continue
+
+        if row.date.year not in tax_years:
+            tax_years[row.date.year] = data.get_tax_year(row.date)
+        tax_year = tax_years[row.date.year]
+        if tax_year is None:
+            result.problems.append(f"{row.source}: there are no tax rates.")
+            continue
+
+        pay_type = row.pay_type
+        note = row.note
+        if row.date in holidays and pay_type in (None, PayType.PAID_HOLIDAY):
+            pay_type = PayType.PAID_HOLIDAY
+            note = note or holidays[row.date]
+        pay_type = pay_type or PayType.REGULAR
+
+        if employee.name not in existing_dates:
+            existing_dates[employee.name] = {time_entry.date for time_entry in employee.time_entries}
+        if row.date in existing_dates[employee.name] and not allow_existing_dates:
+            result.problems.append(f"{row.source}: {employee.name} already has time entries on {row.date}.")
+            continue
+        key = (row.date, row.hours, pay_type)
+        employee_imported = imported.setdefault(employee.name, set())
+        if key in employee_imported:
+            result.problems.append(f"{row.source}: duplicate of an earlier row.")
+            continue
+        employee_imported.add(key)
+
+        if tax_year != row.date.year:
+            result.warnings.append(f"{row.source}: there are no {row.date.year} tax rates, {tax_year} was used.")
+
+        entries.setdefault(employee, []).append(TimeEntry(date=row.date, tax_year=tax_year, hours=row.hours,
+                                                          pay_rate=employee.pay_rate, pay_type=pay_type,
+                                                          reimbursement=row.reimbursement, note=note))
+    return entries, result
+
+
+def import_time_entries(data: DataProvider, file_path: Path, default_employee: str = None,
+                        allow_existing_dates: bool = False, dry_run: bool = False) -> ImportResult:
+    """Reads, validates and adds the time entries in a csv or ics file, then saves. Nothing is added if dry_run is
+    True (the result still lists what would be added and skipped)."""
+    file_path = Path(file_path)
+    rows, problems = read_file(file_path, default_employee, data.employee_names)
+    result = ImportResult()
+    result.problems += problems
+    entries, result = validate_rows(data, rows, allow_existing_dates, result)
+
+    for employee, time_entries in entries.items():
+        time_entries.sort(key=lambda time_entry: time_entry.date)
+        result.added[employee.name] = time_entries
+        if not dry_run:
+            data.add_time_entries(employee, time_entries)
+    if entries and not dry_run:
+        result.saved = data.save()
+    return result
@@ -0,0 +1,208 @@
+"""Paid time off, sick time and holiday balances with accrual rules.
+
+Each employee has a LeaveLedger built from their accrual rules (the "LeaveAccrual" list in the employee json):
+    {"Leave": "PAID_SICK_TIME", "Kind": "per_hour", "Hours": 1, "PerHoursWorked": 40, "CarryoverCap": 40}
+Leave is the pay type the hours are used with. The kinds of rules are:
+    annual_grant   Hours are granted at the start of every pay year.
+    per_hour       Hours are earned for every PerHoursWorked regular hours worked (WA sick leave: 1 per 40).
+    per_period     Hours are earned on every pay date.
+CarryoverCap limits the hours carried into a new pay year (0 means unused hours are lost, missing means no limit,
+and an overdrawn balance starts the year at 0 when there is a cap) and MaxBalance limits the balance accruals can
+build up to. Employees without a LeaveAccrual list get an annual grant of their PaidVacationHoursPerYear,
+PaidSickHoursPerYear and PaidHolidayHoursPerYear with no carryover.
+
+Years follow the pay dates (like the year to date values on a pay stub): a pay year starts on the first day of its
+first pay period. Accruals start with the pay year of the employee's first time entry, and balances before it are 0.
+
+The ledger keeps a checkpoint (date, balance) for every date a balance changes, so a "balance as of" lookup is a
+bisect. It is only built up to the latest date asked for, and a change to the time entries only drops the checkpoints
+from the changed date on, so adding this week's time only replays this week."""
+
+__author__ = 'Sean Kraft'
+
+from bisect import bisect_left
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date as Date
+from datetime import timedelta
+
+import payroll_calendar
+
+LEAVE_PAY_TYPES = ("PAID_TIME_OFF", "PAID_SICK_TIME", "PAID_HOLIDAY")  # PayType names of the leave hours
+WORKED_PAY_TYPE = "REGULAR"  # only regular hours count as hours worked for per hour accruals
+ACCRUAL_KINDS = ("annual_grant", "per_hour", "per_period")
+ONE_DAY = timedelta(days=1)
+
+
+@dataclass
+class AccrualRule:
+    leave: str  # PayType name of the leave (ie "PAID_SICK_TIME")
+    kind: str  # one of ACCRUAL_KINDS
+    hours: int or float  # hours granted per year or pay period, or earned per per_hours_worked
+    per_hours_worked: int or float = 0  # per_hour rules only
+    carryover_cap: int or float = None  # max hours carried into a new pay year (None for no limit)
+    max_balance: int or float = None  # max balance accruals can build up to (None for no limit)
+
+    JSON_KEYS = {"leave": "Leave", "kind": "Kind", "hours": "Hours", "per_hours_worked": "PerHoursWorked",
+                 "carryover_cap": "CarryoverCap", "max_balance": "MaxBalance"}
+
+    def __post_init__(self):
+        if self.leave not in LEAVE_PAY_TYPES:
+            raise ValueError(f"'{self.leave}' isn't a leave pay type. Valid leave: {', '.join(LEAVE_PAY_TYPES)}")
+        if self.kind not in ACCRUAL_KINDS:
+            raise ValueError(f"'{self.kind}' isn't an accrual kind. Valid kinds: {', '.join(ACCRUAL_KINDS)}")
+        if self.kind == "per_hour" and not self.per_hours_worked > 0:
+            raise ValueError("per_hour accrual rules need a PerHoursWorked value above 0.")
+
+    def as_dictionary(self):
+        """Returns the rule as a dictionary. (so it can be written to json)"""
+        return {key: getattr(self, name) for name, key in self.JSON_KEYS.items() if getattr(self, name) is not None}
+
+    @classmethod
+    def from_dictionary(cls, in_dict: dict) -> 'AccrualRule':
+        """Creates a rule from a dictionary. (so it can be loaded from json)"""
+        return cls(**{name: in_dict[key] for name, key in cls.JSON_KEYS.items() if key in in_dict})
+
+
+def default_rules(paid_vacation: int or float, paid_sick: int or float,
+                  paid_holidays: int or float) -> list[AccrualRule]:
+    """Returns the rules for employees without a LeaveAccrual list: the yearly hours are granted at the start of each
+    pay year and unused hours don't carry over."""
+    return [AccrualRule(leave, "annual_grant", hours or 0, carryover_cap=0)
+            for leave, hours in zip(LEAVE_PAY_TYPES, (paid_vacation, paid_sick, paid_holidays))]
+
+
+class LeaveAccrual:
+    """The combined rules of a single leave pay type."""
+    def __init__(self, rules: list[AccrualRule]):
+        self.annual_grant = sum(rule.hours for rule in rules if rule.kind == "annual_grant")
+        self.per_period = sum(rule.hours for rule in rules if rule.kind == "per_period")
+        self.per_hour_worked = sum(rule.hours / rule.per_hours_worked for rule in rules if rule.kind == "per_hour")
+        carryover_caps = [rule.carryover_cap for rule in rules if rule.carryover_cap is not None]
+        max_balances = [rule.max_balance for rule in rules if rule.max_balance is not None]
+        self.carryover_cap = min(carryover_caps) if carryover_caps else None
+        self.max_balance = min(max_balances) if max_balances else None
+
+    def accrue(self, balance: float, hours: float) -> float:
+        if not hours:
+            return balance
+        balance += hours
+        return min(balance, self.max_balance) if self.max_balance is not None else balance
+
+    def start_year(self, balance: float) -> float:
+        if self.carryover_cap is not None:
+            balance = max(0, min(balance, self.carryover_cap))  # overdrawn hours were paid, they don't carry over
+        return self.accrue(balance, self.annual_grant)
+
+
+class LeaveLedger:
+    """Running leave balances of one employee (see the module docstring)."""
+    def __init__(self, rules: list[AccrualRule] = None):
+        self.rules: list[AccrualRule] = rules or []
+        self.accruals = {leave: LeaveAccrual([rule for rule in self.rules if rule.leave == leave])
+                         for leave in LEAVE_PAY_TYPES}
+        self.payroll_day = None
+        self.origin: Date or None = None  # the ledger starts at the start of this pay year
+        self.first_date: Date or None = None  # the employee's first time entry the origin is anchored to
+        self.built_through: Date or None = None  # checkpoints are complete up to and including this date
+        # leave -> checkpoint dates and the balance at the end of each of them (parallel lists, sorted by date)
+        self.dates: dict[str, list[Date]] = {leave: [] for leave in LEAVE_PAY_TYPES}
+        self.balances: dict[str, list[float]] = {leave: [] for leave in LEAVE_PAY_TYPES}
+
+    def __repr__(self):
+        return f"LeaveLedger(rules={len(self.rules)}, built_through={self.built_through})"
+
+    def invalidate(self, date: Date = None):
+        """Drops the checkpoints from the date on (all of them by default). Call this whenever a time entry on the
+        date is added, changed or removed."""
+        if date is None or self.first_date is None or date <= self.first_date:
+            # the first time entry may have changed, which moves the origin
+            self.origin = None
+            self.first_date = None
+            self.built_through = None
+            for leave in LEAVE_PAY_TYPES:
+                self.dates[leave] = []
+                self.balances[leave] = []
+            return
+        if self.built_through is None or date > self.built_through:
+            return
+        for leave in LEAVE_PAY_TYPES:
+            index = bisect_left(self.dates[leave], date)
+            del self.dates[leave][index:]
+            del self.balances[leave][index:]
+        self.built_through = date - ONE_DAY
+
+    def get_balance(self, leave: str, date: Date, time_entries: list, payroll_day: int = 4) -> float:
+        """Returns the leave balance at the end of the date (0 before the origin). time_entries are the employee's
+        time entries."""
+        if payroll_day != self.payroll_day:
+            self.invalidate()
+            self.payroll_day = payroll_day
+        self.build(date, time_entries)
+
+        index = bisect_right(self.dates[leave], date) - 1
+        return self.balances[leave][index] if index >= 0 else 0
+
+    def get_balances(self, date: Date, time_entries: list, payroll_day: int = 4) -> dict[str, float]:
+        """Returns {leave: balance} at the end of the date."""
+        return {leave: self.get_balance(leave, date, time_entries, payroll_day) for leave in LEAVE_PAY_TYPES}
+
+    def get_year_start(self, date: Date) -> Date:
+        year = payroll_calendar.get_pay_date(date, self.payroll_day).year
+        return payroll_calendar.get_payroll_calendar(year, self.payroll_day).start_date
+
+    def build(self, through: Date, time_entries: list):
+        """Adds the checkpoints after built_through up to and including the through date. The origin is the start of
+        the pay year of the first time entry, so the balances don't depend on which dates were asked about before.
+        Without time entries there is nothing to replay and the ledger starts at the pay year of the through date."""
+        if self.origin is not None and self.first_date is None and \
+                (time_entries or self.get_year_start(through) != self.origin):
+            self.invalidate()
+        if self.origin is None:
+            self.first_date = min((time_entry.date for time_entry in time_entries), default=None)
+            self.origin = self.get_year_start(self.first_date or through)
+            self.built_through = self.origin - ONE_DAY
+        if through <= self.built_through:
+            return
+        start = self.built_through + ONE_DAY
+
+        # the time entries, pay year starts and pay dates in the range, by date
+        events: dict[Date, list] = {}
+        for time_entry in time_entries:
+            if start <= time_entry.date <= through:
+                events.setdefault(time_entry.date, []).append(time_entry)
+        year_starts = set()
+        year = payroll_calendar.get_pay_date(start, self.payroll_day).year
+        year_start = payroll_calendar.get_payroll_calendar(year, self.payroll_day).start_date
+        while year_start <= through:
+            if year_start >= start:
+                year_starts.add(year_start)
+            year += 1  # a pay year can start in december of the year before
+            year_start = payroll_calendar.get_payroll_calendar(year, self.payroll_day).start_date
+        pay_dates = set()
+        if any(accrual.per_period for accrual in self.accruals.values()):
+            pay_date = payroll_calendar.get_pay_date(start, self.payroll_day)
+            while pay_date <= through:
+                pay_dates.add(pay_date)
+                pay_date += timedelta(days=payroll_calendar.DAYS_PER_PERIOD)
+
+        for leave, accrual in self.accruals.items():
+            dates, balances = self.dates[leave], self.balances[leave]
+            balance = balances[-1] if balances else 0
+            for date in sorted(events.keys() | year_starts | pay_dates):
+                new_balance = balance
+                if date in year_starts:
+                    new_balance = accrual.start_year(new_balance)
+                for time_entry in events.get(date, []):
+                    pay_type = time_entry.pay_type.name
+                    if pay_type == leave:
+                        new_balance -= time_entry.hours
+                    elif pay_type == WORKED_PAY_TYPE and accrual.per_hour_worked:
+                        new_balance = accrual.accrue(new_balance, time_entry.hours * accrual.per_hour_worked)
+                if date in pay_dates:
+                    new_balance = accrual.accrue(new_balance, accrual.per_period)
+                if new_balance != balance or not balances:
+                    dates.append(date)
+                    balances.append(new_balance)
+                    balance = new_balance
+        self.built_through = through
@@ -1,15 +1,73 @@
 __author__ = 'Sean Kraft'
 
-from PySide6 import QtWidgets
+from contextlib import nullcontext
+from pathlib import Path
+import argparse
 import sys
-import data_provider
-import ui
 
+from startup_profiler import StartupProfiler
 
-if __name__ == '__main__':
-    data = data_provider.DataProvider()
+STARTUP_PROFILE_FILE = Path("startup_profile.txt")
+FIRST_PAINT_TIMEOUT = 10  # seconds to wait for the first paint before writing the report anyway
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Nanny Payroll Manager")
+    parser.add_argument("--profile-startup", nargs="?", type=Path, const=STARTUP_PROFILE_FILE, metavar="REPORT",
+                        help="Time each launch phase and data loader up to the window's first paint, write the report "
+                             "(startup_profile.txt by default), and quit.")
+    parser.add_argument("--cprofile", action="store_true",
+                        help="With --profile-startup: also run the launch under cProfile.")
+    args = parser.parse_args()
+
+    profiler = StartupProfiler(use_cprofile=args.cprofile) if args.profile_startup else None
+
+    def phase(name: str):
+        return profiler.phase(name) if profiler is not None else nullcontext()
+
+    # the imports are timed too: Qt and borb (imported by the report modules) are a large part of the launch
+    with phase("import PySide6"):
+        from PySide6 import QtCore
+        from PySide6 import QtWidgets
+    with phase("import data_provider"):
+        import data_provider
+    with phase("import pdf_renderers (borb)"):
+        import pdf_renderers  # only imported here to time it, ui imports it through reports
+    with phase("import ui"):
+        import ui
+
+    with phase("DataProvider()"):
+        data = data_provider.DataProvider()
+    with phase("QApplication()"):
+        app = QtWidgets.QApplication([])
+    with phase("NannyPayrollMangerUI()"):
+        manager_ui = ui.NannyPayrollMangerUI(data)
+    with phase("show()"):
+        manager_ui.show()
+
+    if profiler is not None:
+        profiler.add_timings("DataProvider()", data.load_timings)
+        profiler.add_timings("NannyPayrollMangerUI()", manager_ui.startup_timings)
+        first_paint = profiler.begin("event loop until first paint")
+
+        def write_report():
+            if manager_ui.first_paint_time is None and profiler.total < FIRST_PAINT_TIMEOUT:
+                QtCore.QTimer.singleShot(1, write_report)  # not painted yet
+                return
+            # the launch ends at the first paint, not when this timer happened to run
+            profiler.end(first_paint, manager_ui.first_paint_time)
+            profiler.stop(manager_ui.first_paint_time)
+            try:
+                print(profiler.write(args.profile_startup))
+                print(f"{args.profile_startup} saved.")
+            finally:
+                app.quit()
+
+        # runs once the event loop has processed the events queued by show(), which include the first paint
+        QtCore.QTimer.singleShot(0, write_report)
 
-    app = QtWidgets.QApplication([])
-    manager_ui = ui.NannyPayrollMangerUI(data)
-    manager_ui.show()
     sys.exit(app.exec())
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""Integer fixed-point money arithmetic for payroll calculations.
+
+Dollar amounts are held as whole cents, hours as hundredths of an hour, and tax rates as rate units where
+RATE_SCALE units is 100% (a 1.45% rate is 1,450,000 units). All arithmetic is done on python ints, so it is exact,
+and every conversion back to whole cents goes through round_div() which rounds half away from zero (the way
+the IRS rounds to the cent). Floats and strings from the json files are only converted at the edges with
+to_cents(), to_hundredths() and percent_to_rate()."""
+
+__author__ = 'Sean Kraft'
+
+from decimal import Decimal
+from decimal import ROUND_HALF_UP
+
+CENTS_PER_DOLLAR = 100
+HOURS_SCALE = 100  # hours are held in hundredths of an hour
+RATE_SCALE = 10 ** 8  # rate units per 1.0 (100%)
+
+
+def round_div(numerator: int, denominator: int) -> int:
+    """Integer division rounded half away from zero. (denominator must be positive)"""
+    if numerator >= 0:
+        return (numerator + denominator // 2) // denominator
+    return -((-numerator + denominator // 2) // denominator)
+
+
+def _to_scaled(value: int or float or str, scale: int) -> int:
+    """Converts a number to an int at the provided scale, rounding half away from zero. Floats are converted
+    through their shortest repr so a json value like 0.1 is treated as exactly one tenth."""
+    if isinstance(value, int):
+        return value * scale
+    return int((Decimal(str(value)) * scale).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_cents(dollars: int or float or str or None) -> int:
+    """Converts a dollar amount to whole cents. (None is treated as 0)"""
+    if dollars is None:
+        return 0
+    return _to_scaled(dollars, CENTS_PER_DOLLAR)
+
+
+def to_hundredths(hours: int or float or str or None) -> int:
+    """Converts hours to hundredths of an hour. (None is treated as 0)"""
+    if hours is None:
+        return 0
+    return _to_scaled(hours, HOURS_SCALE)
+
+
+def percent_to_rate(percent: int or float or str) -> int:
+    """Converts a percent value (ie 1.45 for 1.45%) to rate units."""
+    return _to_scaled(percent, RATE_SCALE // 100)
+
+
+def to_dollars(cents: int) -> float:
+    """Converts cents to a float dollar amount (for storing in json or handing to code that expects dollars)."""
+    return cents / CENTS_PER_DOLLAR
+
+
+def apply_rate(cents: int, rate: int) -> int:
+    """Returns cents * rate rounded to the nearest cent."""
+    return round_div(cents * rate, RATE_SCALE)
+
+
+def multiply_hours(cents_per_hour: int, hundredths: int) -> int:
+    """Returns the pay for the provided hours (in hundredths) at an hourly rate, rounded to the nearest cent."""
+    return round_div(cents_per_hour * hundredths, HOURS_SCALE)
+
+
+def format_amount(cents: int) -> str:
+    """Formats cents as a plain decimal dollar amount: 1234.56"""
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(abs(cents), CENTS_PER_DOLLAR)
+    return f"{sign}{dollars}.{cents:02d}"
+
+
+def format_dollars(cents: int) -> str:
+    """Formats cents as a dollar amount with thousands separators: $1,234.56"""
+    sign = "-" if cents < 0 else ""
+    dollars, cents = divmod(abs(cents), CENTS_PER_DOLLAR)
+    return f"{sign}${dollars:,}.{cents:02d}"
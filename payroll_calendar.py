@@ -0,0 +1,123 @@
+"""Pay period math for a payroll year.
+
+A pay period is the week ending on (and including) the employer's payroll day of week. Wages are reported when they
+are paid, so a pay period belongs to the quarter and tax year of its pay date, even if it starts in the quarter or
+year before (ie the pay period ending Friday January 3rd 2025 is in 2025 Q1, including its 2024 days).
+
+A PayrollCalendar precomputes every pay period of a year, and since the periods are consecutive weeks, mapping a date
+to its pay period is a single subtraction and division. Calendars are immutable and shared through
+get_payroll_calendar(), so reports and the UI all use the same cached instance:
+    calendar = get_payroll_calendar(2024, payroll_day=4)
+    period = calendar.get_period(Date(2024, 6, 5))  # PayPeriod(index=22, start_date=2024-06-01, pay_date=2024-06-07)
+    q2_start, q2_end = calendar.get_quarter_date_range(2)"""
+
+__author__ = 'Sean Kraft'
+
+from dataclasses import dataclass
+from datetime import date as Date
+from datetime import timedelta
+import functools
+
+DAYS_PER_PERIOD = 7
+QUARTERS = (1, 2, 3, 4)
+
+
+def get_pay_date(date: Date, payroll_day_of_week: int = 4) -> Date:
+    """Returns the pay date (the next payroll day of week, or the date itself) of the pay period the date is in."""
+    return date + timedelta(days=(payroll_day_of_week - Date.weekday(date)) % DAYS_PER_PERIOD)
+
+
+def get_quarter(date: Date) -> int:
+    """Returns the quarter of year (1-4) that the provided date falls in."""
+    return (date.month - 1) // 3 + 1
+
+
+@dataclass(frozen=True)
+class PayPeriod:
+    index: int  # position of the pay period in its year (0 based)
+    start_date: Date
+    pay_date: Date  # the last day of the pay period
+
+    @property
+    def year(self) -> int:
+        return self.pay_date.year
+
+    @property
+    def quarter(self) -> int:
+        return get_quarter(self.pay_date)
+
+    def __contains__(self, date: Date) -> bool:
+        return self.start_date <= date <= self.pay_date
+
+
+class PayrollCalendar:
+    def __init__(self, year: int, payroll_day: int = 4):
+        self.year = year
+        self.payroll_day = payroll_day
+
+        self.periods: list[PayPeriod] = []
+        pay_date = get_pay_date(Date(year, 1, 1), payroll_day)
+        while pay_date.year == year:
+            self.periods.append(PayPeriod(len(self.periods), pay_date - timedelta(days=DAYS_PER_PERIOD - 1), pay_date))
+            pay_date += timedelta(days=DAYS_PER_PERIOD)
+
+        self.start_date = self.periods[0].start_date  # may be in the year before
+        self.end_date = self.periods[-1].pay_date
+        self._start_ordinal = self.start_date.toordinal()
+
+        # quarter -> (index of its first pay period, index of its last pay period)
+        self._quarters = {}
+        for period in self.periods:
+            first, _ = self._quarters.get(period.quarter, (period.index, None))
+            self._quarters[period.quarter] = (first, period.index)
+
+    def __repr__(self):
+        return f"PayrollCalendar(year={self.year}, payroll_day={self.payroll_day}, periods={len(self.periods)})"
+
+    def __len__(self):
+        return len(self.periods)
+
+    def __iter__(self):
+        return iter(self.periods)
+
+    def __contains__(self, date: Date) -> bool:
+        return self.start_date <= date <= self.end_date
+
+    @property
+    def pay_dates(self) -> list[Date]:
+        return [period.pay_date for period in self.periods]
+
+    def get_period_index(self, date: Date) -> int or None:
+        """Returns the index of the pay period the date is in, or None if the date is paid in a different year."""
+        offset = date.toordinal() - self._start_ordinal
+        if offset < 0 or offset // DAYS_PER_PERIOD >= len(self.periods):
+            return None
+        return offset // DAYS_PER_PERIOD
+
+    def get_period(self, date: Date) -> PayPeriod or None:
+        """Returns the pay period the date is in, or None if the date is paid in a different year."""
+        index = self.get_period_index(date)
+        return None if index is None else self.periods[index]
+
+    def get_quarter_periods(self, quarter: int) -> list[PayPeriod]:
+        """Returns the pay periods paid in the provided quarter of year."""
+        if quarter not in QUARTERS:
+            raise IOError(f"Provided 'quarter' value of '{quarter}' is invalid. Valid inputs: 1, 2, 3, or 4.")
+        first, last = self._quarters[quarter]
+        return self.periods[first:last + 1]
+
+    def get_quarter_date_range(self, quarter: int) -> tuple[Date, Date]:
+        """Returns the first and last dates worked in the pay periods paid in the provided quarter of year."""
+        periods = self.get_quarter_periods(quarter)
+        return periods[0].start_date, periods[-1].pay_date
+
+
+@functools.lru_cache(maxsize=None)
+def get_payroll_calendar(year: int, payroll_day: int = 4) -> PayrollCalendar:
+    """Returns the shared calendar for the year and payroll day of week."""
+    return PayrollCalendar(year, payroll_day)
+
+
+def get_pay_period(date: Date, payroll_day: int = 4) -> PayPeriod:
+    """Returns the pay period the date is in (from the calendar of the year it is paid in)."""
+    return get_payroll_calendar(get_pay_date(date, payroll_day).year, payroll_day).get_period(date)
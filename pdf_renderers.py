@@ -0,0 +1,414 @@
+"""Pluggable pdf rendering backends for pay stubs (Timesheet.to_pdf).
+
+The stub layout is described once by build_timesheet_rows() as rows of StubCells (the same 7 column table the stub
+has always used) and each backend draws those rows:
+    'borb': lays the table out with borb (the original renderer).
+    'native': draws the table directly with pdf_writer, which is much faster for large batches."""
+
+__author__ = 'Sean Kraft'
+
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+
+import config
+import money
+import pdf_writer
+from data_provider import Employee
+from data_provider import Employer
+
+from borb.pdf import Document
+from borb.pdf import Page
+from borb.pdf.page.page_size import PageSize
+from borb.pdf.canvas.layout.layout_element import Alignment
+from borb.pdf import SingleColumnLayout
+from borb.pdf import FlexibleColumnWidthTable
+from borb.pdf import Paragraph
+from borb.pdf import TableCell
+from borb.pdf import HexColor
+from borb.pdf import PDF
+from borb.pdf.canvas.font.simple_font.font_type_1 import StandardType1Font
+
+COLOR_BORDER = "6AA84F"
+COLOR_RED = "ED1C24"
+COLOR_LIGHT_GREEN = "D9EAD3"
+
+FONT_SIZE = 8
+FONT_SIZE_LARGE = 10
+FONT_SIZE_BLANK = 12  # empty cells use the borb default font size, which sets the height of most rows
+FONT_SIZE_HEADING = 16
+
+
+@dataclass
+class StubCell:
+    text: str = ""
+    bold: bool = False
+    right: bool = False  # right aligned
+    large: bool = False
+    title: bool = False  # section title: bold, large, and underlined
+    col_span: int = 1
+    padding_top: int = 0
+    padding_bottom: int = 0
+    preferred_width: int or None = None
+    color: str or None = None  # hex font color
+    background: str or None = None  # hex background color
+    static: bool = True  # static cells are the same on every stub for an employer/employee
+
+
+def _label(text: str, **kwargs) -> StubCell:
+    return StubCell(text, **kwargs)
+
+
+def _value(text: str, right: bool = True, **kwargs) -> StubCell:
+    return StubCell(text, right=right, static=False, **kwargs)
+
+
+def _blank(**kwargs) -> StubCell:
+    return StubCell("", **kwargs)
+
+
+def _title(text: str, col_span: int) -> StubCell:
+    return StubCell(text, bold=True, large=True, title=True, col_span=col_span)
+
+
+def build_timesheet_heading(timesheet: 'Timesheet') -> str:
+    return f"Earnings Statement : {timesheet.end_date.strftime('%b %d, %Y')}"
+
+
+def build_timesheet_rows(timesheet: 'Timesheet') -> list[list[StubCell]]:
+    """Describes the pay stub table for the timesheet as 28 rows of 7 columns."""
+    current = timesheet.timesheet
+    ytd = timesheet.timesheet_ytd
+    employee = timesheet.employee
+    employer = timesheet.employer
+    start_date = timesheet.start_date.strftime("%b %d, %Y")
+    end_date = timesheet.end_date.strftime("%b %d, %Y")
+
+    rows = [
+        # row 1: Address Titles
+        [_title("Employee", 3), _blank(), _title("Employer", 3)],
+        # row 2: Name + Address
+        [_label(f"{employee.name}\n{employee.address_multiline}", col_span=3, padding_top=3, padding_bottom=3),
+         _blank(padding_top=3, padding_bottom=3),
+         _label(f"{employer.name}\n{employer.address_multiline}", col_span=3, padding_top=3, padding_bottom=3)],
+        # row 3: BLANK
+        [_blank(col_span=7)],
+        # row 4: Earnings Title
+        [_title("Employee Earnings", 7)],
+        # row 5: Earnings: Headers
+        [_label("Pay Period", bold=True, preferred_width=120, padding_top=3, padding_bottom=3),
+         _label("Rate", bold=True, right=True, preferred_width=100, padding_top=3),
+         _label("Hours", bold=True, right=True, preferred_width=100, padding_top=3),
+         _blank(preferred_width=30),
+         _label("Current Pay Period", bold=True, right=True, preferred_width=100, padding_top=3),
+         _label("Year To Date", bold=True, right=True, preferred_width=100, padding_top=3),
+         _blank(preferred_width=100, padding_top=3)],
+        # row 6: Earnings: Gross Earnings
+        [_value(f"{start_date} - {end_date}", right=False),
+         _value(f"${employee.pay_rate:.2f}"),
+         _value(str(current.hours)),
+         _blank(),
+         _value(money.format_dollars(current.gross_pay)),
+         _value(money.format_dollars(ytd.gross_pay)),
+         _blank()],
+        # row 7: BLANK
+        [_blank(col_span=7)],
+        # row 8: Tax: Titles
+        [_title("Employee Taxes Withheld", 3), _blank(), _title("Employer Taxes", 3)],
+        # row 9: Tax: Headers
+        [_label("Employee Tax", bold=True, padding_top=3, padding_bottom=3),
+         _label("Current Pay Period", bold=True, right=True, padding_top=3),
+         _label("Year To Date", bold=True, right=True, padding_top=3),
+         _blank(padding_top=3),
+         _label("Household Employer Tax", bold=True, padding_top=3),
+         _label("Current Pay Period", bold=True, right=True, padding_top=3),
+         _label("Year To Date", bold=True, right=True, padding_top=3)],
+    ]
+
+    # rows 10 - 14: Tax: employee taxes on the left and employer taxes on the right
+    tax_rows = [("Medicare", "medicare_employee", "Medicare", "medicare_company"),
+                ("Social Security", "ss_employee", "Social Security", "ss_company"),
+                ("WA Family Medical Leave", "wa_paid_fml_employee", "WA Family Medical Leave", "wa_paid_fml_company"),
+                ("WA Cares", "wa_cares", "Federal Unemployment", "federal_unemployment"),
+                ("Federal Withholding", "federal_withholding", "WA State Unemployment", "state_unemployment")]
+    for employee_label, employee_tax, employer_label, employer_tax in tax_rows:
+        rows.append([_label(employee_label),
+                     _value(money.format_dollars(getattr(current, employee_tax))),
+                     _value(money.format_dollars(getattr(ytd, employee_tax))),
+                     _blank(),
+                     _label(employer_label),
+                     _value(money.format_dollars(getattr(current, employer_tax))),
+                     _value(money.format_dollars(getattr(ytd, employer_tax)))])
+
+    rows += [
+        # row 15: BLANK
+        [_blank(col_span=7)],
+        # row 16: Time Off Benefits: Title
+        [_title("Time Off Benefits", 7)],
+        # row 17: Time Off Benefits: Headers
+        [_label("Description", bold=True, padding_top=3, padding_bottom=3),
+         _blank(),
+         _label("Used Current Pay Period", bold=True, right=True, padding_top=3),
+         _blank(),
+         _label("Used Year To Date", bold=True, right=True, padding_top=3),
+         _blank(),
+         _label("Available", bold=True, right=True, padding_top=3)],
+    ]
+
+    # rows 18 - 20: Time Off Benefits: Paid Time Off, Sick Time and Paid Holidays
+    time_off_rows = [("Paid Time Off (Hours)", "paid_time_off_hours"),
+                     ("Paid Sick Time (Hours)", "paid_sick_hours"),
+                     ("Paid Holidays (Hours)", "paid_holiday_hours")]
+    for time_off_label, hours_name in time_off_rows:
+        rows.append([_label(time_off_label),
+                     _blank(),
+                     _value(f"{getattr(current, hours_name)}"),
+                     _blank(),
+                     _value(f"{getattr(ytd, hours_name)}"),
+                     _blank(),
+                     _value(f"{timesheet.leave_balances[hours_name]}")])
+
+    rows += [
+        # row 21: BLANK
+        [_blank(col_span=7)],
+        # row 22: Summary: Title
+        [_blank(col_span=4), _title("Summary", 3)],
+        # row 23: Summary: Headers
+        [_blank(col_span=4),
+         _label("Description", bold=True, padding_top=3, padding_bottom=3),
+         _label("Current Pay Period", bold=True, right=True, padding_top=3),
+         _label("Year To Date", bold=True, right=True, padding_top=3)],
+    ]
+
+    # rows 24 - 27: Summary: Gross Earnings, Employee Taxes Withheld, Net Pay and Reimbursements
+    summary_rows = [("Gross Pay", "gross_pay", None),
+                    ("Employee Taxes Withheld", "employee_taxes_withheld", COLOR_RED),
+                    ("Net Pay", "net_pay", None),
+                    ("Reimbursements", "reimbursements", None)]
+    for summary_label, value_name, color in summary_rows:
+        rows.append([_blank(col_span=4),
+                     _label(summary_label),
+                     _value(money.format_dollars(getattr(current, value_name)), color=color),
+                     _value(money.format_dollars(getattr(ytd, value_name)), color=color)])
+
+    # row 28: Summary: Check Amount
+    rows.append([_blank(col_span=4),
+                 _label("Check Amount"),
+                 _value(money.format_dollars(current.check_amount), bold=True, background=COLOR_LIGHT_GREEN),
+                 _value(money.format_dollars(ytd.check_amount))])
+
+    return rows
+
+
+class TimesheetRenderer:
+    """Base class for pay stub pdf backends."""
+    name = None
+    version = 1  # bump whenever the rendered output changes
+
+    def render(self, timesheet: 'Timesheet', file_path: Path):
+        raise NotImplementedError
+
+
+class TimesheetPdfTemplate:
+    """The static parts of a borb Timesheet pdf: fonts, colors, the employer/employee address blocks and every label.
+    A template is built for each pdf. Building borb fonts is the most expensive part of a stub, so the fonts are
+    built once and shared by every template."""
+    _fonts = None
+
+    f_size = Decimal(FONT_SIZE)
+    f_size_l = Decimal(FONT_SIZE_LARGE)
+
+    def __init__(self, employer: Employer, employee: Employee):
+        self.font, self.font_bold = self.get_fonts()
+        self.color_bdr = HexColor(COLOR_BORDER)
+        self.color_red = HexColor(COLOR_RED)
+        self.color_lt_green = HexColor(COLOR_LIGHT_GREEN)
+        self.colors = {COLOR_BORDER: self.color_bdr, COLOR_RED: self.color_red, COLOR_LIGHT_GREEN: self.color_lt_green}
+
+        self.blank = Paragraph("", font=self.font)
+        self.employee_address = Paragraph(f"{employee.name}\n{employee.address_multiline}", font=self.font,
+                                          font_size=self.f_size, respect_newlines_in_text=True)
+        self.employer_address = Paragraph(f"{employer.name}\n{employer.address_multiline}", font=self.font,
+                                          font_size=self.f_size, respect_newlines_in_text=True)
+        self._addresses = {f"{employee.name}\n{employee.address_multiline}": self.employee_address,
+                           f"{employer.name}\n{employer.address_multiline}": self.employer_address}
+
+        self._labels = {}
+
+    @classmethod
+    def get_fonts(cls) -> tuple:
+        """Returns the shared regular and bold fonts (building them on first use)."""
+        if cls._fonts is None:
+            cls._fonts = (StandardType1Font("Helvetica"), StandardType1Font("Helvetica-Bold"))
+        return cls._fonts
+
+    @classmethod
+    def clear_fonts(cls):
+        cls._fonts = None
+
+    def label(self, text: str, bold: bool = False, right: bool = False, large: bool = False) -> Paragraph:
+        """Returns the paragraph for a static label, shared by every cell of this pdf."""
+        key = (text, bold, right, large)
+        paragraph = self._labels.get(key)
+        if paragraph is None:
+            paragraph = Paragraph(text,
+                                  font=self.font_bold if bold else self.font,
+                                  font_size=self.f_size_l if large else self.f_size,
+                                  horizontal_alignment=Alignment.RIGHT if right else Alignment.LEFT)
+            self._labels[key] = paragraph
+        return paragraph
+
+    def title_cell(self, text: str, col_span: int) -> TableCell:
+        """Returns a new cell for a section title (bold, large and underlined)."""
+        return TableCell(self.label(text, bold=True, large=True), border_top=False, border_right=False,
+                         border_left=False, border_bottom=True, border_color=self.color_bdr, col_span=col_span)
+
+    def value(self, text: str, bold: bool = False, right: bool = True, color: HexColor = None) -> Paragraph:
+        """Returns a new paragraph for a value that changes from stub to stub."""
+        kwargs = {"font_color": color} if color else {}
+        return Paragraph(text,
+                         font=self.font_bold if bold else self.font,
+                         font_size=self.f_size,
+                         horizontal_alignment=Alignment.RIGHT if right else Alignment.LEFT,
+                         **kwargs)
+
+    def paragraph(self, cell: StubCell) -> Paragraph:
+        """Returns the paragraph for a stub cell, shared within this pdf unless the cell is a value."""
+        if not cell.text:
+            return self.blank
+        if cell.text in self._addresses:
+            return self._addresses[cell.text]
+        if not cell.static:
+            return self.value(cell.text, cell.bold, cell.right, self.colors.get(cell.color))
+        return self.label(cell.text, cell.bold, cell.right, cell.large)
+
+
+class BorbTimesheetRenderer(TimesheetRenderer):
+    """Lays the stub out as a borb FlexibleColumnWidthTable."""
+    name = "borb"
+
+    def render(self, timesheet: 'Timesheet', file_path: Path):
+        template = TimesheetPdfTemplate(timesheet.employer, timesheet.employee)
+
+        # build doc and layout
+        doc = Document()
+        page = Page(width=PageSize.A4_LANDSCAPE.value[0], height=PageSize.A4_LANDSCAPE.value[1])
+        doc.add_page(page)
+        layout = SingleColumnLayout(page)
+        layout._vertical_margin_top = 50
+        layout._vertical_margin_bottom = 10
+
+        layout.add(Paragraph(build_timesheet_heading(timesheet), font=template.font_bold,
+                             font_size=Decimal(FONT_SIZE_HEADING)))
+
+        rows = build_timesheet_rows(timesheet)
+        ts_table = FlexibleColumnWidthTable(number_of_rows=len(rows), number_of_columns=7)
+        for row in rows:
+            for cell in row:
+                ts_table.add(self.build_cell(template, cell))
+        layout.add(ts_table)
+
+        with open(file_path, "wb") as pdf_file:
+            PDF.dumps(pdf_file, doc)
+
+    @staticmethod
+    def build_cell(template: TimesheetPdfTemplate, cell: StubCell) -> TableCell:
+        if cell.title:
+            return template.title_cell(cell.text, cell.col_span)
+
+        kwargs = {}
+        if cell.col_span > 1:
+            kwargs["col_span"] = cell.col_span
+        if cell.preferred_width:
+            kwargs["preferred_width"] = Decimal(cell.preferred_width)
+        if cell.padding_top:
+            kwargs["padding_top"] = Decimal(cell.padding_top)
+        if cell.padding_bottom:
+            kwargs["padding_bottom"] = Decimal(cell.padding_bottom)
+        if cell.background:
+            kwargs["background_color"] = template.colors[cell.background]
+        return TableCell(template.paragraph(cell), border_width=Decimal(0), **kwargs)
+
+
+class NativeTimesheetRenderer(TimesheetRenderer):
+    """Draws the stub table directly with pdf_writer using the same geometry borb produces for the stub:
+    fixed column widths, rows as tall as their tallest cell, and 1.2 line spacing."""
+    name = "native"
+
+    page_size = pdf_writer.A4_LANDSCAPE
+    margin_top = 50
+    margin_left = pdf_writer.A4_LANDSCAPE[0] * 0.1  # borb's default horizontal page margin
+    column_widths = [120, 100, 100, 30, 100, 100, 100]
+    leading = 1.2  # line height as a multiple of the font size
+    ascent = 0.793  # distance from the top of a line to its baseline as a multiple of the font size
+    border_width = 1
+
+    def render(self, timesheet: 'Timesheet', file_path: Path):
+        doc = pdf_writer.PdfDocument()
+        page = doc.add_page(pdf_writer.PdfPage(*self.page_size))
+
+        # heading paragraph, followed by a blank line
+        top = self.page_size[1] - self.margin_top
+        page.text(self.margin_left, top - self.ascent * FONT_SIZE_HEADING, build_timesheet_heading(timesheet),
+                  pdf_writer.FONT_BOLD, FONT_SIZE_HEADING)
+        top -= 2 * self.leading * FONT_SIZE_HEADING
+
+        column_starts = [self.margin_left]
+        for width in self.column_widths:
+            column_starts.append(column_starts[-1] + width)
+
+        for row in build_timesheet_rows(timesheet):
+            row_height = max(self.cell_height(cell) for cell in row)
+            column = 0
+            for cell in row:
+                x = column_starts[column]
+                width = column_starts[column + cell.col_span] - x
+                self.draw_cell(page, cell, x, top, width, row_height)
+                column += cell.col_span
+            top -= row_height
+
+        doc.save(file_path)
+
+    def cell_height(self, cell: StubCell) -> float:
+        size = self.font_size(cell)
+        line_count = cell.text.count("\n") + 1
+        height = cell.padding_top + line_count * self.leading * size + cell.padding_bottom
+        if cell.title:
+            height += self.border_width
+        return height
+
+    @staticmethod
+    def font_size(cell: StubCell) -> int:
+        if not cell.text:
+            return FONT_SIZE_BLANK
+        return FONT_SIZE_LARGE if cell.large else FONT_SIZE
+
+    def draw_cell(self, page: pdf_writer.PdfPage, cell: StubCell, x: float, top: float, width: float,
+                  height: float):
+        if cell.background:
+            page.fill_rect(x, top - height, width, height, pdf_writer.hex_to_rgb(cell.background))
+        if cell.title:
+            page.line(x, top - height, x + width, top - height, pdf_writer.hex_to_rgb(COLOR_BORDER),
+                      self.border_width)
+
+        size = self.font_size(cell)
+        font = pdf_writer.FONT_BOLD if cell.bold else pdf_writer.FONT_REGULAR
+        color = pdf_writer.hex_to_rgb(cell.color) if cell.color else (0, 0, 0)
+        baseline = top - cell.padding_top - self.ascent * size
+        for line in cell.text.split("\n"):
+            line_x = x + width - pdf_writer.string_width(line, font, size) if cell.right else x
+            page.text(line_x, baseline, line, font, size, color)
+            baseline -= self.leading * size
+
+
+TIMESHEET_RENDERERS = {renderer.name: renderer for renderer in (BorbTimesheetRenderer(), NativeTimesheetRenderer())}
+
+
+def get_timesheet_renderer(renderer: str or TimesheetRenderer = None) -> TimesheetRenderer:
+    """Returns the renderer instance for a renderer name (config.TIMESHEET_RENDERER by default)."""
+    if isinstance(renderer, TimesheetRenderer):
+        return renderer
+    name = renderer or config.TIMESHEET_RENDERER
+    if name not in TIMESHEET_RENDERERS:
+        raise ValueError(f"Unknown timesheet renderer '{name}'. Valid renderers: {', '.join(TIMESHEET_RENDERERS)}")
+    return TIMESHEET_RENDERERS[name]
@@ -0,0 +1,139 @@
+"""A minimal pdf writer for simple text documents like pay stubs.
+
+Only what a pay stub needs is supported: the standard Helvetica and Helvetica-Bold Type1 fonts (which every pdf
+reader provides, so nothing is embedded), text, lines and filled rectangles. Coordinates are pdf points with the
+origin at the bottom left of the page."""
+
+__author__ = 'Sean Kraft'
+
+from pathlib import Path
+
+A4_LANDSCAPE = (842, 595)
+
+FONT_REGULAR = "Helvetica"
+FONT_BOLD = "Helvetica-Bold"
+FONTS = [FONT_REGULAR, FONT_BOLD]
+
+# glyph widths (1/1000 em) for the printable ascii characters 32-126, from the Adobe core font AFM files
+_HELVETICA_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,  # space - /
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,  # 0 - ?
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,  # @ - O
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,  # P - _
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,  # ` - o
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584]  # p - ~
+_HELVETICA_BOLD_WIDTHS = [
+    278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,  # space - /
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,  # 0 - ?
+    975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,  # @ - O
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,  # P - _
+    333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,  # ` - o
+    611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584]  # p - ~
+_WIDTHS = {FONT_REGULAR: _HELVETICA_WIDTHS, FONT_BOLD: _HELVETICA_BOLD_WIDTHS}
+_DEFAULT_WIDTH = 556  # used for characters outside of printable ascii
+
+
+def string_width(text: str, font: str, size: float) -> float:
+    """Returns the width of the text in points."""
+    widths = _WIDTHS[font]
+    total = 0
+    for char in text:
+        code = ord(char) - 32
+        total += widths[code] if 0 <= code < len(widths) else _DEFAULT_WIDTH
+    return total * size / 1000
+
+
+def hex_to_rgb(hex_color: str) -> tuple[float, float, float]:
+    """Converts a hex color string like '6AA84F' to pdf rgb values (0 - 1)."""
+    hex_color = hex_color.lstrip("#")
+    return tuple(int(hex_color[i:i + 2], 16) / 255 for i in (0, 2, 4))
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _number(value: float) -> str:
+    return f"{value:.3f}".rstrip("0").rstrip(".")
+
+
+def _color(rgb: tuple[float, float, float]) -> str:
+    return " ".join(_number(channel) for channel in rgb)
+
+
+class PdfPage:
+    def __init__(self, width: float = A4_LANDSCAPE[0], height: float = A4_LANDSCAPE[1]):
+        self.width = width
+        self.height = height
+        self._operations = []
+
+    def text(self, x: float, y: float, text: str, font: str = FONT_REGULAR, size: float = 8,
+             color: tuple[float, float, float] = (0, 0, 0)):
+        """Draws a single line of text with its baseline starting at x, y."""
+        if not text:
+            return
+        font_name = f"F{FONTS.index(font) + 1}"
+        self._operations.append(f"BT {_color(color)} rg /{font_name} {_number(size)} Tf "
+                                f"{_number(x)} {_number(y)} Td ({_escape(text)}) Tj ET")
+
+    def line(self, x1: float, y1: float, x2: float, y2: float, color: tuple[float, float, float] = (0, 0, 0),
+             width: float = 1):
+        self._operations.append(f"q {_color(color)} RG {_number(width)} w {_number(x1)} {_number(y1)} m "
+                                f"{_number(x2)} {_number(y2)} l S Q")
+
+    def fill_rect(self, x: float, y: float, width: float, height: float, color: tuple[float, float, float]):
+        """Fills a rectangle whose bottom left corner is x, y."""
+        self._operations.append(f"q {_color(color)} rg {_number(x)} {_number(y)} {_number(width)} "
+                                f"{_number(height)} re f Q")
+
+    def content_stream(self) -> bytes:
+        return "\n".join(self._operations).encode("cp1252", errors="replace")
+
+
+class PdfDocument:
+    def __init__(self):
+        self.pages: list[PdfPage] = []
+
+    def add_page(self, page: PdfPage = None) -> PdfPage:
+        page = page or PdfPage()
+        self.pages.append(page)
+        return page
+
+    def to_bytes(self) -> bytes:
+        """Serializes the document. Object layout: 1 catalog, 2 page tree, one object per font, then a page
+        object and a content stream object for each page."""
+        font_ids = list(range(3, 3 + len(FONTS)))
+        first_page_id = 3 + len(FONTS)
+        page_ids = [first_page_id + i * 2 for i in range(len(self.pages))]
+
+        objects = [b"<< /Type /Catalog /Pages 2 0 R >>",
+                   f"<< /Type /Pages /Kids [{' '.join(f'{i} 0 R' for i in page_ids)}] "
+                   f"/Count {len(self.pages)} >>".encode()]
+        for font in FONTS:
+            objects.append(f"<< /Type /Font /Subtype /Type1 /BaseFont /{font} "
+                           f"/Encoding /WinAnsiEncoding >>".encode())
+        font_resources = " ".join(f"/F{i + 1} {font_id} 0 R" for i, font_id in enumerate(font_ids))
+        for page, page_id in zip(self.pages, page_ids):
+            objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 {_number(page.width)} "
+                           f"{_number(page.height)}] /Resources << /Font << {font_resources} >> >> "
+                           f"/Contents {page_id + 1} 0 R >>".encode())
+            stream = page.content_stream()
+            objects.append(f"<< /Length {len(stream)} >>\nstream\n".encode() + stream + b"\nendstream")
+
+        output = bytearray(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        offsets = []
+        for object_id, body in enumerate(objects, start=1):
+            offsets.append(len(output))
+            output += f"{object_id} 0 obj\n".encode() + body + b"\nendobj\n"
+
+        xref_offset = len(output)
+        output += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+        for offset in offsets:
+            output += f"{offset:010d} 00000 n \n".encode()
+        output += (f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+                   f"startxref\n{xref_offset}\n%%EOF\n").encode()
+        return bytes(output)
+
+    def save(self, file_path: Path):
+        with open(file_path, "wb") as pdf_file:
+            pdf_file.write(self.to_bytes())
@@ -0,0 +1,148 @@
+"""Content addressed cache of generated report files (pay stub pdfs and EFW2 files).
+
+A report's key is the sha256 of everything the report is generated from (see hash_inputs()): the time entries in its
+date range, the tax rates of their tax years, the employee, W-4 and employer values it prints, the version of the
+renderer or file format and the version of the pay period calculation (data_provider.PERIOD_TOTALS_VERSION).
+Regenerating a report whose inputs didn't change copies the cached bytes instead of calculating and rendering it
+again, and changing any input changes the key, so only the reports that used that input miss. Nothing ever has to be
+invalidated: stale entries simply stop being asked for and get evicted.
+
+Entries are files named by their key in the cache directory. The cache is bounded to max_bytes and evicts the least
+recently used entries first. Recency is the file modification time (a hit touches the file), so it carries over
+between runs and processes."""
+
+__author__ = 'Sean Kraft'
+
+from collections import OrderedDict
+from datetime import date as Date
+from enum import Enum
+from pathlib import Path
+import hashlib
+import json
+import os
+import threading
+
+import config
+
+
+def _json_default(value):
+    if isinstance(value, Date):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.name
+    if isinstance(value, Path):
+        return str(value)
+    raise TypeError(f"Unable to hash report input of type {type(value).__name__}.")
+
+
+def hash_inputs(*inputs) -> str:
+    """Returns the hex sha256 of the inputs (json serializable values, dates and enums)."""
+    payload = json.dumps(inputs, sort_keys=True, separators=(",", ":"), default=_json_default)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ReportCache:
+    def __init__(self, directory: Path, max_bytes: int = None):
+        self.directory = Path(directory)
+        self.max_bytes = config.REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, int] or None = None  # key -> size, least recently used first
+        self._size = 0
+        self._lock = threading.Lock()  # reports are rendered on worker threads (see api_server.py)
+
+    def __repr__(self):
+        return f"ReportCache(directory={self.directory}, max_bytes={self.max_bytes}, hits={self.hits}, " \
+               f"misses={self.misses})"
+
+    def __len__(self):
+        with self._lock:
+            return len(self._get_entries())
+
+    @property
+    def size(self) -> int:
+        """Total bytes of the cached reports."""
+        with self._lock:
+            self._get_entries()
+            return self._size
+
+    def _get_entries(self) -> OrderedDict[str, int]:
+        """Scans the cache directory the first time it's needed."""
+        if self._entries is None:
+            files = []
+            if self.directory.is_dir():
+                for entry in os.scandir(self.directory):
+                    if entry.is_file() and not entry.name.endswith(".tmp"):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime_ns, entry.name, stat.st_size))
+            self._entries = OrderedDict((name, size) for _, name, size in sorted(files))
+            self._size = sum(self._entries.values())
+        return self._entries
+
+    def get(self, key: str) -> bytes or None:
+        """Returns the cached bytes of the key (None on a miss) and marks them as recently used."""
+        with self._lock:
+            entries = self._get_entries()
+            path = self.directory / key
+            if key in entries:
+                try:
+                    data = path.read_bytes()
+                    os.utime(path)
+                except OSError:
+                    # removed by another process
+                    self._size -= entries.pop(key)
+                    data = None
+                if data is not None:
+                    entries.move_to_end(key)
+                    self.hits += 1
+                    return data
+            self.misses += 1
+            return None
+
+    def put(self, key: str, data: bytes):
+        """Caches the bytes of the key, evicting the least recently used reports to stay within max_bytes."""
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            entries = self._get_entries()
+            self.directory.mkdir(parents=True, exist_ok=True)
+            path = self.directory / key
+            temp_path = path.with_name(f"{key}.tmp")
+            try:
+                temp_path.write_bytes(data)
+                os.replace(temp_path, path)
+            except OSError as error:
+                print(f"WARNING: Unable to cache report '{path}': {error}")
+                return
+            self._size += len(data) - entries.pop(key, 0)
+            entries[key] = len(data)
+            self._evict()
+
+    def _evict(self):
+        while self._size > self.max_bytes and self._entries:
+            key, size = self._entries.popitem(last=False)
+            self._size -= size
+            try:
+                os.remove(self.directory / key)
+            except OSError:
+                pass
+
+    def restore(self, key: str, file_path: Path) -> bool:
+        """Writes the cached report of the key to the file path. Returns False (and writes nothing) on a miss."""
+        data = self.get(key)
+        if data is None:
+            return False
+        Path(file_path).write_bytes(data)
+        return True
+
+    def save(self, key: str, file_path: Path):
+        """Caches the report just written to the file path."""
+        self.put(key, Path(file_path).read_bytes())
+
+    def clear(self):
+        """Removes every cached report."""
+        with self._lock:
+            self._get_entries()
+            self.max_bytes, max_bytes = 0, self.max_bytes
+            self._evict()
+            self.max_bytes = max_bytes
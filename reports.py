@@ -6,163 +6,159 @@ from datetime import timedelta
 from dataclasses import dataclass
 import csv
 import math
+import tempfile
 
 import config
-from data_provider import TimeEntry
+import efw2
+import money
+import pdf_renderers
+import report_cache
+import withholding_tables
+from data_provider import TimesheetValues
 from data_provider import Employee
 from data_provider import DataProvider
+from data_provider import PERIOD_TOTALS_VERSION
 from data_provider import PayType
 from data_provider import TaxRates
 from data_provider import W4FilingStatus
-from decimal import Decimal
+from payroll_calendar import get_quarter
 
-from borb.pdf import Document
-from borb.pdf import Page
-from borb.pdf.page.page_size import PageSize
-from borb.pdf.canvas.layout.layout_element import Alignment
-from borb.pdf import SingleColumnLayout
-from borb.pdf import FlexibleColumnWidthTable
-from borb.pdf import Paragraph
-from borb.pdf import TableCell
-from borb.pdf import HexColor
-from borb.pdf import PDF
-
-
-class TimesheetValues:
-    def __init__(self):
-        self.hours: int = 0
-        self.reimbursements: float or int = 0
-        self.gross_pay: float or int = 0
-        self.medicare_employee: float or int = 0
-        self.ss_employee: float or int = 0
-        self.wa_paid_fml_employee: float or int = 0
-        self.wa_cares: float or int = 0
-        self.employee_taxes_withheld: float or int = 0
-        self.net_pay: float or int = 0
-        self.check_amount: float or int = 0
-        self.medicare_company: float or int = 0
-        self.ss_company: float or int = 0
-        self.wa_paid_fml_company: float or int = 0
-        self.federal_unemployment: float or int = 0
-        self.state_unemployment: float or int = 0
-        self.company_tax_contributions: float or int = 0
-        self.company_total_costs: float or int = 0
-
-        self.federal_withholding: float or int = 0
-
-        self.paid_time_off_hours: float or int = 0
-        self.paid_holiday_hours: float or int = 0
-        self.paid_sick_hours: float or int = 0
-
-    def add_time_entry(self, time_entry: TimeEntry):
-        self.hours += time_entry.hours
-        self.reimbursements += time_entry.reimbursement
-        self.gross_pay += time_entry.gross_pay
-        self.medicare_employee += time_entry.medicare_employee
-        self.ss_employee += time_entry.ss_employee
-        self.wa_paid_fml_employee += time_entry.wa_paid_fml_employee
-        self.wa_cares += time_entry.wa_cares
-        self.employee_taxes_withheld += time_entry.employee_taxes_withheld
-        self.net_pay += time_entry.net_pay
-        self.check_amount += time_entry.check_amount
-        self.medicare_company += time_entry.medicare_company
-        self.ss_company += time_entry.ss_company
-        self.wa_paid_fml_company += time_entry.wa_paid_fml_company
-        self.federal_unemployment += time_entry.federal_unemployment
-        self.state_unemployment += time_entry.state_unemployment
-        self.company_tax_contributions += time_entry.company_tax_contributions
-        self.company_total_costs += time_entry.company_total_costs
-
-        if time_entry.federal_withholding:
-            self.federal_withholding += time_entry.federal_withholding
-
-        if time_entry.pay_type is PayType.PAID_TIME_OFF:
-            self.paid_time_off_hours += time_entry.hours
-        if time_entry.pay_type is PayType.PAID_HOLIDAY:
-            self.paid_holiday_hours += time_entry.hours
-        if time_entry.pay_type is PayType.PAID_SICK_TIME:
-            self.paid_sick_hours += time_entry.hours
+# pay period values (see DataProvider.aggregate) the reports total
+EAMS_VALUES = ("hours", "gross_pay")
+W2_VALUES = ("gross_pay", "federal_withholding", "ss_employee", "medicare_employee")
+# leave pay type -> the TimesheetValues field of its hours
+LEAVE_HOURS_FIELDS = {PayType.PAID_TIME_OFF: "paid_time_off_hours",
+                      PayType.PAID_SICK_TIME: "paid_sick_hours",
+                      PayType.PAID_HOLIDAY: "paid_holiday_hours"}
 
 
 class QuarterlyReportValues:
     def __init__(self):
         self.employee: Employee or None = None
         self.hours: float or int = 0
-        self.gross_pay: float or int = 0
+        self.gross_pay: int = 0  # cents
 
     def __repr__(self):
         return f"QuarterlyReportValues(employee={self.employee}, hours={self.hours}, gross_pay={self.gross_pay})"
 
-    def add_time_entry(self, time_entry: TimeEntry):
-        self.hours += time_entry.hours
-        self.gross_pay += time_entry.gross_pay
+    def add_pay_period(self, values: TimesheetValues):
+        self.hours += values.hours
+        self.gross_pay += values.gross_pay
+
+    def add_totals(self, totals: dict):
+        """Adds EAMS_VALUES totals from DataProvider.aggregate()."""
+        self.hours += totals["hours"]
+        self.gross_pay += totals["gross_pay"]
 
 
 @dataclass
 class W2ReportValues:
+    """W-2 box values for an employee. Money values are in whole cents (see money.py)."""
     employee: Employee or None = None
-    wages: float or int = 0
-    federal_withholding: float or int = 0
-    ss_wages: float or int = 0
-    ss_tax_withheld: float or int = 0
-    medicare_wages: float or int = 0
-    medicare_tax_withheld: float or int = 0
-
-    def add_time_entry(self, time_entry: TimeEntry):
-        self.wages += time_entry.gross_pay
-        self.medicare_tax_withheld += time_entry.medicare_employee
-        self.ss_tax_withheld += time_entry.ss_employee
-
-        if time_entry.federal_withholding:
-            self.federal_withholding += time_entry.federal_withholding
-
-
-def get_first_payday_of_year(year: int, payroll_day_of_week: int = 4):
-    """Returns the first payroll date of the provided year."""
-    year_start = Date(year, 1, 1)
-    first_payday = year_start - timedelta(days=(Date.weekday(year_start) - payroll_day_of_week))
-    if first_payday.year < year_start.year:
-        first_payday += timedelta(weeks=1)
-    return first_payday
-
-
-def calculate_federal_withholding(gross_pay: float, employee: Employee, tax_rates: TaxRates) -> float:
-    """Calculates the federal withholding for a SINGLE PAY PERIOD (if the employee provided a W4).
-    this procedure comes from Pub 15-T, Worksheet 1A. This function assumes a 2020 or later W4 form."""
+    wages: int = 0
+    federal_withholding: int = 0
+    ss_wages: int = 0
+    ss_tax_withheld: int = 0
+    medicare_wages: int = 0
+    medicare_tax_withheld: int = 0
+
+    def add_pay_period(self, values: TimesheetValues):
+        self.wages += values.gross_pay
+        self.federal_withholding += values.federal_withholding
+        self.ss_tax_withheld += values.ss_employee
+        self.medicare_tax_withheld += values.medicare_employee
+
+    def add_totals(self, totals: dict):
+        """Adds W2_VALUES totals from DataProvider.aggregate()."""
+        self.wages += totals["gross_pay"]
+        self.federal_withholding += totals["federal_withholding"]
+        self.ss_tax_withheld += totals["ss_employee"]
+        self.medicare_tax_withheld += totals["medicare_employee"]
+
+    def apply_wage_caps(self, tax_rates: TaxRates):
+        """Sets the social security and medicare wages once every pay period has been added. Social security wages
+        are capped (the withholding already stopped at the cap in each pay period)."""
+        self.ss_wages = min(self.wages, tax_rates.ss_taxable_max_cents)
+        self.medicare_wages = self.wages
+
+
+@dataclass
+class ScheduleHValues:
+    """Schedule H (Form 1040) line values. Money values are in whole cents (see money.py)."""
+    line_a: bool = False  # paid any one household employee cash wages of the year's threshold or more
+    line_1: int = 0  # cash wages subject to social security tax
+    line_2: int = 0  # social security tax
+    line_3: int = 0  # cash wages subject to medicare tax
+    line_4: int = 0  # medicare tax
+    line_5: int = 0  # cash wages subject to additional medicare tax withholding
+    line_6: int = 0  # additional medicare tax withholding
+    line_7: int = 0  # federal income tax withheld
+    line_8: int = 0  # total social security, medicare, and federal income taxes
+    line_9: bool = False  # paid cash wages of $1,000 or more in any calendar quarter of the year or the year before
+    line_13: str = ""  # state unemployment contributions were paid to
+    line_14: int = 0  # contributions paid to the state unemployment fund
+    line_15: int = 0  # cash wages subject to FUTA tax
+    line_16: int = 0  # FUTA tax
+    line_25: int = 0  # line 8
+    line_26: int = 0  # total household employment taxes
+
+
+def iter_pay_periods(data: DataProvider, employee: Employee, start_date: Date, end_date: Date):
+    """Yields (pay date, TimesheetValues) for each pay period paid between the provided dates, from the employee's
+    stored pay period totals (see DataProvider.get_period_totals)."""
+    for year in range(start_date.year, end_date.year + 1):
+        for pay_date, values in data.get_period_totals(employee, year):
+            if start_date <= pay_date <= end_date:
+                yield pay_date, values
+
+
+def get_time_entry_inputs(employee: Employee, start_date: Date, end_date: Date) -> list[dict]:
+    """Returns the employee's time entries in the date range as report cache inputs (see report_cache.py)."""
+    return [time_entry.as_dictionary() for time_entry in employee.time_entries
+            if start_date <= time_entry.date <= end_date]
+
+
+def get_tax_rate_inputs(data: DataProvider, time_entries: list[dict], years: list[int] = ()) -> list[dict]:
+    """Returns the tax rates of the years and of the time entry inputs' tax years as report cache inputs."""
+    years = set(years) | {time_entry["TaxYear"] for time_entry in time_entries}
+    tax_rates = [data.get_tax_rates(year=year) for year in sorted(year for year in years if year is not None)]
+    return [rates.as_dictionary() for rates in tax_rates if rates is not None]
+
+
+def calculate_federal_withholding(gross_pay: int, employee: Employee, tax_rates: TaxRates) -> int:
+    """Calculates the federal withholding in cents for a SINGLE PAY PERIOD of gross_pay cents (if the employee
+    provided a W4). this procedure comes from Pub 15-T, Worksheet 1A. This function assumes a 2020 or later W4 form.
+    The worksheet is evaluated exactly and only the final amount is rounded to the cent."""
     if employee.w4 is None:
         return 0
+    pay_periods = employee.w4.pay_periods_per_year
 
     # step 1
-    line_1c = gross_pay * employee.w4.pay_periods_per_year
-    line_1e = line_1c + employee.w4.line_4A
+    line_1c = gross_pay * pay_periods
+    line_1e = line_1c + money.to_cents(employee.w4.line_4A)
     if employee.w4.line_2C:
         line_1g = 0
     else:
         married_rate = tax_rates.federal_withholding["Worksheet1A_1G_Married"]
         not_married_rate = tax_rates.federal_withholding["Worksheet1A_1G_NotMarried"]
-        line_1g = married_rate if employee.w4.line_1C is W4FilingStatus.MARRIED else not_married_rate
-    line_1h = line_1g + employee.w4.line_4B
+        line_1g = money.to_cents(married_rate if employee.w4.line_1C is W4FilingStatus.MARRIED else not_married_rate)
+    line_1h = line_1g + money.to_cents(employee.w4.line_4B)
     adjusted_annual_wage_amount = max(0, (line_1e - line_1h))  # negative values should be 0
 
     # step 2
-    withholding_table = tax_rates.get_federal_withholding_table(employee)
-    withholding_row = None
-    for row in withholding_table:
-        if row["A"] <= adjusted_annual_wage_amount < row["B"]:
-            withholding_row = row
-            break
-    line_2e = adjusted_annual_wage_amount - withholding_row["A"]
-    line_2f = line_2e * (withholding_row["D"] / 100)
-    line_2g = withholding_row["C"] + line_2f
-    tentative_withholding_amount = line_2g / employee.w4.pay_periods_per_year
-
-    # step 3
-    line_3b = employee.w4.line_3 / employee.w4.pay_periods_per_year
-    line_3c = max(0, (tentative_withholding_amount - line_3b))
+    withholding_table = tax_rates.get_compiled_federal_withholding_table(employee)
+    bracket_start, bracket_base, bracket_rate = withholding_tables.lookup(withholding_table,
+                                                                          adjusted_annual_wage_amount)
+    line_2e = adjusted_annual_wage_amount - bracket_start
+    # lines 2f and 2g are kept in cents * money.RATE_SCALE so nothing is rounded before step 4
+    line_2f = line_2e * bracket_rate
+    line_2g = bracket_base * money.RATE_SCALE + line_2f
+
+    # step 3 (dividing by the pay periods is deferred until the final rounding)
+    line_3c = max(0, line_2g - money.to_cents(employee.w4.line_3) * money.RATE_SCALE)
 
     # step 4
-    final_withholding = line_3c + employee.w4.line_4C
-    return round(final_withholding, 2)
+    return money.round_div(line_3c, money.RATE_SCALE * pay_periods) + money.to_cents(employee.w4.line_4C)
 
 
 class Timesheet:
@@ -177,6 +173,7 @@ class Timesheet:
 
         self.timesheet = TimesheetValues()
         self.timesheet_ytd = TimesheetValues()
+        self.leave_balances: dict[str, int or float] = {}  # hours field (ie "paid_sick_hours") -> hours available
 
         self.calculate()
 
@@ -199,381 +196,138 @@ class Timesheet:
             else:
                 last_entry = time_entries[-1]
                 if last_entry.federal_withholding is None:
-                    gross_pay = sum([entry.gross_pay for entry in time_entries])
-                    last_entry.federal_withholding = calculate_federal_withholding(gross_pay, self.employee, tax_rates)
+                    gross_pay = sum([entry.gross_pay_cents for entry in time_entries])
+                    withholding = calculate_federal_withholding(gross_pay, self.employee, tax_rates)
+                    last_entry.federal_withholding = money.to_dollars(withholding)
                     self.employee._time_entries_dirty = True
+                    self.data_provider.invalidate_period_totals(self.employee, last_entry.date)
                     self.data_provider.save()
-                    print(f"Added ${last_entry.federal_withholding:.2f} of Federal Withholding to {last_entry.date}.")
-
-        # tally all year to date time entries
-        year_start = get_first_payday_of_year(self.end_date.year, self.employer.payroll_day) - timedelta(days=6)
-        ytd_time_entries = self.data_provider.get_worked_time_in_range(self.employee, year_start, self.end_date)
-        for entry in ytd_time_entries:
-            entry.tax_rates = self.data_provider.get_tax_rates(year=entry.tax_year)
-            self.timesheet_ytd.add_time_entry(entry)
-
-        # tally all time entries in provided time range
-        for entry in time_entries:
-            entry.tax_rates = self.data_provider.get_tax_rates(year=entry.tax_year)
-            self.timesheet.add_time_entry(entry)
-
-        # apply federal unemployment hour cap
-        if self.timesheet_ytd.gross_pay > tax_rates.federal_unemployment_taxable_max:
-            gross_overage = self.timesheet_ytd.gross_pay - tax_rates.federal_unemployment_taxable_max
-            pay_before_overage = max(0, (self.timesheet.gross_pay - gross_overage))
-            self.timesheet.federal_unemployment = pay_before_overage * tax_rates.federal_unemployment
-            self.timesheet_ytd.federal_unemployment = tax_rates.federal_unemployment_taxable_max * tax_rates.federal_unemployment
-
-        # apply social security taxable wages cap to social security and wa family medical leave withholdings
-        if self.timesheet_ytd.gross_pay > tax_rates.ss_taxable_max:
-            gross_overage = self.timesheet_ytd.gross_pay - tax_rates.ss_taxable_max
-            pay_before_overage = max(0, (self.timesheet.gross_pay - gross_overage))
-            self.timesheet.ss_employee = pay_before_overage * tax_rates.ss_employee
-            self.timesheet.ss_company = pay_before_overage * tax_rates.ss_company
-            self.timesheet_ytd.ss_employee = tax_rates.ss_taxable_max * tax_rates.ss_employee
-            self.timesheet_ytd.ss_company = tax_rates.ss_taxable_max * tax_rates.ss_company
-            self.timesheet.wa_paid_fml_employee = pay_before_overage * tax_rates.wa_paid_fml_employee
-            self.timesheet.wa_paid_fml_company = pay_before_overage * tax_rates.wa_paid_fml_company
-            self.timesheet_ytd.wa_paid_fml_employee = tax_rates.ss_taxable_max * tax_rates.wa_paid_fml_employee
-            self.timesheet_ytd.wa_paid_fml_company = tax_rates.ss_taxable_max * tax_rates.wa_paid_fml_company
-
-        # subtract federal withholding from net pay and check amount
-        self.timesheet.employee_taxes_withheld += self.timesheet.federal_withholding
-        self.timesheet.net_pay -= self.timesheet.federal_withholding
-        self.timesheet.check_amount -= self.timesheet.federal_withholding
-        self.timesheet_ytd.employee_taxes_withheld += self.timesheet_ytd.federal_withholding
-        self.timesheet_ytd.net_pay -= self.timesheet_ytd.federal_withholding
-        self.timesheet_ytd.check_amount -= self.timesheet_ytd.federal_withholding
-
-    def to_pdf(self, file_path: Path):
-        f_size = Decimal(8)
-        f_size_l = Decimal(10)
-        f_bold = "Helvetica-bold"
-        color_bdr = HexColor("6AA84F")
-        color_red = HexColor("ED1C24")
-        color_lt_green = HexColor("D9EAD3")
-
-        start_date = self.start_date.strftime("%b %d, %Y")
-        end_date = self.end_date.strftime("%b %d, %Y")
-
-        # build doc and layout
-        doc = Document()
-        page = Page(width=PageSize.A4_LANDSCAPE.value[0], height=PageSize.A4_LANDSCAPE.value[1])
-        doc.add_page(page)
-        layout = SingleColumnLayout(page)
-        layout._vertical_margin_top = 50
-        layout._vertical_margin_bottom = 10
-
-        layout.add(Paragraph(f"Earnings Statement : {end_date}", font=f_bold, font_size=Decimal(16)))
-
-        # add timesheet table
-        ts_table = FlexibleColumnWidthTable(number_of_rows=28, number_of_columns=7)
-
-        # # row 1: Address Titles
-        text = Paragraph("Employee", font=f_bold, font_size=f_size_l)
-        ts_table.add(TableCell(text, border_top=False, border_right=False, border_left=False, border_bottom=True, border_color=color_bdr, col_span=3))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph("Employer", font=f_bold, font_size=f_size_l)
-        ts_table.add(TableCell(text, border_top=False, border_right=False, border_left=False, border_bottom=True, border_color=color_bdr, col_span=3))
-
-        # row 2: Name + Address
-        text = Paragraph(f"{self.employee.name}\n{self.employee.address_multiline}", font_size=f_size, respect_newlines_in_text=True)
-        ts_table.add(TableCell(text, border_width=Decimal(0), col_span=3, padding_top=Decimal(3), padding_bottom=Decimal(3)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), padding_top=Decimal(3), padding_bottom=Decimal(3)))
-        text = Paragraph(f"{self.data_provider.employer.name}\n{self.data_provider.employer.address_multiline}", font_size=f_size, respect_newlines_in_text=True)
-        ts_table.add(TableCell(text, border_width=Decimal(0), col_span=3, padding_top=Decimal(3), padding_bottom=Decimal(3)))
-
-        # row 3: BLANK
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=7))
-
-        # row 4: Earnings Title
-        text = Paragraph("Employee Earnings", font=f_bold, font_size=f_size_l)
-        ts_table.add(TableCell(text, border_top=False, border_right=False, border_left=False, border_bottom=True, border_color=color_bdr, col_span=7))
-
-        # row 5: Earnings: Headers
-        text = Paragraph("Pay Period", font=f_bold, font_size=f_size)
-        ts_table.add(TableCell(text, border_width=Decimal(0), preferred_width=Decimal(120), padding_top=Decimal(3), padding_bottom=Decimal(3)))
-        text = Paragraph("Rate", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), preferred_width=Decimal(100), padding_top=Decimal(3)))
-        text = Paragraph("Hours", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), preferred_width=Decimal(100), padding_top=Decimal(3)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), preferred_width=Decimal(30)))
-        text = Paragraph("Current Pay Period", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), preferred_width=Decimal(100), padding_top=Decimal(3)))
-        text = Paragraph("Year To Date", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), preferred_width=Decimal(100), padding_top=Decimal(3)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), preferred_width=Decimal(100), padding_top=Decimal(3)))
-
-        # row 6: Earnings: Gross Earnings
-        ts_table.add(TableCell(Paragraph(f"{start_date} - {end_date}", font_size=f_size), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(f"${self.employee.pay_rate:.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(str(self.timesheet.hours), font_size=f_size, horizontal_alignment=Alignment.RIGHT), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(f"${self.timesheet.gross_pay:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(f"${self.timesheet_ytd.gross_pay:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-
-        # row 7: BLANK
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=7))
-
-        # row 8: Tax: Titles
-        text = Paragraph("Employee Taxes Withheld", font=f_bold, font_size=f_size_l)
-        ts_table.add(TableCell(text, border_top=False, border_right=False, border_left=False, border_bottom=True, border_color=color_bdr, col_span=3))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph("Employer Taxes", font=f_bold, font_size=f_size_l)
-        ts_table.add(TableCell(text, border_top=False, border_right=False, border_left=False, border_bottom=True, border_color=color_bdr, col_span=3))
-
-        # row 9: Tax: Headers
-        text = Paragraph("Employee Tax", font=f_bold, font_size=f_size)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3), padding_bottom=Decimal(3)))
-        text = Paragraph("Current Pay Period", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-        text = Paragraph("Year To Date", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), padding_top=Decimal(3)))
-        text = Paragraph("Household Employer Tax", font=f_bold, font_size=f_size)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-        text = Paragraph("Current Pay Period", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-        text = Paragraph("Year To Date", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-
-        # row 10: Tax: Medicare
-        ts_table.add(TableCell(Paragraph("Medicare", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.medicare_employee:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.medicare_employee:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph("Medicare", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.medicare_company:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.medicare_company:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 11: Tax: Social Security
-        ts_table.add(TableCell(Paragraph("Social Security", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.ss_employee:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.ss_employee:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph("Social Security", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.ss_company:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.ss_company:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 12: Tax: WA Paid Family Medical Leave
-        ts_table.add(TableCell(Paragraph("WA Family Medical Leave", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.wa_paid_fml_employee:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.wa_paid_fml_employee:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph("WA Family Medical Leave", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.wa_paid_fml_company:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.wa_paid_fml_company:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 13: Tax: WA Cares and Federal Unemployment
-        ts_table.add(TableCell(Paragraph("WA Cares", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.wa_cares:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.wa_cares:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph("Federal Unemployment", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.federal_unemployment:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.federal_unemployment:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 14: Tax: Federal Withholding and State Unemployment
-        ts_table.add(TableCell(Paragraph("Federal Withholding", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(F"${self.timesheet.federal_withholding:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(F"${self.timesheet_ytd.federal_withholding:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph("WA State Unemployment", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.state_unemployment:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.state_unemployment:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 15: BLANK
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=7))
-
-        # row 16: Time Off Benefits: Title
-        text = Paragraph("Time Off Benefits", font=f_bold, font_size=f_size_l)
-        ts_table.add(TableCell(text, border_top=False, border_right=False, border_left=False, border_bottom=True, border_color=color_bdr, col_span=7))
-
-        # row 17: Time Off Benefits: Headers
-        text = Paragraph("Description", font=f_bold, font_size=f_size)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3), padding_bottom=Decimal(3)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph("Used Current Pay Period", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph("Used Year To Date", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph("Available", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-
-        # row 18: Time Off Benefits: Paid Time Off
-        ts_table.add(TableCell(Paragraph("Paid Time Off (Hours)", font_size=f_size), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.timesheet.paid_time_off_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.timesheet_ytd.paid_time_off_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.employee.paid_vacation - self.timesheet_ytd.paid_time_off_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 19: Time Off Benefits: Sick Time
-        ts_table.add(TableCell(Paragraph("Paid Sick Time (Hours)", font_size=f_size), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.timesheet.paid_sick_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.timesheet_ytd.paid_sick_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.employee.paid_sick - self.timesheet_ytd.paid_sick_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 20: Time Off Benefits: Paid Holidays
-        ts_table.add(TableCell(Paragraph("Paid Holidays (Hours)", font_size=f_size), border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.timesheet.paid_holiday_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.timesheet_ytd.paid_holiday_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0)))
-        text = Paragraph(f"{self.employee.paid_holidays - self.timesheet_ytd.paid_holiday_hours}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 21: BLANK
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=7))
-
-        # row 22: Summary: Title
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=4))
-        text = Paragraph("Summary", font=f_bold, font_size=f_size_l)
-        ts_table.add(TableCell(text, border_top=False, border_right=False, border_left=False, border_bottom=True, border_color=color_bdr, col_span=3))
-
-        # row 23: Summary: Headers
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=4))
-        text = Paragraph("Description", font=f_bold, font_size=f_size)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3), padding_bottom=Decimal(3)))
-        text = Paragraph("Current Pay Period", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-        text = Paragraph("Year To Date", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), padding_top=Decimal(3)))
-
-        # row 24: Summary: Gross Earnings
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=4))
-        ts_table.add(TableCell(Paragraph("Gross Pay", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.gross_pay:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.gross_pay:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 25: Summary: Employee Taxes Withheld
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=4))
-        ts_table.add(TableCell(Paragraph("Employee Taxes Withheld", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.employee_taxes_withheld:,.2f}", font_size=f_size, font_color=color_red, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.employee_taxes_withheld:,.2f}", font_size=f_size, font_color=color_red, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 26: Summary: Net Pay
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=4))
-        ts_table.add(TableCell(Paragraph("Net Pay", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.net_pay:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.net_pay:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 27: Summary: Reimbursements
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=4))
-        ts_table.add(TableCell(Paragraph("Reimbursements", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.reimbursements:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet_ytd.reimbursements:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        # row 28: Summary: Check Amount
-        ts_table.add(TableCell(Paragraph(""), border_width=Decimal(0), col_span=4))
-        ts_table.add(TableCell(Paragraph("Check Amount", font_size=f_size), border_width=Decimal(0)))
-        text = Paragraph(f"${self.timesheet.check_amount:,.2f}", font=f_bold, font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0), background_color=color_lt_green))
-        text = Paragraph(f"${self.timesheet_ytd.check_amount:,.2f}", font_size=f_size, horizontal_alignment=Alignment.RIGHT)
-        ts_table.add(TableCell(text, border_width=Decimal(0)))
-
-        layout.add(ts_table)
-
-        with open(file_path, "wb") as pdf_file:
-            PDF.dumps(pdf_file, doc)
+                    print(f"Added {money.format_dollars(withholding)} of Federal Withholding to {last_entry.date}.")
+
+        # tally the year to date one pay period at a time. each pay period is rounded to the cent on its own, so
+        # this pay period's values are always exactly part of the year to date values.
+        year_start = self.data_provider.get_payroll_calendar(self.end_date.year).start_date
+        for pay_date, values in iter_pay_periods(self.data_provider, self.employee, year_start, self.end_date):
+            self.timesheet_ytd.add(values)
+            if pay_date >= self.start_date:
+                self.timesheet.add(values)
+
+        for pay_type, hours_name in LEAVE_HOURS_FIELDS.items():
+            self.leave_balances[hours_name] = self.data_provider.get_leave_balance(self.employee, pay_type,
+                                                                                   self.end_date)
+
+    def get_cache_key(self, renderer: pdf_renderers.TimesheetRenderer) -> str:
+        """Returns the report cache key of the pay stub pdf: a hash of everything printed on it."""
+        year_start = self.data_provider.get_payroll_calendar(self.end_date.year).start_date
+        time_entries = get_time_entry_inputs(self.employee, year_start, self.end_date)
+        return report_cache.hash_inputs("timesheet", renderer.name, renderer.version, PERIOD_TOTALS_VERSION,
+                                        self.employer.as_dictionary(), self.employee.as_dictionary(),
+                                        self.start_date, self.end_date, time_entries,
+                                        get_tax_rate_inputs(self.data_provider, time_entries, [self.end_date.year]),
+                                        self.leave_balances)
+
+    def to_pdf(self, file_path: Path, renderer: str or pdf_renderers.TimesheetRenderer = None):
+        """Saves the pay stub as a pdf with the named renderer backend (config.TIMESHEET_RENDERER by default). A pay
+        stub that was already rendered from the same values is copied from the report cache."""
+        renderer = pdf_renderers.get_timesheet_renderer(renderer)
+        cache = self.data_provider.report_cache
+        key = self.get_cache_key(renderer) if cache is not None else None
+        if key is None or not cache.restore(key, file_path):
+            renderer.render(self, file_path)
+            if key is not None:
+                cache.save(key, file_path)
         print(f"{file_path} saved.")
 
+    def to_pdf_bytes(self, renderer: str or pdf_renderers.TimesheetRenderer = None, key: str = None) -> bytes:
+        """Returns the pay stub pdf (see to_pdf()) without saving it anywhere. Passing the key from get_cache_key()
+        skips reading the time entries again, so the pdf can be rendered without access to the data."""
+        renderer = pdf_renderers.get_timesheet_renderer(renderer)
+        cache = self.data_provider.report_cache
+        if key is None and cache is not None:
+            key = self.get_cache_key(renderer)
+        pdf = cache.get(key) if key is not None else None
+        if pdf is None:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                file_path = Path(temp_dir) / "timesheet.pdf"
+                renderer.render(self, file_path)
+                pdf = file_path.read_bytes()
+            if key is not None:
+                cache.put(key, pdf)
+        return pdf
+
     def to_console(self):
         print("--THIS PAY PERIOD--")
         print(f"Hours: {self.timesheet.hours}")
-        print(f'Total Gross Pay: ${self.timesheet.gross_pay:,.2f}')
+        print(f'Total Gross Pay: {money.format_dollars(self.timesheet.gross_pay)}')
         print('Employee Taxes:')
-        print(f' - Medicare Employee: ${self.timesheet.medicare_employee:,.2f}')
-        print(f' - Social Security Employee: ${self.timesheet.ss_employee:,.2f}')
-        print(f' - WA Paid Family and Medical Leave: ${self.timesheet.wa_paid_fml_employee:,.2f}')
-        print(f' - WA Cares: ${self.timesheet.wa_cares:,.2f}')
-        print(f' - Federal Withholding: ${self.timesheet.federal_withholding:,.2f}')
-        print(f' - Total Taxes Withheld: ${self.timesheet.employee_taxes_withheld:,.2f}')
-        print(f'Net Pay: ${self.timesheet.net_pay:,.2f}')
-        print(f'Milage and General Reimbursements: ${self.timesheet.reimbursements:,.2f}')
-        print(f'Check Amount: ${self.timesheet.check_amount:,.2f}')
+        print(f' - Medicare Employee: {money.format_dollars(self.timesheet.medicare_employee)}')
+        print(f' - Social Security Employee: {money.format_dollars(self.timesheet.ss_employee)}')
+        print(f' - WA Paid Family and Medical Leave: {money.format_dollars(self.timesheet.wa_paid_fml_employee)}')
+        print(f' - WA Cares: {money.format_dollars(self.timesheet.wa_cares)}')
+        print(f' - Federal Withholding: {money.format_dollars(self.timesheet.federal_withholding)}')
+        print(f' - Total Taxes Withheld: {money.format_dollars(self.timesheet.employee_taxes_withheld)}')
+        print(f'Net Pay: {money.format_dollars(self.timesheet.net_pay)}')
+        print(f'Milage and General Reimbursements: {money.format_dollars(self.timesheet.reimbursements)}')
+        print(f'Check Amount: {money.format_dollars(self.timesheet.check_amount)}')
         print('Employer Taxes:')
-        print(f' - Medicare Employer: ${self.timesheet.medicare_company:,.2f}')
-        print(f' - Social Security Employer: ${self.timesheet.ss_company:,.2f}')
-        print(f' - WA Paid Family and Medical Leave: ${self.timesheet.wa_paid_fml_company:,.2f}')
-        print(f' - Federal Unemployment: ${self.timesheet.federal_unemployment:,.2f}')
-        print(f' - WA State Unemployment: ${self.timesheet.state_unemployment:,.2f}')
-        print(f' - Employer Tax Contributions: ${self.timesheet.company_tax_contributions:,.2f}')
-        print(f'Employer Total Costs: ${self.timesheet.company_total_costs:,.2f}')
+        print(f' - Medicare Employer: {money.format_dollars(self.timesheet.medicare_company)}')
+        print(f' - Social Security Employer: {money.format_dollars(self.timesheet.ss_company)}')
+        print(f' - WA Paid Family and Medical Leave: {money.format_dollars(self.timesheet.wa_paid_fml_company)}')
+        print(f' - Federal Unemployment: {money.format_dollars(self.timesheet.federal_unemployment)}')
+        print(f' - WA State Unemployment: {money.format_dollars(self.timesheet.state_unemployment)}')
+        print(f' - Employer Tax Contributions: {money.format_dollars(self.timesheet.company_tax_contributions)}')
+        print(f'Employer Total Costs: {money.format_dollars(self.timesheet.company_total_costs)}')
 
         print('\n--YEAR TO DATE--')
         print(f'Hours: {self.timesheet_ytd.hours}')
-        print(f'Total Gross Pay: ${self.timesheet_ytd.gross_pay:,.2f}')
+        print(f'Total Gross Pay: {money.format_dollars(self.timesheet_ytd.gross_pay)}')
         print('Employee Taxes:')
-        print(f' - Medicare Employee: ${self.timesheet_ytd.medicare_employee:,.2f}')
-        print(f' - Social Security Employee: ${self.timesheet_ytd.ss_employee:,.2f}')
-        print(f' - WA Paid Family and Medical Leave: ${self.timesheet_ytd.wa_paid_fml_employee:,.2f}')
-        print(f' - WA Cares: ${self.timesheet_ytd.wa_cares:,.2f}')
-        print(f' - Federal Withholding: ${self.timesheet_ytd.federal_withholding:,.2f}')
-        print(f' - Total Taxes Withheld: ${self.timesheet_ytd.employee_taxes_withheld:,.2f}')
-        print(f'Net Pay: ${self.timesheet_ytd.net_pay:,.2f}')
-        print(f'Milage and General Reimbursements: ${self.timesheet_ytd.reimbursements:,.2f}')
-        print(f'Check Amount: ${self.timesheet_ytd.check_amount:,.2f}')
+        print(f' - Medicare Employee: {money.format_dollars(self.timesheet_ytd.medicare_employee)}')
+        print(f' - Social Security Employee: {money.format_dollars(self.timesheet_ytd.ss_employee)}')
+        print(f' - WA Paid Family and Medical Leave: {money.format_dollars(self.timesheet_ytd.wa_paid_fml_employee)}')
+        print(f' - WA Cares: {money.format_dollars(self.timesheet_ytd.wa_cares)}')
+        print(f' - Federal Withholding: {money.format_dollars(self.timesheet_ytd.federal_withholding)}')
+        print(f' - Total Taxes Withheld: {money.format_dollars(self.timesheet_ytd.employee_taxes_withheld)}')
+        print(f'Net Pay: {money.format_dollars(self.timesheet_ytd.net_pay)}')
+        print(f'Milage and General Reimbursements: {money.format_dollars(self.timesheet_ytd.reimbursements)}')
+        print(f'Check Amount: {money.format_dollars(self.timesheet_ytd.check_amount)}')
         print('Employer Taxes:')
-        print(f' - Medicare Employer: ${self.timesheet_ytd.medicare_company:,.2f}')
-        print(f' - Social Security Employer: ${self.timesheet_ytd.ss_company:,.2f}')
-        print(f' - WA Paid Family and Medical Leave: ${self.timesheet_ytd.wa_paid_fml_company:,.2f}')
-        print(f' - Federal Unemployment: ${self.timesheet_ytd.federal_unemployment:,.2f}')
-        print(f' - WA State Unemployment: ${self.timesheet_ytd.state_unemployment:,.2f}')
-        print(f' - Employer Tax Contributions: ${self.timesheet_ytd.company_tax_contributions:,.2f}')
-        print(f'Employer Total Costs: ${self.timesheet_ytd.company_total_costs:,.2f}')
+        print(f' - Medicare Employer: {money.format_dollars(self.timesheet_ytd.medicare_company)}')
+        print(f' - Social Security Employer: {money.format_dollars(self.timesheet_ytd.ss_company)}')
+        print(f' - WA Paid Family and Medical Leave: {money.format_dollars(self.timesheet_ytd.wa_paid_fml_company)}')
+        print(f' - Federal Unemployment: {money.format_dollars(self.timesheet_ytd.federal_unemployment)}')
+        print(f' - WA State Unemployment: {money.format_dollars(self.timesheet_ytd.state_unemployment)}')
+        print(f' - Employer Tax Contributions: {money.format_dollars(self.timesheet_ytd.company_tax_contributions)}')
+        print(f'Employer Total Costs: {money.format_dollars(self.timesheet_ytd.company_total_costs)}')
 
         print('\n--PAID TIME OFF--')
         print(f'Paid Time Off Used To-Date (hours): {self.timesheet_ytd.paid_time_off_hours}')
-        print(f'Paid Time Off Remaining (hours): {self.employee.paid_vacation - self.timesheet_ytd.paid_time_off_hours}')
+        print(f'Paid Time Off Remaining (hours): {self.leave_balances["paid_time_off_hours"]}')
         print(f'Paid Holidays Used To-Date (hours): {self.timesheet_ytd.paid_holiday_hours}')
-        print(f'Paid Holiday Remaining (hours): {self.employee.paid_holidays - self.timesheet_ytd.paid_holiday_hours}')
+        print(f'Paid Holiday Remaining (hours): {self.leave_balances["paid_holiday_hours"]}')
         print(f'Paid Sick Time Used To-Date (hours): {self.timesheet_ytd.paid_sick_hours}')
-        print(f'Paid Sick Time Remaining (hours): {self.employee.paid_sick - self.timesheet_ytd.paid_sick_hours}')
+        print(f'Paid Sick Time Remaining (hours): {self.leave_balances["paid_sick_hours"]}')
+
+
+def write_eams_csv(reports: list[QuarterlyReportValues], file_path: Path):
+    """Writes quarterly reports out to csv format. This is useful for importing directly into the EAMS website."""
+    rows = []
+    for report in reports:
+        row = [report.employee.ssn,
+               report.employee.last_name,
+               report.employee.first_name,
+               report.employee.middle_name,
+               "",  # suffix
+               math.ceil(report.hours),  # EAMS tool requires whole numbers, no decimals
+               money.format_amount(report.gross_pay),
+               config.EAMS_OCCUPATIONAL_CODE]
+        rows.append(row)
+
+    # writing to csv file
+    with open(file_path, "w", newline="") as csvfile:
+        # creating a csv writer object
+        csvwriter = csv.writer(csvfile)
+        csvwriter.writerows(rows)
 
 
 class EAMSQuarterlyReport:
@@ -591,57 +345,30 @@ class EAMSQuarterlyReport:
         self.calculate()
 
     def get_date_range(self, quarter):
-        """Populates start and end dates for the provided quarter of year."""
-        if quarter == 1:
-            self.start_date = Date(self.year, 1, 1)
-            self.end_date = Date(self.year, 3, 31)
-        elif quarter == 2:
-            self.start_date = Date(self.year, 4, 1)
-            self.end_date = Date(self.year, 6, 30)
-        elif quarter == 3:
-            self.start_date = Date(self.year, 7, 1)
-            self.end_date = Date(self.year, 9, 30)
-        elif quarter == 4:
-            self.start_date = Date(self.year, 10, 1)
-            self.end_date = Date(self.year, 12, 31)
-        else:
-            raise IOError(f"Provided 'quarter' value of '{quarter}' is invalid. Valid inputs: 1, 2, 3, or 4.")
+        """Populates start and end dates for the pay periods paid in the provided quarter of year."""
+        calendar = self.data_provider.get_payroll_calendar(self.year)
+        self.start_date, self.end_date = calendar.get_quarter_date_range(quarter)
 
     def calculate(self):
         """Builds a report for each employee from the current date range."""
         self.reports = []
 
+        totals = self.data_provider.aggregate(EAMS_VALUES, "employee", self.start_date, self.end_date)
         for employee in self.data_provider.employees:
-            time_entries = self.data_provider.get_worked_time_in_range(employee, self.start_date, self.end_date)
-            if not time_entries:
+            employee_totals = totals.get((employee.name,))
+            if employee_totals is None:
                 print(f'WARNING: No time entries found for {employee.name} in the provided date range.')
 
             report = QuarterlyReportValues()
             report.employee = employee
-            for time_entry in time_entries:
-                report.add_time_entry(time_entry)
+            if employee_totals is not None:
+                report.add_totals(employee_totals)
 
             self.reports.append(report)
 
     def to_csv(self, file_path: Path):
         """Writes the reports out to csv format. This is useful for importing directly into the EAMS website."""
-        rows = []
-        for report in self.reports:
-            row = [report.employee.ssn,
-                   report.employee.last_name,
-                   report.employee.first_name,
-                   report.employee.middle_name,
-                   "",  # suffix
-                   math.ceil(report.hours),  # EAMS tool requires whole numbers, no decimals
-                   report.gross_pay,
-                   config.EAMS_OCCUPATIONAL_CODE]
-            rows.append(row)
-
-        # writing to csv file
-        with open(file_path, "w", newline="") as csvfile:
-            # creating a csv writer object
-            csvwriter = csv.writer(csvfile)
-            csvwriter.writerows(rows)
+        write_eams_csv(self.reports, file_path)
 
     def to_console(self):
         """Prints the reports."""
@@ -651,10 +378,103 @@ class EAMSQuarterlyReport:
                   f"{report.employee.first_name}, "
                   f"{report.employee.middle_name}, "
                   f"{report.hours}, "
-                  f"{report.gross_pay}, "
+                  f"{money.format_amount(report.gross_pay)}, "
                   f"{config.EAMS_OCCUPATIONAL_CODE}")
 
 
+class EAMSYearlyReport:
+    """Generates the Washington State EAMS reports for every quarter of a year from a single aggregate of the pay
+    period totals. Also provides annual totals for checking against the W-2 numbers."""
+    def __init__(self, data: DataProvider, year: int):
+        self.data_provider = data
+        self.employer = self.data_provider.employer
+
+        self.quarterly_reports = {}
+        self.annual_reports = []
+
+        self.year = year
+        self.calendar = self.data_provider.get_payroll_calendar(self.year)
+        self.start_date = self.calendar.start_date  # wages are reported in the year they are paid
+        self.end_date = self.calendar.end_date
+        self.calculate()
+
+    def calculate(self):
+        """Totals every employee's pay periods for the year per quarter into per quarter and annual reports."""
+        self.quarterly_reports = {quarter: [] for quarter in range(1, 5)}
+        self.annual_reports = []
+
+        totals = self.data_provider.aggregate(EAMS_VALUES, ["employee", "quarter"], self.start_date, self.end_date)
+        for employee in self.data_provider.employees:
+            annual_report = QuarterlyReportValues()
+            annual_report.employee = employee
+            for quarter, reports in self.quarterly_reports.items():
+                report = QuarterlyReportValues()
+                report.employee = employee
+                quarter_totals = totals.get((employee.name, (self.year, quarter)))
+                if quarter_totals is not None:
+                    report.add_totals(quarter_totals)
+                    annual_report.add_totals(quarter_totals)
+                reports.append(report)
+            self.annual_reports.append(annual_report)
+
+    def get_reports(self, quarter: int) -> list[QuarterlyReportValues]:
+        """Returns the employee reports for the provided quarter of year."""
+        if quarter not in self.quarterly_reports:
+            raise IOError(f"Provided 'quarter' value of '{quarter}' is invalid. Valid inputs: 1, 2, 3, or 4.")
+        return self.quarterly_reports[quarter]
+
+    def to_csv(self, file_path: Path, quarter: int):
+        """Writes the reports for a single quarter out to csv format for importing into the EAMS website."""
+        reports = self.get_reports(quarter)
+        for report in reports:
+            if not report.hours and not report.gross_pay:
+                print(f'WARNING: No time entries found for {report.employee.name} in quarter {quarter} of {self.year}.')
+        write_eams_csv(reports, file_path)
+
+    def to_csv_all(self, directory: Path, quarters: list[int] = None) -> list[Path]:
+        """Writes a csv for each requested quarter (all quarters by default) and returns the written paths."""
+        directory.mkdir(parents=True, exist_ok=True)
+        file_paths = []
+        for quarter in quarters or self.quarterly_reports.keys():
+            file_path = directory / f"EAMSReport_{self.year}_Q{quarter}.csv"
+            self.to_csv(file_path, quarter)
+            file_paths.append(file_path)
+        return file_paths
+
+    def reconcile(self, w2_report: 'W2Report', tolerance: int = 0) -> list[str]:
+        """Compares the annual gross pay totals against the W-2 wages for the same year (tolerance is in cents).
+        Returns a list of any discrepancies (an empty list means the reports agree)."""
+        w2_wages = {report.employee.name: report.wages for report in w2_report.reports}
+        discrepancies = []
+        for report in self.annual_reports:
+            wages = w2_wages.get(report.employee.name, 0)
+            if abs(report.gross_pay - wages) > tolerance:
+                discrepancies.append(f"{report.employee.name}: EAMS annual gross pay "
+                                     f"{money.format_dollars(report.gross_pay)} does not match W-2 wages "
+                                     f"{money.format_dollars(wages)}")
+        return discrepancies
+
+    def to_console(self):
+        """Prints the reports for every quarter followed by the annual totals."""
+        for quarter, reports in self.quarterly_reports.items():
+            print(f"--QUARTER {quarter}--")
+            for report in reports:
+                print(f"{report.employee.ssn}, "
+                      f"{report.employee.last_name}, "
+                      f"{report.employee.first_name}, "
+                      f"{report.employee.middle_name}, "
+                      f"{report.hours}, "
+                      f"{money.format_amount(report.gross_pay)}, "
+                      f"{config.EAMS_OCCUPATIONAL_CODE}")
+        self.print_annual_totals()
+
+    def print_annual_totals(self):
+        """Prints the annual totals for each employee."""
+        print(f"--ANNUAL TOTALS {self.year}--")
+        for report in self.annual_reports:
+            print(f"{report.employee.name}: hours {report.hours}, gross pay {money.format_dollars(report.gross_pay)}")
+
+
 class W2Report:
     """Generates reports for yearly W2 filing with the Social Security Office."""
     def __init__(self, data: DataProvider, year: int):
@@ -664,50 +484,239 @@ class W2Report:
         self.reports = []
 
         self.year = year
-        self.start_date = Date(self.year, 1, 1)
-        self.end_date = Date(self.year, 12, 31)
+        self.calendar = self.data_provider.get_payroll_calendar(self.year)
+        self.start_date = self.calendar.start_date  # wages are reported in the year they are paid
+        self.end_date = self.calendar.end_date
         self.calculate()
 
     def calculate(self):
         """Builds a report for each employee from the current date range."""
-        self.reports = []
+        self.reports = list(self.iter_reports())
 
+    def iter_reports(self):
+        """Yields the report for each employee as it is calculated."""
         tax_rates = self.data_provider.get_tax_rates(year=self.year)
-
+        if tax_rates is None:
+            raise ValueError(f"No tax rates found for {self.year}.")
         for employee in self.data_provider.employees:
-            time_entries = self.data_provider.get_worked_time_in_range(employee, self.start_date, self.end_date)
-            if not time_entries:
-                print(f'WARNING: No time entries found for {employee.name} in the provided date range.')
-
-            report = W2ReportValues()
-            report.employee = employee
-            for time_entry in time_entries:
-                time_entry.tax_rates = tax_rates
-                report.add_time_entry(time_entry)
-
-            report.ss_wages = report.wages
-            report.medicare_wages = report.wages
-
-            # apply social security taxable wages cap to social security
-            if report.wages > tax_rates.ss_taxable_max:
-                report.ss_wages = tax_rates.ss_taxable_max
-                report.ss_tax_withheld = tax_rates.ss_taxable_max * tax_rates.ss_employee
-
-            self.reports.append(report)
+            yield self.calculate_employee(employee, tax_rates)
+
+    def calculate_employee(self, employee: Employee, tax_rates: TaxRates) -> W2ReportValues:
+        """Builds the report for a single employee from the current date range. The withheld amounts are the sums of
+        the per pay period amounts, so they match the pay stubs to the cent."""
+        totals = self.data_provider.aggregate(W2_VALUES, (), self.start_date, self.end_date, employees=[employee])
+        if not totals:
+            print(f'WARNING: No time entries found for {employee.name} in the provided date range.')
+
+        report = W2ReportValues()
+        report.employee = employee
+        if totals:
+            report.add_totals(totals[()])
+        report.apply_wage_caps(tax_rates)
+
+        return report
+
+    def get_cache_key(self) -> str:
+        """Returns the report cache key of the EFW2 file: a hash of the employer, employees and time entries of the
+        year and the tax rates they were calculated with."""
+        employees = []
+        time_entries = []
+        for employee in self.data_provider.employees:
+            employee_entries = get_time_entry_inputs(employee, self.start_date, self.end_date)
+            employees.append((employee.as_dictionary(), employee_entries))
+            time_entries += employee_entries
+        return report_cache.hash_inputs("efw2", efw2.FORMAT_VERSION, PERIOD_TOTALS_VERSION, self.year,
+                                        self.employer.as_dictionary(), employees,
+                                        get_tax_rate_inputs(self.data_provider, time_entries, [self.year]))
+
+    def to_efw2(self, file_path: Path) -> list[str]:
+        """Writes an SSA EFW2 submission file, streaming each employee's RW record as it is calculated. The written
+        file is validated afterwards and any problems are returned (an empty list means the file is valid). Valid
+        files are cached, so writing the same year again only copies the file."""
+        cache = self.data_provider.report_cache
+        key = self.get_cache_key() if cache is not None else None
+        if key is not None and cache.restore(key, file_path):
+            return []
+
+        with efw2.EFW2Writer(file_path, self.employer, self.year) as writer:
+            for report in self.iter_reports():
+                writer.write_employee(report)
+
+        problems = efw2.validate_efw2(file_path)
+        for problem in problems:
+            print(f"ERROR: {problem}")
+        if key is not None and not problems:
+            cache.save(key, file_path)
+        return problems
 
     def print_to_console(self):
         for report in self.reports:
             print(f"W-2 Report for {report.employee.name} from tax year {self.year}")
             print("Box 1: Wages, tips, other compensation:")
-            print(f"        {report.wages:.2f}")
+            print(f"        {money.format_amount(report.wages)}")
             print("Box 2: Federal income tax withheld:")
-            print(f"        {report.federal_withholding:.2f}")
+            print(f"        {money.format_amount(report.federal_withholding)}")
             print("Box 3: Social security wages:")
-            print(f"        {report.ss_wages:.2f}")
+            print(f"        {money.format_amount(report.ss_wages)}")
             print("Box 4: Social security tax withheld:")
-            print(f"        {report.ss_tax_withheld:.2f}")
+            print(f"        {money.format_amount(report.ss_tax_withheld)}")
             print("Box 5: Medicare wages and tips:")
-            print(f"        {report.medicare_wages:.2f}")
+            print(f"        {money.format_amount(report.medicare_wages)}")
             print("Box 6: Medicare tax withheld:")
-            print(f"        {report.medicare_tax_withheld:.2f}")
+            print(f"        {money.format_amount(report.medicare_tax_withheld)}")
             print()
+
+
+ADDITIONAL_MEDICARE_THRESHOLD = 200000_00  # cents. wages over this are subject to additional medicare tax withholding
+ADDITIONAL_MEDICARE_PERCENT = 0.9
+FUTA_QUARTERLY_WAGE_TEST = 1000_00  # cents. FUTA is owed once any quarter's cash wages reach this
+
+
+class ScheduleHReport:
+    """Generates the yearly IRS Schedule H (Household Employment Taxes) lines for all employees from a single pass
+    over each employee's pay period totals. The same pass builds the employees' W-2 values, and reconcile() checks
+    the lines against them and against the taxes actually paid each pay period.
+
+    FUTA is calculated with Part II Section A (unemployment contributions were paid to only one state, on time)."""
+    def __init__(self, data: DataProvider, year: int):
+        self.data_provider = data
+        self.employer = self.data_provider.employer
+
+        self.lines = ScheduleHValues()
+        self.w2_reports: list[W2ReportValues] = []
+        self.pay_period_totals = TimesheetValues()  # every pay period of the year added together
+        self.covered_pay_period_totals = TimesheetValues()  # the pay periods of employees over the threshold
+        self.covered_pay_periods = 0
+        self.covered_employees: set[str] = set()  # names of the employees paid the cash wage threshold or more
+        self.pay_periods = 0
+        self.quarterly_wages: dict[tuple[int, int], int] = {}  # (year, quarter) -> cash wages of all employees
+
+        self.year = year
+        self.calculate()
+
+    def calculate(self):
+        """Builds every line of the schedule."""
+        tax_rates = self.data_provider.get_tax_rates(year=self.year)
+        if tax_rates is None:
+            raise ValueError(f"No tax rates found for {self.year}.")
+        threshold = tax_rates.household_cash_wage_threshold_cents
+        if not threshold:
+            print(f"WARNING: No HouseholdCashWageThreshold in the {self.year} tax rates. All employees are treated "
+                  f"as being over the threshold.")
+
+        self.lines = ScheduleHValues()
+        self.w2_reports = []
+        self.pay_period_totals = TimesheetValues()
+        self.covered_pay_period_totals = TimesheetValues()
+        self.covered_pay_periods = 0
+        self.covered_employees = set()
+        self.pay_periods = 0
+        self.quarterly_wages = {(year, quarter): 0 for year in (self.year - 1, self.year) for quarter in range(1, 5)}
+        futa_wages = 0
+
+        for employee in self.data_provider.employees:
+            # the year before only matters for the line 9 quarterly wage test
+            for pay_date, values in self.data_provider.get_period_totals(employee, self.year - 1):
+                self.quarterly_wages[(pay_date.year, get_quarter(pay_date))] += values.gross_pay
+
+            w2 = W2ReportValues(employee=employee)
+            employee_totals = TimesheetValues()
+            pay_periods = self.data_provider.get_period_totals(employee, self.year)
+            for pay_date, values in pay_periods:
+                w2.add_pay_period(values)
+                employee_totals.add(values)
+                self.quarterly_wages[(pay_date.year, get_quarter(pay_date))] += values.gross_pay
+            w2.apply_wage_caps(tax_rates)
+            self.w2_reports.append(w2)
+            self.pay_period_totals.add(employee_totals)
+            self.pay_periods += len(pay_periods)
+
+            self.lines.line_7 += w2.federal_withholding
+            futa_wages += min(w2.wages, tax_rates.federal_unemployment_taxable_max_cents)
+            if w2.wages >= threshold:
+                self.lines.line_a = True
+                self.covered_employees.add(employee.name)
+                self.lines.line_1 += w2.ss_wages
+                self.lines.line_3 += w2.medicare_wages
+                self.lines.line_5 += max(0, w2.medicare_wages - ADDITIONAL_MEDICARE_THRESHOLD)
+                self.covered_pay_period_totals.add(employee_totals)
+                self.covered_pay_periods += len(pay_periods)
+
+        rates = tax_rates.rates
+        self.lines.line_2 = money.apply_rate(self.lines.line_1, rates["ss_employee"] + rates["ss_company"])
+        self.lines.line_4 = money.apply_rate(self.lines.line_3, rates["medicare_employee"] + rates["medicare_company"])
+        self.lines.line_6 = money.apply_rate(self.lines.line_5, money.percent_to_rate(ADDITIONAL_MEDICARE_PERCENT))
+        self.lines.line_8 = self.lines.line_2 + self.lines.line_4 + self.lines.line_6 + self.lines.line_7
+
+        self.lines.line_9 = any(wages >= FUTA_QUARTERLY_WAGE_TEST for wages in self.quarterly_wages.values())
+        if self.lines.line_9:
+            self.lines.line_13 = config.UNEMPLOYMENT_STATE
+            self.lines.line_14 = self.pay_period_totals.state_unemployment
+            self.lines.line_15 = futa_wages
+            self.lines.line_16 = money.apply_rate(futa_wages, rates["federal_unemployment"])
+
+        self.lines.line_25 = self.lines.line_8
+        self.lines.line_26 = self.lines.line_16 + self.lines.line_25
+
+    def reconcile(self, w2_report: W2Report = None) -> list[str]:
+        """Checks the lines against the W-2 totals (from the same pass by default) and against the taxes paid in the
+        pay periods. Taxes are rounded once per pay period on the pay stubs but once per year here, so they may differ
+        by up to a cent per pay period. Returns a list of any discrepancies (an empty list means they agree)."""
+        w2_reports = self.w2_reports if w2_report is None else w2_report.reports
+        covered_reports = [report for report in w2_reports if report.employee.name in self.covered_employees]
+        discrepancies = []
+
+        def check(name: str, value: int, expected: int, tolerance: int = 0):
+            if abs(value - expected) > tolerance:
+                discrepancies.append(f"{name} is {money.format_dollars(value)} but should be "
+                                     f"{money.format_dollars(expected)}")
+
+        # the wage lines against the W-2 boxes
+        check("Line 1 (social security wages)", self.lines.line_1, sum(report.ss_wages for report in covered_reports))
+        check("Line 3 (medicare wages)", self.lines.line_3, sum(report.medicare_wages for report in covered_reports))
+        check("Line 7 (federal income tax withheld)", self.lines.line_7,
+              sum(report.federal_withholding for report in w2_reports))
+
+        # the tax lines against what was withheld and contributed each pay period
+        covered = self.covered_pay_period_totals
+        check("Line 2 (social security tax)", self.lines.line_2, covered.ss_employee + covered.ss_company,
+              self.covered_pay_periods)
+        check("Line 4 (medicare tax)", self.lines.line_4, covered.medicare_employee + covered.medicare_company,
+              self.covered_pay_periods)
+        if self.lines.line_9:
+            check("Line 16 (FUTA tax)", self.lines.line_16, self.pay_period_totals.federal_unemployment,
+                  self.pay_periods)
+
+        # social security and medicare withheld from an employee under the threshold has to be paid back to them
+        for report in w2_reports:
+            if report.employee.name not in self.covered_employees and \
+                    (report.ss_tax_withheld or report.medicare_tax_withheld):
+                discrepancies.append(f"{report.employee.name} was paid under the cash wage threshold but had "
+                                     f"social security and medicare tax withheld")
+        return discrepancies
+
+    def print_to_console(self):
+        lines = self.lines
+        print(f"Schedule H (Form 1040) for {self.employer.name} from tax year {self.year}")
+        print(f"Line A: Paid any one household employee the cash wage threshold or more: "
+              f"{'Yes' if lines.line_a else 'No'}")
+        print(f"Line 1: Total cash wages subject to social security tax: {money.format_amount(lines.line_1)}")
+        print(f"Line 2: Social security tax: {money.format_amount(lines.line_2)}")
+        print(f"Line 3: Total cash wages subject to Medicare tax: {money.format_amount(lines.line_3)}")
+        print(f"Line 4: Medicare tax: {money.format_amount(lines.line_4)}")
+        print(f"Line 5: Total cash wages subject to Additional Medicare Tax withholding: "
+              f"{money.format_amount(lines.line_5)}")
+        print(f"Line 6: Additional Medicare Tax withholding: {money.format_amount(lines.line_6)}")
+        print(f"Line 7: Federal income tax withheld: {money.format_amount(lines.line_7)}")
+        print(f"Line 8: Total social security, Medicare, and federal income taxes: {money.format_amount(lines.line_8)}")
+        print(f"Line 9: Paid $1,000 or more in any calendar quarter of {self.year - 1} or {self.year}: "
+              f"{'Yes' if lines.line_9 else 'No'}")
+        if lines.line_9:
+            print(f"Line 13: State unemployment contributions paid to: {lines.line_13}")
+            print(f"Line 14: Contributions paid to your state unemployment fund: {money.format_amount(lines.line_14)}")
+            print(f"Line 15: Total cash wages subject to FUTA tax: {money.format_amount(lines.line_15)}")
+            print(f"Line 16: FUTA tax: {money.format_amount(lines.line_16)}")
+        print(f"Line 25: {money.format_amount(lines.line_25)}")
+        print(f"Line 26: Total household employment taxes: {money.format_amount(lines.line_26)}")
+        for discrepancy in self.reconcile():
+            print(f"WARNING: {discrepancy}")
@@ -0,0 +1,70 @@
+"""Binary snapshots of loaded DataProvider state for fast warm starts.
+
+A snapshot file is:
+    MAGIC, sha256 of the payload, payload (a pickle of {"manifest": ..., "state": ...})
+The manifest maps every source file path to its signature (mtime_ns, size), or None if the file didn't exist, as
+of when it was read. A snapshot whose checksum, magic or format doesn't match is rejected as a whole, and the
+signatures tell the caller which source files changed since and need to be reloaded."""
+
+__author__ = 'Sean Kraft'
+
+from pathlib import Path
+import hashlib
+import os
+import pickle
+
+MAGIC = b"NPMSNAP\x06"  # bump the last byte whenever the pickled classes (or how their values are calculated) change
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+class SnapshotError(Exception):
+    pass
+
+
+def file_signature(path: Path) -> tuple[int, int] or None:
+    """Returns (mtime_ns, size) for the file, or None if it doesn't exist."""
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_signatures(paths: list[Path]) -> dict[str, tuple[int, int] or None]:
+    return {str(path): file_signature(path) for path in paths}
+
+
+def changed_files(manifest: dict[str, tuple[int, int] or None]) -> set[Path]:
+    """Returns the paths in the manifest whose signature no longer matches the file on disk."""
+    return {Path(path) for path, signature in manifest.items() if file_signature(Path(path)) != signature}
+
+
+def write_snapshot(path: Path, manifest: dict, state: dict):
+    """Writes the snapshot to a temporary file first, so a crash can't leave a partial snapshot behind."""
+    payload = pickle.dumps({"manifest": manifest, "state": state}, protocol=pickle.HIGHEST_PROTOCOL)
+    temp_path = path.with_name(path.name + ".tmp")
+    with open(temp_path, "wb") as out_file:
+        out_file.write(MAGIC + hashlib.sha256(payload).digest() + payload)
+    os.replace(temp_path, path)
+
+
+def read_snapshot(path: Path) -> tuple[dict, dict]:
+    """Reads and validates a snapshot in a single read. Returns (manifest, state)."""
+    try:
+        with open(path, "rb") as in_file:
+            data = in_file.read()
+    except OSError as error:
+        raise SnapshotError(f"Unable to read '{path}': {error}")
+
+    header_size = len(MAGIC) + DIGEST_SIZE
+    if len(data) < header_size or not data.startswith(MAGIC):
+        raise SnapshotError(f"'{path}' is not a snapshot or is from an incompatible version.")
+    payload = data[header_size:]
+    if hashlib.sha256(payload).digest() != data[len(MAGIC):header_size]:
+        raise SnapshotError(f"'{path}' is corrupt (checksum mismatch).")
+
+    try:
+        snapshot = pickle.loads(payload)
+        return snapshot["manifest"], snapshot["state"]
+    except (pickle.UnpicklingError, AttributeError, ImportError, KeyError, TypeError, EOFError) as error:
+        raise SnapshotError(f"Unable to load '{path}': {type(error).__name__}: {error}")
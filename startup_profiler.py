@@ -0,0 +1,118 @@
+"""Times the phases of launching the app (see main.py --profile-startup).
+
+    profiler = StartupProfiler(use_cprofile=True)
+    with profiler.phase("DataProvider()"):
+        data = DataProvider()
+    profiler.add_timings("DataProvider()", data.load_timings)
+    profiler.write(Path("startup_profile.txt"))
+
+Phases can be nested and the report lists them in the order they started, indented under their parent, with their
+share of the total launch time. With use_cprofile the whole launch also runs under cProfile: the report ends with the
+slowest functions, and the raw stats are written next to it (<report>.prof, for snakeviz or pstats)."""
+
+__author__ = 'Sean Kraft'
+
+from contextlib import contextmanager
+from pathlib import Path
+import cProfile
+import io
+import pstats
+import time
+
+CPROFILE_FUNCTIONS = 30  # functions listed in the report
+
+
+class StartupPhase:
+    def __init__(self, name: str, depth: int, seconds: float = 0):
+        self.name = name
+        self.depth = depth  # 0 for top level phases
+        self.seconds = seconds
+
+    def __repr__(self):
+        return f"StartupPhase(name={self.name}, depth={self.depth}, seconds={self.seconds:.4f})"
+
+
+class StartupProfiler:
+    def __init__(self, use_cprofile: bool = False):
+        self.phases: list[StartupPhase] = []
+        self.start_time = time.perf_counter()
+        self.end_time = None
+        self._depth = 0
+        self.cprofile = cProfile.Profile() if use_cprofile else None
+        if self.cprofile is not None:
+            self.cprofile.enable()
+
+    def __repr__(self):
+        return f"StartupProfiler(phases={len(self.phases)}, total={self.total:.4f})"
+
+    @property
+    def total(self) -> float:
+        """Seconds from creating the profiler until stop() (or until now)."""
+        return (self.end_time or time.perf_counter()) - self.start_time
+
+    def begin(self, name: str) -> StartupPhase:
+        """Starts timing a phase (nested in any phase that hasn't ended yet). Pass the result to end()."""
+        startup_phase = StartupPhase(name, self._depth)
+        self.phases.append(startup_phase)
+        self._depth += 1
+        startup_phase.seconds = -time.perf_counter()
+        return startup_phase
+
+    def end(self, startup_phase: StartupPhase, end_time: float = None):
+        """Ends the phase now, or at end_time (a time.perf_counter() value measured elsewhere)."""
+        startup_phase.seconds += end_time or time.perf_counter()
+        self._depth -= 1
+
+    @contextmanager
+    def phase(self, name: str):
+        """Times the code in the with block as a phase."""
+        startup_phase = self.begin(name)
+        try:
+            yield startup_phase
+        finally:
+            self.end(startup_phase)
+
+    def add_timings(self, parent: str, timings: dict[str, float]):
+        """Adds already measured sub phases (name -> seconds, ie DataProvider.load_timings) under the last phase named
+        parent."""
+        index = max(i for i, startup_phase in enumerate(self.phases) if startup_phase.name == parent)
+        depth = self.phases[index].depth + 1
+        self.phases[index + 1:index + 1] = [StartupPhase(name, depth, seconds) for name, seconds in timings.items()]
+
+    def stop(self, end_time: float = None):
+        """Ends the launch now, or at end_time (a time.perf_counter() value measured elsewhere)."""
+        if self.end_time is None:
+            self.end_time = end_time or time.perf_counter()
+            if self.cprofile is not None:
+                self.cprofile.disable()
+
+    def report(self) -> str:
+        """Returns the summary: a line per phase, followed by the slowest functions when cProfile is on."""
+        self.stop()
+        lines = [f"{'phase':<48}{'ms':>10}{'%':>7}"]
+        for startup_phase in self.phases:
+            name = "  " * startup_phase.depth + startup_phase.name
+            lines.append(f"{name:<48}{startup_phase.seconds * 1000:>10.1f}"
+                         f"{startup_phase.seconds / self.total * 100:>7.1f}")
+        measured = sum(startup_phase.seconds for startup_phase in self.phases if startup_phase.depth == 0)
+        lines.append(f"{'(not in a phase)':<48}{(self.total - measured) * 1000:>10.1f}"
+                     f"{(self.total - measured) / self.total * 100:>7.1f}")
+        lines.append(f"{'total':<48}{self.total * 1000:>10.1f}{100:>7.1f}")
+
+        if self.cprofile is not None:
+            stream = io.StringIO()
+            stats = pstats.Stats(self.cprofile, stream=stream)
+            stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(CPROFILE_FUNCTIONS)
+            lines += ["", f"cProfile: top {CPROFILE_FUNCTIONS} functions by cumulative time", stream.getvalue()]
+        return "\n".join(lines)
+
+    def write(self, file_path: Path) -> str:
+        """Writes the report (and the raw cProfile stats to <file_path>.prof) and returns the report."""
+        file_path = Path(file_path)
+        report = self.report()
+        file_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(file_path, "w") as out_file:
+            out_file.write(report + "\n")
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(file_path.with_suffix(".prof"))
+        return report
@@ -5,9 +5,201 @@ __author__ = 'Sean Kraft'
 
 from PySide6 import QtWidgets, QtCore, QtGui
 import data_provider
+import importers
+import money
 import reports
 from pathlib import Path
 import config
+from contextlib import contextmanager
+import time
+
+
+@contextmanager
+def blocked_signals(*widgets: QtCore.QObject):
+    """Blocks the widgets' signals in the with block (restoring what was blocked before)."""
+    was_blocked = [widget.blockSignals(True) for widget in widgets]
+    try:
+        yield
+    finally:
+        for widget, blocked in zip(widgets, was_blocked):
+            widget.blockSignals(blocked)
+
+
+def pay_type_label(pay_type: data_provider.PayType) -> str:
+    return pay_type.name.replace('_', ' ').title()
+
+
+def pay_type_from_label(label: str) -> data_provider.PayType:
+    return data_provider.PayType[label.replace(' ', '_').upper()]
+
+
+class TimeEntryTableModel(QtCore.QAbstractTableModel):
+    """An employee's time entries for the history tab. Filtering and sorting are done on the entries up front (cheap
+    in python, even for tens of thousands of entries), but the rows are handed to the view FETCH_BATCH_SIZE at a time
+    as it scrolls (canFetchMore/fetchMore). Edits go through the DataProvider, so they are saved with data.save()."""
+    FETCH_BATCH_SIZE = 500
+    COLUMNS = ["Date", "Pay Type", "Hours", "Pay Rate", "Gross Pay", "Reimbursement", "Note"]
+    # column -> TimeEntry field changed by editing it
+    EDITABLE_COLUMNS = {0: "date", 1: "pay_type", 2: "hours", 3: "pay_rate", 5: "reimbursement", 6: "note"}
+    SORT_KEYS = [lambda entry: entry.date,
+                 lambda entry: entry.pay_type.value,
+                 lambda entry: entry.hours,
+                 lambda entry: entry.pay_rate,
+                 lambda entry: entry.gross_pay_cents,
+                 lambda entry: entry.reimbursement or 0,
+                 lambda entry: entry.note or ""]
+
+    def __init__(self, data: data_provider.DataProvider, parent: QtCore.QObject = None):
+        super().__init__(parent)
+        self.data_provider = data  # NOTE: self.data is the QAbstractTableModel method
+        self.employee: data_provider.Employee or None = None
+        self.start_date = None
+        self.end_date = None
+        self.pay_type: data_provider.PayType or None = None
+        self.sort_column = 0
+        self.sort_order = QtCore.Qt.SortOrder.DescendingOrder
+
+        self.time_entries: list[data_provider.TimeEntry] = []  # every entry that passes the filter, sorted
+        self.fetched = 0  # number of those entries the view has been given
+
+    def set_employee(self, employee: data_provider.Employee or None):
+        self.employee = employee
+        self.refresh()
+
+    def set_filter(self, start_date=None, end_date=None, pay_type: data_provider.PayType = None):
+        """Shows only the entries between the dates (inclusive, open ended if None) of the pay type (all if None)."""
+        self.start_date = start_date
+        self.end_date = end_date
+        self.pay_type = pay_type
+        self.refresh()
+
+    def refresh(self):
+        """Rebuilds the rows from the employee's time entries (ie after they were added to or reloaded)."""
+        self.beginResetModel()
+        time_entries = self.employee.time_entries if self.employee is not None else []
+        self.time_entries = [entry for entry in time_entries
+                             if (self.start_date is None or entry.date >= self.start_date) and
+                             (self.end_date is None or entry.date <= self.end_date) and
+                             (self.pay_type is None or entry.pay_type is self.pay_type)]
+        self.time_entries.sort(key=self.SORT_KEYS[self.sort_column],
+                               reverse=self.sort_order == QtCore.Qt.SortOrder.DescendingOrder)
+        self.fetched = min(self.FETCH_BATCH_SIZE, len(self.time_entries))
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else self.fetched
+
+    def columnCount(self, parent=QtCore.QModelIndex()) -> int:
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()) -> bool:
+        return not parent.isValid() and self.fetched < len(self.time_entries)
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        count = min(self.FETCH_BATCH_SIZE, len(self.time_entries) - self.fetched)
+        if parent.isValid() or count <= 0:
+            return
+        self.beginInsertRows(QtCore.QModelIndex(), self.fetched, self.fetched + count - 1)
+        self.fetched += count
+        self.endInsertRows()
+
+    def headerData(self, section: int, orientation: QtCore.Qt.Orientation, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if orientation == QtCore.Qt.Orientation.Horizontal and role == QtCore.Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def flags(self, index: QtCore.QModelIndex) -> QtCore.Qt.ItemFlag:
+        flags = super().flags(index)
+        if index.column() in self.EDITABLE_COLUMNS:
+            flags |= QtCore.Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index: QtCore.QModelIndex, role=QtCore.Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        entry = self.time_entries[index.row()]
+        column = index.column()
+
+        if role == QtCore.Qt.ItemDataRole.DisplayRole:
+            if column == 0:
+                return entry.date.strftime('%m/%d/%Y')
+            if column == 1:
+                return pay_type_label(entry.pay_type)
+            if column == 2:
+                return f"{entry.hours:g}"
+            if column == 3:
+                return money.format_dollars(money.to_cents(entry.pay_rate))
+            if column == 4:
+                return money.format_dollars(entry.gross_pay_cents)
+            if column == 5:
+                return money.format_dollars(entry.reimbursement_cents) if entry.reimbursement else ""
+            return entry.note or ""
+
+        if role == QtCore.Qt.ItemDataRole.EditRole:
+            if column == 0:
+                return QtCore.QDate(entry.date)
+            if column == 1:
+                return pay_type_label(entry.pay_type)
+            if column == 6:
+                return entry.note or ""
+            return float(getattr(entry, self.EDITABLE_COLUMNS[column]) or 0) if column in self.EDITABLE_COLUMNS else None
+
+        if role == QtCore.Qt.ItemDataRole.TextAlignmentRole and 2 <= column <= 5:
+            return QtCore.Qt.AlignmentFlag.AlignRight | QtCore.Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def setData(self, index: QtCore.QModelIndex, value, role=QtCore.Qt.ItemDataRole.EditRole) -> bool:
+        if not index.isValid() or role != QtCore.Qt.ItemDataRole.EditRole or index.column() not in self.EDITABLE_COLUMNS:
+            return False
+        field = self.EDITABLE_COLUMNS[index.column()]
+        if field == "date":
+            value = value.toPython()
+        elif field == "pay_type":
+            value = pay_type_from_label(value)
+        elif field == "note":
+            value = value or None
+        else:
+            value = float(value)
+
+        entry = self.time_entries[index.row()]
+        try:
+            changed = self.data_provider.update_time_entry(self.employee, entry, **{field: value})
+        except ValueError as error:
+            print(f"WARNING: Unable to change the {entry.date} time entry: {error}")
+            return False
+        if changed:
+            self.dataChanged.emit(index.siblingAtColumn(0), index.siblingAtColumn(len(self.COLUMNS) - 1))
+        return True
+
+    def sort(self, column: int, order=QtCore.Qt.SortOrder.AscendingOrder):
+        self.sort_column = column
+        self.sort_order = order
+        self.refresh()
+
+    def time_entry(self, row: int) -> data_provider.TimeEntry:
+        return self.time_entries[row]
+
+    def remove_rows(self, rows: list[int]):
+        """Removes the time entries in the provided rows from the employee."""
+        for row in sorted(set(rows), reverse=True):
+            self.beginRemoveRows(QtCore.QModelIndex(), row, row)
+            self.data_provider.remove_time_entry(self.employee, self.time_entries.pop(row))
+            self.fetched -= 1
+            self.endRemoveRows()
+
+
+class PayTypeDelegate(QtWidgets.QStyledItemDelegate):
+    """Edits the pay type column of the history table with a combo box."""
+    def createEditor(self, parent: QtWidgets.QWidget, option, index: QtCore.QModelIndex) -> QtWidgets.QWidget:
+        editor = QtWidgets.QComboBox(parent)
+        editor.addItems([pay_type_label(pay_type) for pay_type in data_provider.PayType])
+        return editor
+
+    def setEditorData(self, editor: QtWidgets.QComboBox, index: QtCore.QModelIndex):
+        editor.setCurrentText(index.data(QtCore.Qt.ItemDataRole.EditRole))
+
+    def setModelData(self, editor: QtWidgets.QComboBox, model: QtCore.QAbstractItemModel, index: QtCore.QModelIndex):
+        model.setData(index, editor.currentText(), QtCore.Qt.ItemDataRole.EditRole)
 
 
 class NannyPayrollMangerUI(QtWidgets.QMainWindow):
@@ -18,7 +210,8 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
 
         self.data = data_provider
         self.today = QtCore.QDate.currentDate()
-        self.last_monday = self.today.addDays(-self.today.dayOfWeek() + 1)
+        self.pay_period = self.data.get_pay_period(self.today.toPython())
+        self.pay_date = QtCore.QDate(self.pay_period.pay_date)
         self.tax_rates = self.data.get_tax_rates(self.today.year())
 
         self.setObjectName("NannyPayrollManager")
@@ -31,6 +224,7 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         self.date_4_overlap = False
         self.date_5_overlap = False
         self.milage_reimbursement = 0
+        self.first_paint_time = None  # perf_counter() of the window's first paint (see main.py --profile-startup)
 
         self.cbx_employee = None
         self.chk_time_1 = None
@@ -72,13 +266,33 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         self.lne_timesheet_path = None
         self.btn_timesheet_path = None
         self.btn_timesheet_save = None
+        self.tab_main = None
+        self.lazy_tabs = {}  # placeholder tab widget -> function that builds and populates the tab when first shown
         self.cbx_quarter_year = None
         self.cbx_quarter = None
         self.lne_quarterly_path = None
         self.cbx_w2_year = None
-
+        self.chk_history_dates = None
+        self.dte_history_start = None
+        self.dte_history_end = None
+        self.cbx_history_pay_type = None
+        self.history_model = None
+        self.tbl_history = None
+
+        # build and populate times (see main.py --profile-startup)
+        start = time.perf_counter()
         self.build_ui()
+        self.startup_timings = {"build_ui": time.perf_counter() - start}
+        start = time.perf_counter()
         self.populate_ui()
+        self.startup_timings["populate_ui"] = time.perf_counter() - start
+
+        # pick up files edited outside the app
+        self.data.add_change_listener(self.on_data_changed)
+        self.watch_timer = QtCore.QTimer(self)
+        self.watch_timer.timeout.connect(self.data.reload_changed_files)
+        if config.WATCH_INTERVAL_MS:
+            self.watch_timer.start(config.WATCH_INTERVAL_MS)
 
     def build_ui(self):
         self.resize(993, 360)
@@ -102,8 +316,11 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         lyo_header.addItem(spacer)
         lyo_header.addWidget(QtWidgets.QLabel(f"Today\'s Date:  {self.today.toPython().strftime('%m/%d/%Y')}"))
 
-        lyo_body = QtWidgets.QHBoxLayout()
-        lyo_main.addLayout(lyo_body)
+        self.tab_main = QtWidgets.QTabWidget()
+        lyo_main.addWidget(self.tab_main)
+        wdg_body = QtWidgets.QWidget()
+        self.tab_main.addTab(wdg_body, "Enter Time && Timesheets")
+        lyo_body = QtWidgets.QHBoxLayout(wdg_body)
 
         lyo_time = QtWidgets.QVBoxLayout()
         lyo_body.addLayout(lyo_time)
@@ -341,6 +558,30 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         self.btn_timesheet_save.clicked.connect(self.on_save_timesheet)
         lyo_timesheet.addWidget(self.btn_timesheet_save)
 
+        spacer = QtWidgets.QSpacerItem(0, 0, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Expanding)
+        lyo_reports.addItem(spacer)
+
+        # the quarterly, W-2 and history tabs are rarely used, so they are only built when first shown
+        self.add_lazy_tab("Quarterly && W-2 Reports", self.build_reports_tab)
+        self.add_lazy_tab("History", self.build_history_tab)
+        self.tab_main.currentChanged.connect(self.on_tab_changed)
+
+    def add_lazy_tab(self, label: str, build):
+        """Adds an empty tab that build(tab_widget) fills in the first time it's shown."""
+        wdg_tab = QtWidgets.QWidget()
+        self.tab_main.addTab(wdg_tab, label)
+        self.lazy_tabs[wdg_tab] = build
+
+    def on_tab_changed(self, index: int):
+        wdg_tab = self.tab_main.widget(index)
+        build = self.lazy_tabs.pop(wdg_tab, None)
+        if build is not None:
+            build(wdg_tab)
+
+    def build_reports_tab(self, wdg_reports: QtWidgets.QWidget):
+        """The Washington State quarterly report and the yearly W-2 report."""
+        lyo_reports = QtWidgets.QVBoxLayout(wdg_reports)
+
         gbx_quarterly = QtWidgets.QGroupBox("Washington State Quarterly Report")
         lyo_reports.addWidget(gbx_quarterly)
         lyo_quarterly = QtWidgets.QVBoxLayout(gbx_quarterly)
@@ -365,9 +606,14 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         btn_quarterly_path.clicked.connect(self.on_btn_quarterly_path)
         lyo_quarterly_path.addWidget(btn_quarterly_path)
 
+        lyo_quarterly_buttons = QtWidgets.QHBoxLayout()
+        lyo_quarterly.addLayout(lyo_quarterly_buttons)
         btn_quarterly_save = QtWidgets.QPushButton("Save Quarterly Report")
         btn_quarterly_save.clicked.connect(self.on_save_quarterly)
-        lyo_quarterly.addWidget(btn_quarterly_save)
+        lyo_quarterly_buttons.addWidget(btn_quarterly_save)
+        btn_quarterly_save_all = QtWidgets.QPushButton("Save All Quarters")
+        btn_quarterly_save_all.clicked.connect(self.on_save_all_quarters)
+        lyo_quarterly_buttons.addWidget(btn_quarterly_save_all)
 
         gbx_w2 = QtWidgets.QGroupBox("Yearly W-2 Report")
         lyo_reports.addWidget(gbx_w2)
@@ -379,23 +625,122 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         self.cbx_w2_year = QtWidgets.QComboBox()
         lyo_w2_inputs.addWidget(self.cbx_w2_year, 0, 1)
 
+        lyo_w2_buttons = QtWidgets.QHBoxLayout()
+        lyo_w2.addLayout(lyo_w2_buttons)
         btn_w2_print = QtWidgets.QPushButton("Print W-2 Report To Console")
         btn_w2_print.clicked.connect(self.on_print_w2)
-        lyo_w2.addWidget(btn_w2_print)
+        lyo_w2_buttons.addWidget(btn_w2_print)
+        btn_w2_efw2 = QtWidgets.QPushButton("Save EFW2 File")
+        btn_w2_efw2.clicked.connect(self.on_save_w2_efw2)
+        lyo_w2_buttons.addWidget(btn_w2_efw2)
+        btn_schedule_h_print = QtWidgets.QPushButton("Print Schedule H To Console")
+        btn_schedule_h_print.clicked.connect(self.on_print_schedule_h)
+        lyo_w2_buttons.addWidget(btn_schedule_h_print)
 
         spacer = QtWidgets.QSpacerItem(0, 0, QtWidgets.QSizePolicy.Policy.Minimum, QtWidgets.QSizePolicy.Policy.Expanding)
         lyo_reports.addItem(spacer)
 
+        years = [str(self.today.year() - 3),
+                 str(self.today.year() - 2),
+                 str(self.today.year() - 1),
+                 str(self.today.year()),
+                 str(self.today.year() + 1)]
+        quarters = ["Quarter 1: Jan - Mar",
+                    "Quarter 2: Apr - June",
+                    "Quarter 3: July - Sept",
+                    "Quarter 4: Oct - Dec"]
+        with blocked_signals(self.cbx_quarter_year, self.cbx_quarter):
+            self.cbx_quarter_year.addItems(years)
+            self.cbx_quarter_year.setCurrentIndex(3)
+            self.cbx_quarter.addItems(quarters)
+        self.update_quarterly_path()
+
+        self.cbx_w2_year.addItems(years)
+        self.cbx_w2_year.setCurrentIndex(2)
+
+    def build_history_tab(self, wdg_history: QtWidgets.QWidget):
+        """Browse, edit and delete the selected employee's time entries."""
+        lyo_history = QtWidgets.QVBoxLayout(wdg_history)
+
+        # filters
+        lyo_history_filter = QtWidgets.QHBoxLayout()
+        lyo_history.addLayout(lyo_history_filter)
+        self.chk_history_dates = QtWidgets.QCheckBox("From:")
+        self.chk_history_dates.stateChanged.connect(self.on_history_filter_changed)
+        lyo_history_filter.addWidget(self.chk_history_dates)
+        self.dte_history_start = QtWidgets.QDateEdit()
+        self.dte_history_start.setCalendarPopup(True)
+        self.dte_history_start.dateChanged.connect(self.on_history_filter_changed)
+        lyo_history_filter.addWidget(self.dte_history_start)
+        lyo_history_filter.addWidget(QtWidgets.QLabel("To:"))
+        self.dte_history_end = QtWidgets.QDateEdit()
+        self.dte_history_end.setCalendarPopup(True)
+        self.dte_history_end.dateChanged.connect(self.on_history_filter_changed)
+        lyo_history_filter.addWidget(self.dte_history_end)
+        lyo_history_filter.addWidget(QtWidgets.QLabel("Pay Type:"))
+        self.cbx_history_pay_type = QtWidgets.QComboBox()
+        self.cbx_history_pay_type.addItem("All")
+        self.cbx_history_pay_type.addItems([pay_type_label(pay_type) for pay_type in data_provider.PayType])
+        self.cbx_history_pay_type.currentIndexChanged.connect(self.on_history_filter_changed)
+        lyo_history_filter.addWidget(self.cbx_history_pay_type)
+        spacer = QtWidgets.QSpacerItem(0, 0, QtWidgets.QSizePolicy.Policy.Expanding, QtWidgets.QSizePolicy.Policy.Minimum)
+        lyo_history_filter.addItem(spacer)
+
+        # time entries table (rows are a fixed height, so the view doesn't measure every row)
+        self.history_model = TimeEntryTableModel(self.data, self)
+        self.history_model.dataChanged.connect(self.on_history_edited)
+        self.history_model.rowsRemoved.connect(self.on_history_edited)
+        self.tbl_history = QtWidgets.QTableView()
+        self.tbl_history.setModel(self.history_model)
+        self.tbl_history.setItemDelegateForColumn(1, PayTypeDelegate(self.tbl_history))
+        self.tbl_history.setSelectionBehavior(QtWidgets.QAbstractItemView.SelectionBehavior.SelectRows)
+        self.tbl_history.setAlternatingRowColors(True)
+        self.tbl_history.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.ResizeMode.Fixed)
+        self.tbl_history.verticalHeader().hide()
+        self.tbl_history.horizontalHeader().setStretchLastSection(True)
+        self.tbl_history.horizontalHeader().setSortIndicator(0, QtCore.Qt.SortOrder.DescendingOrder)
+        self.tbl_history.setSortingEnabled(True)
+        lyo_history.addWidget(self.tbl_history)
+
+        lyo_history_buttons = QtWidgets.QHBoxLayout()
+        lyo_history.addLayout(lyo_history_buttons)
+        btn_history_delete = QtWidgets.QPushButton("Delete Selected")
+        btn_history_delete.clicked.connect(self.on_delete_history)
+        lyo_history_buttons.addWidget(btn_history_delete)
+        btn_history_import = QtWidgets.QPushButton("Import Time Entries...")
+        btn_history_import.clicked.connect(self.on_import_time_entries)
+        lyo_history_buttons.addWidget(btn_history_import)
+        btn_history_save = QtWidgets.QPushButton("Save Changes")
+        btn_history_save.clicked.connect(self.on_save_history)
+        lyo_history_buttons.addWidget(btn_history_save)
+
+        # the history date filter defaults to the last year of pay periods
+        with blocked_signals(self.dte_history_start, self.dte_history_end):
+            self.dte_history_start.setDate(QtCore.QDate(self.pay_period.start_date).addYears(-1))
+            self.dte_history_end.setDate(self.pay_date)
+        self.history_model.set_employee(self.employee)
+
     def populate_ui(self):
-        self.cbx_employee.addItems(self.data.employee_names)
-        self.dte_time_1.setDate(self.last_monday)
-        self.dte_time_2.setDate(self.last_monday.addDays(1))
-        self.dte_time_3.setDate(self.last_monday.addDays(2))
-        self.dte_time_4.setDate(self.last_monday.addDays(3))
-        self.dte_time_5.setDate(self.last_monday.addDays(4))
+        # the signals are blocked while filling in the widgets, otherwise every date set runs the cascading on_date_*
+        # handlers (and their holiday and overlap checks) again. the checks run once, after everything is set.
+        with blocked_signals(self.cbx_employee, self.dte_time_1, self.dte_time_2, self.dte_time_3, self.dte_time_4,
+                             self.dte_time_5, self.dte_timesheet_start, self.dte_timesheet_end):
+            self.cbx_employee.addItems(self.data.employee_names)
+            # the five days leading up to the current pay period's pay date
+            self.dte_time_1.setDate(self.pay_date.addDays(-4))
+            self.dte_time_2.setDate(self.pay_date.addDays(-3))
+            self.dte_time_3.setDate(self.pay_date.addDays(-2))
+            self.dte_time_4.setDate(self.pay_date.addDays(-1))
+            self.dte_time_5.setDate(self.pay_date)
+
+            # autofill timesheet date range with the current pay period
+            self.dte_timesheet_start.setDate(QtCore.QDate(self.pay_period.start_date))
+            self.dte_timesheet_end.setDate(self.pay_date)
+        self.employee = self.data.get_employee_from_name(self.cbx_employee.currentText())
+        self.update_timesheet_path()
 
         # populate time types
-        pay_types = [pay_type.name.replace('_', ' ').title() for pay_type in data_provider.PayType]
+        pay_types = [pay_type_label(pay_type) for pay_type in data_provider.PayType]
         self.cbx_time_1.addItems(pay_types)
         self.cbx_time_2.addItems(pay_types)
         self.cbx_time_3.addItems(pay_types)
@@ -409,31 +754,14 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         self.check_for_holidays(self.dte_time_4, self.cbx_time_4, self.lne_time_4)
         self.check_for_holidays(self.dte_time_5, self.cbx_time_5, self.lne_time_5)
 
-        self.cbx_add_milage.addItems(["Entry 1", "Entry 2", "Entry 3", "Entry 4", "Entry 5"])
-
-        # autofill timesheet date range
-        # TODO this should be based on the employer's payroll day of week value
-        # TODO this should encompass the entire week, not just 5 days
-        self.dte_timesheet_start.setDate(self.last_monday)
-        self.dte_timesheet_end.setDate(self.last_monday.addDays(4))
-        self.update_timesheet_path()
+        self.update_date_overlaps()
 
-        years = [str(self.today.year() - 3),
-                 str(self.today.year() - 2),
-                 str(self.today.year() - 1),
-                 str(self.today.year()),
-                 str(self.today.year() + 1)]
-        self.cbx_quarter_year.addItems(years)
-        self.cbx_quarter_year.setCurrentIndex(3)
-        quarters = ["Quarter 1: Jan - Mar",
-                    "Quarter 2: Apr - June",
-                    "Quarter 3: July - Sept",
-                    "Quarter 4: Oct - Dec"]
-        self.cbx_quarter.addItems(quarters)
-        self.update_quarterly_path()
+        self.cbx_add_milage.addItems(["Entry 1", "Entry 2", "Entry 3", "Entry 4", "Entry 5"])
 
-        self.cbx_w2_year.addItems(years)
-        self.cbx_w2_year.setCurrentIndex(2)
+    def paintEvent(self, event: QtGui.QPaintEvent):
+        if self.first_paint_time is None:
+            self.first_paint_time = time.perf_counter()
+        super().paintEvent(event)
 
     def update_timesheet_path(self):
         employee = self.data.get_employee_from_name(self.cbx_employee.currentText())
@@ -471,9 +799,35 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
 
         return overlap
 
+    def on_data_changed(self, change: data_provider.DataChange):
+        """Updates only the parts of the UI that depend on the reloaded data."""
+        if change.employees_added_or_removed:
+            current_name = self.cbx_employee.currentText()
+            self.cbx_employee.blockSignals(True)
+            self.cbx_employee.clear()
+            self.cbx_employee.addItems(self.data.employee_names)
+            self.cbx_employee.setCurrentIndex(max(0, self.cbx_employee.findText(current_name)))
+            self.cbx_employee.blockSignals(False)
+        if change.employees and self.data.employees:
+            self.on_employee_changed()  # the selected employee may be a new object or have new time entries
+
+        if change.tax_years:
+            self.tax_rates = self.data.get_tax_rates(self.today.year())
+            if self.tax_rates is not None:
+                self.on_milage_updated()
+
+        if change.paid_holidays:
+            self.check_for_holidays(self.dte_time_1, self.cbx_time_1, self.lne_time_1)
+            self.check_for_holidays(self.dte_time_2, self.cbx_time_2, self.lne_time_2)
+            self.check_for_holidays(self.dte_time_3, self.cbx_time_3, self.lne_time_3)
+            self.check_for_holidays(self.dte_time_4, self.cbx_time_4, self.lne_time_4)
+            self.check_for_holidays(self.dte_time_5, self.cbx_time_5, self.lne_time_5)
+
     def on_employee_changed(self):
         self.employee = self.data.get_employee_from_name(self.cbx_employee.currentText())
         self.update_timesheet_path()
+        if self.history_model is not None:
+            self.history_model.set_employee(self.employee)
         if self.check_for_overlapping_dates(self.dte_time_1):
             self.date_1_overlap = True
             self.chk_time_1.setChecked(False)  # FIXME not working
@@ -567,8 +921,7 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
     ):
         date = date_wdg.date().toPython()
         hours = hours_wdg.value()
-        type_str = type_wdg.currentText().replace(' ', '_').upper()
-        pay_type = data_provider.PayType[type_str]
+        pay_type = pay_type_from_label(type_wdg.currentText())
         reimbursement = reimbursement_wdg.value() if reimbursement_wdg.value() != 0 else None
         note = note_wdg.text() if note_wdg.text() else None
 
@@ -622,6 +975,69 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         else:
             msg_box.setText("WARNING: Nothing to save.")
         msg_box.exec_()
+        if self.history_model is not None:
+            self.history_model.refresh()
+
+    def on_history_filter_changed(self):
+        filter_dates = self.chk_history_dates.isChecked()
+        self.dte_history_start.setEnabled(filter_dates)
+        self.dte_history_end.setEnabled(filter_dates)
+        pay_type_index = self.cbx_history_pay_type.currentIndex()
+        self.history_model.set_filter(
+            self.dte_history_start.date().toPython() if filter_dates else None,
+            self.dte_history_end.date().toPython() if filter_dates else None,
+            data_provider.PayType(pay_type_index - 1) if pay_type_index > 0 else None)
+
+    def on_history_edited(self):
+        """Time entries changed in the history tab may have added or removed the Enter Time date overlaps."""
+        self.update_date_overlaps()
+
+    def update_date_overlaps(self):
+        self.date_1_overlap = self.check_for_overlapping_dates(self.dte_time_1)
+        self.date_2_overlap = self.check_for_overlapping_dates(self.dte_time_2)
+        self.date_3_overlap = self.check_for_overlapping_dates(self.dte_time_3)
+        self.date_4_overlap = self.check_for_overlapping_dates(self.dte_time_4)
+        self.date_5_overlap = self.check_for_overlapping_dates(self.dte_time_5)
+
+    def on_delete_history(self):
+        rows = [index.row() for index in self.tbl_history.selectionModel().selectedRows()]
+        if not rows:
+            return
+        flags = QtWidgets.QMessageBox.StandardButton.Yes
+        flags |= QtWidgets.QMessageBox.StandardButton.Cancel
+        question = f"Are you sure you want to delete {len(rows)} time entries? (they aren't removed from disk until saved)"
+        response = QtWidgets.QMessageBox.question(self, "Delete Time Entries?", question, flags)
+        if response != QtWidgets.QMessageBox.Yes:
+            return
+        self.history_model.remove_rows(rows)
+
+    def on_import_time_entries(self):
+        """Imports a csv or ics timeclock export (see importers.py). Entries without an employee go to the selected
+        employee."""
+        file_name = QtWidgets.QFileDialog.getOpenFileName(self, "Import Time Entries", str(config.TIMESHEET_DIR),
+                                                          "Time Entries (*.csv *.ics)")
+        if not file_name[0]:
+            return
+
+        msg_box = QtWidgets.QMessageBox()
+        try:
+            result = importers.import_time_entries(self.data, Path(file_name[0]), default_employee=self.employee.name)
+        except (OSError, UnicodeDecodeError, importers.ImportFileError) as error:
+            msg_box.setText(f"ERROR: {error}")
+            msg_box.exec()
+            return
+        self.history_model.refresh()
+        self.on_history_edited()
+        msg_box.setText(result.summary())
+        msg_box.exec()
+
+    def on_save_history(self):
+        msg_box = QtWidgets.QMessageBox()
+        if self.data.save():
+            msg_box.setText("Time entry changes saved successfully.")
+        else:
+            msg_box.setText("WARNING: Nothing to save.")
+        msg_box.exec_()
 
     def on_milage_updated(self):
         """Calculates reimbursement for the milage input."""
@@ -710,7 +1126,49 @@ class NannyPayrollMangerUI(QtWidgets.QMainWindow):
         msg_box.setText("Quarterly report saved.")
         msg_box.exec()
 
+    def on_save_all_quarters(self):
+        """Writes a csv for every quarter of the selected year into the directory of the quarterly path."""
+        path_str = self.lne_quarterly_path.text()
+        year = int(self.cbx_quarter_year.currentText())
+
+        # validate input
+        msg_box = QtWidgets.QMessageBox()
+        if not path_str:
+            msg_box.setText("ERROR: No path provided.")
+            msg_box.exec()
+            return
+
+        report = reports.EAMSYearlyReport(self.data, year)
+        report.to_csv_all(Path(path_str).parent)
+        report.print_annual_totals()
+
+        msg_box.setText("Quarterly reports saved.")
+        msg_box.exec()
+
     def on_print_w2(self):
         year = int(self.cbx_w2_year.currentText())
         w2_report = reports.W2Report(self.data, year)
         w2_report.print_to_console()
+
+    def on_print_schedule_h(self):
+        year = int(self.cbx_w2_year.currentText())
+        schedule_h_report = reports.ScheduleHReport(self.data, year)
+        schedule_h_report.print_to_console()
+
+    def on_save_w2_efw2(self):
+        """Writes the W-2 report for the selected year to an SSA EFW2 submission file."""
+        year = int(self.cbx_w2_year.currentText())
+        default_path = config.TIMESHEET_DIR / f"W2REPORT_{year}.txt"
+        file_name = QtWidgets.QFileDialog.getSaveFileName(self, "Select Path", str(default_path), "EFW2 File (*.txt)")
+        if not file_name[0]:
+            return
+
+        w2_report = reports.W2Report(self.data, year)
+        problems = w2_report.to_efw2(Path(file_name[0]))
+
+        msg_box = QtWidgets.QMessageBox()
+        if problems:
+            msg_box.setText("ERROR: The EFW2 file failed validation:\n" + "\n".join(problems))
+        else:
+            msg_box.setText("EFW2 file saved.")
+        msg_box.exec()
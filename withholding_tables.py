@@ -0,0 +1,197 @@
+"""Compiler for the Percentage Method Tables from IRS publication 15-T.
+
+Reads a text file that is copy and pasted out of the Pub 15-T pdf (the "Percentage Method Tables for Automated
+Payroll Systems" page, see stub_data/percentage_table.txt) and turns all six tables for the year (Married, Single and
+Head of Household, with and without the W-4 Step 2 multiple jobs box checked) into the tax_rates.json format.
+
+Every table is validated before anything is written: the brackets must start at $0, be sorted and contiguous, end
+with an open ended bracket, and each bracket's tentative amount (C) must follow from the one before it.
+
+TaxRates compiles the tables when they are first used (compile_percentage_tables()): per table, the bracket starts
+(A) and base amounts (C) in cents and the percentages (D) in money.py rate units, so the withholding calculation can
+find a bracket with a bisect instead of re-reading the row dictionaries. Only the tables are saved, so editing them by
+hand in tax_rates.json can't leave a stale compiled copy behind.
+
+    python withholding_tables.py stub_data/percentage_table.txt --year 2024 --line-1g-married 12900 \\
+        --line-1g-not-married 8600"""
+
+__author__ = 'Sean Kraft'
+
+from bisect import bisect_right
+from pathlib import Path
+import argparse
+import json
+
+import config
+import money
+
+COLUMNS = ["A", "B", "C", "D", "E"]
+OPEN_ENDED = -1  # the "B" value of the last bracket in each table (it has no upper limit)
+SECTIONS = ["MultipleJobsNotChecked", "MultipleJobsChecked"]  # left and right side of the pasted page
+FILING_STATUSES = {"Married": "Married", "Single": "Single", "Head": "Head"}  # first word of a heading -> key
+TENTATIVE_AMOUNT_TOLERANCE = 100  # cents. the IRS rounds the bracket limits, so C can drift by a few cents
+
+
+class TableError(Exception):
+    pass
+
+
+def _parse_value(value: str) -> int or float:
+    value = value.strip("$").strip("%").replace(",", "")
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+
+def parse_percentage_tables(text: str) -> dict:
+    """Parses the pasted Pub 15-T page into {section: {filing status: [rows]}} where rows are
+    {"A": .., "B": .., "C": .., "D": .., "E": ..} dictionaries (the tax_rates.json "PercentageTables" format)."""
+    tables = {section: {status: [] for status in FILING_STATUSES.values()} for section in SECTIONS}
+    lines = [(number, line.split()) for number, line in enumerate(text.splitlines(), start=1) if line.strip()]
+    if not lines or lines[0][1] != COLUMNS * len(SECTIONS):
+        raise TableError(f"The first line must be the column headers: {' '.join(COLUMNS * len(SECTIONS))}")
+
+    status = None
+    for number, values in lines[1:]:
+        if values[0] in FILING_STATUSES:
+            status = FILING_STATUSES[values[0]]
+            continue
+        if status is None:
+            raise TableError(f"Line {number}: found a bracket before a filing status heading.")
+
+        # the last bracket of each table has no upper limit (B)
+        if len(values) == len(COLUMNS * len(SECTIONS)) - len(SECTIONS):
+            values.insert(1, str(OPEN_ENDED))
+            values.insert(len(COLUMNS) + 1, str(OPEN_ENDED))
+        if len(values) != len(COLUMNS * len(SECTIONS)):
+            raise TableError(f"Line {number}: expected {len(COLUMNS) * len(SECTIONS)} values, found {len(values)}.")
+
+        try:
+            values = [_parse_value(value) for value in values]
+        except ValueError as error:
+            raise TableError(f"Line {number}: {error}")
+        for i, section in enumerate(SECTIONS):
+            section_values = values[i * len(COLUMNS):(i + 1) * len(COLUMNS)]
+            tables[section][status].append(dict(zip(COLUMNS, section_values)))
+    return tables
+
+
+def validate_table(rows: list[dict], name: str = "table") -> list[str]:
+    """Returns a list of problems with a single percentage table (an empty list means the table is valid)."""
+    if not rows:
+        return [f"{name}: the table is empty."]
+
+    problems = []
+    if rows[0]["A"] != 0:
+        problems.append(f"{name}: the first bracket starts at ${rows[0]['A']:,} instead of $0.")
+    if rows[-1]["B"] != OPEN_ENDED:
+        problems.append(f"{name}: the last bracket isn't open ended.")
+    for i, row in enumerate(rows):
+        if row["E"] != row["A"]:
+            problems.append(f"{name} row {i + 1}: E (${row['E']:,}) doesn't match A (${row['A']:,}).")
+        if not 0 <= row["D"] <= 100:
+            problems.append(f"{name} row {i + 1}: {row['D']}% isn't a valid percentage.")
+        if i == len(rows) - 1:
+            break
+
+        next_row = rows[i + 1]
+        if row["B"] == OPEN_ENDED or row["B"] <= row["A"]:
+            problems.append(f"{name} row {i + 1}: the bracket ${row['A']:,} - ${row['B']:,} is empty or unsorted.")
+        elif next_row["A"] != row["B"]:
+            problems.append(f"{name} row {i + 2}: starts at ${next_row['A']:,} but the bracket before it ends at "
+                            f"${row['B']:,}.")
+        else:
+            bracket_tax = money.apply_rate(money.to_cents(row["B"] - row["A"]), money.percent_to_rate(row["D"]))
+            expected = money.to_cents(row["C"]) + bracket_tax
+            if abs(money.to_cents(next_row["C"]) - expected) > TENTATIVE_AMOUNT_TOLERANCE:
+                problems.append(f"{name} row {i + 2}: C is ${next_row['C']:,} but the brackets before it add up to "
+                                f"{money.format_dollars(expected)}.")
+    return problems
+
+
+def validate_percentage_tables(tables: dict) -> list[str]:
+    """Returns a list of problems with all six tables (an empty list means the tables are valid)."""
+    problems = []
+    for section in SECTIONS:
+        for status in FILING_STATUSES.values():
+            problems += validate_table(tables.get(section, {}).get(status, []), f"{section} {status}")
+    return problems
+
+
+def compile_table(rows: list[dict]) -> dict:
+    """Compiles a percentage table to parallel lists of bracket starts (cents), base amounts (cents) and percentages
+    (rate units)."""
+    return {"A": [money.to_cents(row["A"]) for row in rows],
+            "C": [money.to_cents(row["C"]) for row in rows],
+            "D": [money.percent_to_rate(row["D"]) for row in rows]}
+
+
+def compile_percentage_tables(tables: dict) -> dict:
+    return {section: {status: compile_table(rows) for status, rows in statuses.items()}
+            for section, statuses in tables.items()}
+
+
+def lookup(compiled_table: dict, annual_wages: int) -> tuple[int, int, int]:
+    """Returns the (bracket start, base amount, rate) of the bracket the annual wages (in cents) fall in."""
+    index = bisect_right(compiled_table["A"], annual_wages) - 1
+    if index < 0:
+        raise TableError(f"No federal withholding bracket for annual wages of {money.format_dollars(annual_wages)}.")
+    return compiled_table["A"][index], compiled_table["C"][index], compiled_table["D"][index]
+
+
+def update_tax_rates_file(tax_rates_file: Path, year: int, tables: dict, line_1g_married: int or float = None,
+                          line_1g_not_married: int or float = None):
+    """Writes the tables into the year's FederalWithholding in tax_rates.json. The year must already be in the file,
+    since the rest of its rates can't come from Pub 15-T."""
+    with open(tax_rates_file) as in_file:
+        all_rates = json.load(in_file)
+
+    for rates in all_rates:
+        if rates["TaxYear"] == year:
+            break
+    else:
+        raise TableError(f"Tax year {year} isn't in '{tax_rates_file}'. Add the year's rates before its tables.")
+
+    federal_withholding = rates.setdefault("FederalWithholding", {})
+    if line_1g_married is not None:
+        federal_withholding["Worksheet1A_1G_Married"] = line_1g_married
+    if line_1g_not_married is not None:
+        federal_withholding["Worksheet1A_1G_NotMarried"] = line_1g_not_married
+    federal_withholding["PercentageTables"] = tables
+    federal_withholding.pop("CompiledPercentageTables", None)  # written by older versions, TaxRates compiles the tables
+
+    with open(tax_rates_file, "w") as out_file:
+        json.dump(all_rates, out_file, indent=4)
+    print(f"{tax_rates_file} saved.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the Pub 15-T Percentage Method Tables into tax_rates.json.")
+    parser.add_argument("table_file", type=Path, help="Text copied out of the Pub 15-T percentage method tables.")
+    parser.add_argument("--year", type=int, required=True, help="Tax year the tables are for.")
+    parser.add_argument("--tax-rates", type=Path, default=config.TAX_RATES_FILE, help="tax_rates.json to update.")
+    parser.add_argument("--line-1g-married", type=_parse_value, help="Worksheet 1A line 1g amount for married.")
+    parser.add_argument("--line-1g-not-married", type=_parse_value, help="Worksheet 1A line 1g amount otherwise.")
+    parser.add_argument("--print", action="store_true", help="Print the tables instead of writing tax_rates.json.")
+    args = parser.parse_args()
+
+    try:
+        tables = parse_percentage_tables(args.table_file.read_text())
+    except (OSError, TableError) as error:
+        parser.exit(1, f"ERROR: {error}\n")
+    problems = validate_percentage_tables(tables)
+    if problems:
+        parser.exit(1, "".join(f"ERROR: {problem}\n" for problem in problems))
+
+    if args.print:
+        print(json.dumps(tables, indent=4))
+        return
+    try:
+        update_tax_rates_file(args.tax_rates, args.year, tables, args.line_1g_married, args.line_1g_not_married)
+    except (OSError, ValueError, TableError) as error:
+        parser.exit(1, f"ERROR: {error}\n")
+
+
+if __name__ == '__main__':
+    main()
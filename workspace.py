@@ -0,0 +1,146 @@
+"""Multi-household workspaces.
+
+A workspace is a directory of household (employer) app data directories, each laid out like config.APP_DATA_DIR:
+    workspace/
+        SmithHousehold/employer.json, tax_rates.json, Employees/...
+        JonesHousehold/employer.json, tax_rates.json, Employees/...
+
+Every household is loaded into its own DataProvider on a thread pool, and batch operations fan out across the
+households in parallel, collecting timings and failures into a BatchSummary."""
+
+__author__ = 'Sean Kraft'
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+import argparse
+import time
+import traceback
+
+import config
+from data_provider import DataProvider
+import reports
+
+
+@dataclass
+class HouseholdResult:
+    household: str
+    seconds: float = 0
+    result: object = None
+    error: str or None = None
+
+    @property
+    def succeeded(self) -> bool:
+        return self.error is None
+
+
+@dataclass
+class BatchSummary:
+    operation: str
+    results: list[HouseholdResult] = field(default_factory=list)
+    seconds: float = 0
+
+    @property
+    def succeeded(self) -> list[HouseholdResult]:
+        return [result for result in self.results if result.succeeded]
+
+    @property
+    def failed(self) -> list[HouseholdResult]:
+        return [result for result in self.results if not result.succeeded]
+
+    def print_summary(self):
+        print(f"--{self.operation.upper()}--")
+        for result in self.results:
+            status = "OK" if result.succeeded else f"FAILED: {result.error}"
+            print(f"{result.household}: {result.seconds:.3f}s {status}")
+        print(f"{len(self.succeeded)} succeeded, {len(self.failed)} failed in {self.seconds:.3f}s")
+
+
+class Workspace:
+    def __init__(self, household_dirs: list[Path], max_workers: int = None):
+        self.household_dirs = {Path(household_dir).name: Path(household_dir) for household_dir in household_dirs}
+        self.max_workers = max_workers or config.WORKSPACE_MAX_WORKERS
+        self.households: dict[str, DataProvider] = {}
+
+    @classmethod
+    def from_directory(cls, workspace_dir: Path, max_workers: int = None):
+        """Creates a workspace from every sub directory of workspace_dir that contains an employer.json file."""
+        household_dirs = sorted(path.parent for path in Path(workspace_dir).glob(f"*/{config.EMPLOYER_FILE_NAME}"))
+        return cls(household_dirs, max_workers=max_workers)
+
+    def _run(self, operation: str, households: list[str], function) -> BatchSummary:
+        """Runs function(household_name) for each household on the thread pool and collects the results."""
+        def run_one(household: str) -> HouseholdResult:
+            start = time.perf_counter()
+            result = HouseholdResult(household)
+            try:
+                result.result = function(household)
+            except Exception as error:
+                result.error = f"{type(error).__name__}: {error}"
+                traceback.print_exc()
+            result.seconds = time.perf_counter() - start
+            return result
+
+        summary = BatchSummary(operation)
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            summary.results = list(executor.map(run_one, households))  # map keeps the household order
+        summary.seconds = time.perf_counter() - start
+        return summary
+
+    def load(self) -> BatchSummary:
+        """Loads every household's DataProvider concurrently. Households that fail to load are left out of
+        self.households and reported in the returned summary."""
+        summary = self._run("load", list(self.household_dirs), lambda name: DataProvider(self.household_dirs[name]))
+        self.households = {result.household: result.result for result in summary.succeeded}
+        return summary
+
+    def run_batch(self, operation: str, function) -> BatchSummary:
+        """Runs function(household_name, data_provider) across all loaded households in parallel."""
+        return self._run(operation, list(self.households), lambda name: function(name, self.households[name]))
+
+    def save_quarterly_reports(self, year: int, quarter: int, out_dir: Path) -> BatchSummary:
+        """Writes the EAMS quarterly csv for every household to out_dir/<household>/."""
+        def save_quarterly(household: str, data: DataProvider) -> Path:
+            household_dir = out_dir / household
+            household_dir.mkdir(parents=True, exist_ok=True)
+            file_path = household_dir / f"EAMSReport_{year}_Q{quarter}.csv"
+            reports.EAMSQuarterlyReport(data, year, quarter).to_csv(file_path)
+            return file_path
+
+        return self.run_batch(f"EAMS {year} Q{quarter}", save_quarterly)
+
+    def save_w2_reports(self, year: int, out_dir: Path) -> BatchSummary:
+        """Writes the W-2 EFW2 submission file for every household to out_dir/<household>/. A household fails if
+        its file doesn't pass validation."""
+        def save_w2(household: str, data: DataProvider) -> Path:
+            household_dir = out_dir / household
+            household_dir.mkdir(parents=True, exist_ok=True)
+            file_path = household_dir / f"W2REPORT_{year}.txt"
+            problems = reports.W2Report(data, year).to_efw2(file_path)
+            if problems:
+                raise ValueError(f"{file_path} failed validation: {'; '.join(problems)}")
+            return file_path
+
+        return self.run_batch(f"W-2 {year}", save_w2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run payroll reports across every household in a workspace.")
+    parser.add_argument("workspace", type=Path, help="Directory containing one app data directory per household.")
+    parser.add_argument("--out", type=Path, default=config.TIMESHEET_DIR, help="Output directory for reports.")
+    parser.add_argument("--workers", type=int, default=None, help="Max households processed at once.")
+    parser.add_argument("--eams", nargs=2, type=int, metavar=("YEAR", "QUARTER"), help="Write EAMS quarterly csvs.")
+    parser.add_argument("--w2", type=int, metavar="YEAR", help="Write W-2 EFW2 files.")
+    args = parser.parse_args()
+
+    workspace = Workspace.from_directory(args.workspace, max_workers=args.workers)
+    workspace.load().print_summary()
+    if args.eams:
+        workspace.save_quarterly_reports(args.eams[0], args.eams[1], args.out).print_summary()
+    if args.w2:
+        workspace.save_w2_reports(args.w2, args.out).print_summary()
+
+
+if __name__ == '__main__':
+    main()